@@ -0,0 +1,255 @@
+import datetime
+import functools
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import click
+import xmltodict
+from synthetic_svd import PRESETS, SyntheticDevice, synthetic_svd
+
+from register_code_gen.generator import Generator
+from register_code_gen.json_dump import JSON_FORMATS, write_json
+from register_code_gen.options import Options, OutputOptions
+from svd import backend
+from svd.device import Device
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+PHASES = (
+    "parse",
+    "build",
+    "resolve",
+    "headers",
+    *(f"json_{json_format}" for json_format in JSON_FORMATS),
+)
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """How each benchmark case is run"""
+
+    repeat: int = 3
+    trusted: bool = False
+    jobs: int = 1
+
+
+def run_config_options(command):
+    """Add the options of `RunConfig`, passed to `command` as `config`"""
+
+    @functools.wraps(command)
+    def wrapper(*args, **kwargs):
+        kwargs["config"] = RunConfig(
+            **{f.name: kwargs.pop(f.name) for f in fields(RunConfig)}
+        )
+        return command(*args, **kwargs)
+
+    for option in reversed(
+        [
+            click.option(
+                "--repeat",
+                type=click.IntRange(min=1),
+                default=RunConfig.repeat,
+                show_default=True,
+            ),
+            click.option(
+                "--trusted", is_flag=True, help="Skip pydantic validation."
+            ),
+            click.option(
+                "-j",
+                "--jobs",
+                type=click.IntRange(min=1),
+                default=RunConfig.jobs,
+            ),
+        ]
+    ):
+        wrapper = option(wrapper)
+    return wrapper
+
+
+class PhaseTimer:
+    """Collects the duration of every run of each phase"""
+
+    def __init__(self):
+        self.runs: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.runs[name].append(time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "min": min(runs),
+                "median": statistics.median(runs),
+                "mean": statistics.mean(runs),
+                "runs": runs,
+            }
+            for name, runs in self.runs.items()
+        }
+
+
+def benchmark(shape: SyntheticDevice, config: RunConfig) -> Dict[str, Any]:
+    """Time each phase of generating code for a synthetic device
+
+    Every repeat starts from the SVD text again, so each phase works on the
+    output of the phase before it, as it does in a real run.
+    """
+    data = synthetic_svd(shape).encode("utf-8")
+    generator = Generator(
+        Options(trusted=config.trusted), OutputOptions(jobs=config.jobs)
+    )
+    timer = PhaseTimer()
+    with tempfile.TemporaryDirectory() as work_dir:
+        work_dir = Path(work_dir)
+        for _ in range(config.repeat):
+            with timer.phase("parse"):
+                svd_dict = xmltodict.parse(data)
+            with backend.trusted(config.trusted):
+                with timer.phase("build"):
+                    device = Device.from_dict(svd_dict["device"], resolve=False)
+                with timer.phase("resolve"):
+                    device.resolve_derived_from()
+            with timer.phase("headers"):
+                generator.generate(device, work_dir / "output")
+            shutil.rmtree(work_dir / "output")
+            for json_format in JSON_FORMATS:
+                with timer.phase(f"json_{json_format}"):
+                    write_json(work_dir / "device.json", svd_dict, json_format)
+            del svd_dict, device
+    return {
+        "parameters": shape.parameters(),
+        "svd_bytes": len(data),
+        "phases": timer.summary(),
+    }
+
+
+def environment(config: RunConfig) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "version": metadata.version("register-code-gen"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        **asdict(config),
+    }
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], max_slowdown: float
+) -> List[str]:
+    """Print the median of each phase against a baseline run
+
+    Returns the phases slower than `max_slowdown` times the baseline.
+    """
+    regressions = []
+    click.echo(f"{'case':<8} {'phase':<13} {'baseline':>10} {'now':>10}")
+    for case, result in results["cases"].items():
+        if case not in baseline["cases"]:
+            continue
+        for phase, timing in result["phases"].items():
+            before = baseline["cases"][case]["phases"].get(phase)
+            if before is None:
+                continue
+            ratio = timing["median"] / before["median"]
+            mark = ""
+            if ratio > max_slowdown:
+                mark = " slower"
+                regressions.append(f"{case} {phase}")
+            click.echo(
+                f"{case:<8} {phase:<13} {before['median']:>9.3f}s"
+                f" {timing['median']:>9.3f}s {ratio:>6.2f}x{mark}"
+            )
+    return regressions
+
+
+def print_results(results: Dict[str, Any]):
+    click.echo(f"{'case':<8} " + " ".join(f"{p:>12}" for p in PHASES))
+    for case, result in results["cases"].items():
+        medians = (result["phases"][p]["median"] for p in PHASES)
+        click.echo(f"{case:<8} " + " ".join(f"{m:>11.3f}s" for m in medians))
+
+
+@click.command()
+@click.option(
+    "--preset",
+    "presets",
+    type=click.Choice(list(PRESETS)),
+    multiple=True,
+    default=("small", "medium", "large"),
+    show_default=True,
+    help="Synthetic device to benchmark, may be repeated.",
+)
+@run_config_options
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Results file, by default a new file in benchmarks/results.",
+)
+@click.option(
+    "--compare",
+    "baseline_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Results file of an earlier run to compare with.",
+)
+@click.option(
+    "--max-slowdown",
+    type=click.FloatRange(min=1),
+    default=1.25,
+    show_default=True,
+    help="Fail when a phase is this many times slower than in --compare.",
+)
+def main(
+    presets: Iterable[str],
+    config: RunConfig,
+    output: Optional[Path],
+    baseline_file: Optional[Path],
+    max_slowdown: float,
+):
+    """Benchmark each phase of code generation on synthetic SVD files"""
+    results = {"environment": environment(config), "cases": {}}
+    for preset in presets:
+        click.echo(f"Benchmarking {preset} ...", err=True)
+        results["cases"][preset] = benchmark(PRESETS[preset], config)
+    print_results(results)
+
+    if output is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    click.echo(f"Results written to {output}", err=True)
+
+    if baseline_file is not None:
+        baseline = json.loads(baseline_file.read_text(encoding="utf-8"))
+        if regressions := compare(results, baseline, max_slowdown):
+            click.echo(f"Slower than the baseline: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()  # pylint:disable=no-value-for-parameter
@@ -0,0 +1,86 @@
+import statistics
+import subprocess
+import sys
+from typing import Dict, Iterable, List
+
+import click
+
+COMMANDS = (
+    "register_code_gen.register_code_gen:main",
+    "register_code_gen.batch:batch",
+    "register_code_gen.client:client",
+)
+
+# Showing the help of a command should never need the model, the generator
+# or their dependencies, which is well within this on a CI runner
+BUDGET_MS = 250.0
+
+
+def import_times(command: str) -> Dict[str, int]:
+    """Run `command --help` and return the cumulative time of each import
+
+    Times are in microseconds, as `python -X importtime` reports them.
+    """
+    module, function = command.split(":")
+    code = f"from {module} import {function}; {function}(['--help'])"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def startup_times(command: str, repeat: int) -> List[int]:
+    """Import time of the module of `command` in each of `repeat` runs"""
+    module = command.split(":")[0]
+    return [import_times(command)[module] for _ in range(repeat)]
+
+
+@click.command()
+@click.option(
+    "--command",
+    "commands",
+    multiple=True,
+    default=COMMANDS,
+    show_default=True,
+    help="MODULE:FUNCTION of a command to time, may be repeated.",
+)
+@click.option(
+    "--repeat", type=click.IntRange(min=1), default=5, show_default=True
+)
+@click.option(
+    "--budget",
+    type=click.FloatRange(min=0),
+    default=BUDGET_MS,
+    show_default=True,
+    help="Fail when the median import time of a command exceeds this many "
+    "milliseconds.",
+)
+def main(commands: Iterable[str], repeat: int, budget: float):
+    """Time the imports of showing the help of each command"""
+    over_budget = []
+    click.echo(f"{'command':<44} {'median':>10} {'min':>10}")
+    for command in commands:
+        times = startup_times(command, repeat)
+        median = statistics.median(times) / 1000
+        click.echo(
+            f"{command:<44} {median:>8.1f}ms {min(times) / 1000:>8.1f}ms"
+        )
+        if median > budget:
+            over_budget.append(command)
+    if over_budget:
+        click.echo(f"Over the budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()  # pylint:disable=no-value-for-parameter
@@ -0,0 +1,176 @@
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator
+
+import click
+
+_HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<device schemaVersion="1.3">
+  <vendor>Acme</vendor>
+  <name>{name}</name>
+  <version>1.0</version>
+  <description>Synthetic benchmark device</description>
+  <cpu>
+    <name>CM4</name>
+    <revision>r0p1</revision>
+    <endian>little</endian>
+    <mpuPresent>true</mpuPresent>
+    <fpuPresent>true</fpuPresent>
+    <nvicPrioBits>4</nvicPrioBits>
+    <vendorSystickConfig>false</vendorSystickConfig>
+  </cpu>
+  <addressUnitBits>8</addressUnitBits>
+  <width>32</width>
+  <size>0x20</size>
+  <access>read-write</access>
+  <resetValue>0x0</resetValue>
+  <resetMask>0xFFFFFFFF</resetMask>
+  <peripherals>
+"""
+
+_FOOTER = """  </peripherals>
+</device>
+"""
+
+
+@dataclass(frozen=True)
+class SyntheticDevice:
+    """The shape of a synthetic SVD file
+
+    `registers`, `fields` and `enums` are counts per peripheral, register and
+    field.  The `derived` peripherals come on top of the `peripherals` and
+    derive from them in turn.
+    """
+
+    peripherals: int
+    registers: int
+    fields: int
+    enums: int
+    derived: int = 0
+
+    @property
+    def name(self) -> str:
+        return (
+            f"SYN_P{self.peripherals}_R{self.registers}_F{self.fields}"
+            f"_E{self.enums}_D{self.derived}"
+        )
+
+    @property
+    def field_width(self) -> int:
+        return max(1, 32 // self.fields)
+
+    def parameters(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+# `medium` is about the size of a typical microcontroller SVD file and `large`
+# about the size of the largest vendor files, some 40 MB.  `huge`, close to
+# 200 MB, is well beyond any of them.
+PRESETS = {
+    "small": SyntheticDevice(10, 8, 8, 4, derived=2),
+    "medium": SyntheticDevice(50, 16, 8, 4, derived=10),
+    "large": SyntheticDevice(150, 32, 8, 4, derived=50),
+    "huge": SyntheticDevice(300, 48, 12, 4, derived=100),
+}
+
+
+def synthetic_svd(shape: SyntheticDevice) -> str:
+    return "".join(_svd_parts(shape))
+
+
+def _svd_parts(shape: SyntheticDevice) -> Iterator[str]:
+    yield _HEADER.format(name=shape.name)
+    for p in range(shape.peripherals):
+        yield from _peripheral(shape, p)
+    for d in range(shape.derived):
+        base = d % shape.peripherals
+        index = shape.peripherals + d
+        yield (
+            f'    <peripheral derivedFrom="PERIPH{base}">\n'
+            f"      <name>PERIPH{index}</name>\n"
+            f"      <baseAddress>{_base_address(index):#010x}</baseAddress>\n"
+            "    </peripheral>\n"
+        )
+    yield _FOOTER
+
+
+def _base_address(index: int) -> int:
+    return 0x40000000 + index * 0x1000
+
+
+def _peripheral(shape: SyntheticDevice, p: int) -> Iterator[str]:
+    yield (
+        "    <peripheral>\n"
+        f"      <name>PERIPH{p}</name>\n"
+        f"      <description>Synthetic peripheral {p}</description>\n"
+        f"      <groupName>GROUP{p % 8}</groupName>\n"
+        f"      <baseAddress>{_base_address(p):#010x}</baseAddress>\n"
+        "      <addressBlock>\n"
+        "        <offset>0x0</offset>\n"
+        f"        <size>{max(4, shape.registers * 4):#x}</size>\n"
+        "        <usage>registers</usage>\n"
+        "      </addressBlock>\n"
+        "      <registers>\n"
+    )
+    for r in range(shape.registers):
+        yield (
+            "        <register>\n"
+            f"          <name>REG{r}</name>\n"
+            f"          <description>Synthetic register {r} of peripheral"
+            f" {p}</description>\n"
+            f"          <addressOffset>{r * 4:#x}</addressOffset>\n"
+            "          <size>32</size>\n"
+            "          <resetValue>0x0</resetValue>\n"
+            "          <fields>\n"
+        )
+        for f in range(shape.fields):
+            yield from _field(shape, f)
+        yield "          </fields>\n        </register>\n"
+    yield "      </registers>\n    </peripheral>\n"
+
+
+def _field(shape: SyntheticDevice, f: int) -> Iterator[str]:
+    width = shape.field_width
+    yield (
+        "            <field>\n"
+        f"              <name>FIELD{f}</name>\n"
+        f"              <description>Synthetic field {f}</description>\n"
+        f"              <bitOffset>{f * width}</bitOffset>\n"
+        f"              <bitWidth>{width}</bitWidth>\n"
+    )
+    values = min(shape.enums, 1 << width)
+    if values:
+        yield "              <enumeratedValues>\n"
+        for v in range(values):
+            yield (
+                "                <enumeratedValue>\n"
+                f"                  <name>VALUE{v}</name>\n"
+                f"                  <description>Value {v}</description>\n"
+                f"                  <value>{v:#x}</value>\n"
+                "                </enumeratedValue>\n"
+            )
+        yield "              </enumeratedValues>\n"
+    yield "            </field>\n"
+
+
+@click.command()
+@click.option(
+    "--preset",
+    type=click.Choice(list(PRESETS)),
+    help="Start from the counts of a preset, overridden by the other options.",
+)
+@click.option("--peripherals", type=click.IntRange(min=1))
+@click.option("--registers", type=click.IntRange(min=1))
+@click.option("--fields", type=click.IntRange(min=1, max=32))
+@click.option("--enums", type=click.IntRange(min=0))
+@click.option("--derived", type=click.IntRange(min=0))
+@click.argument("output", type=click.Path(dir_okay=False, path_type=Path))
+def main(preset, output: Path, **counts):
+    """Write a synthetic SVD file to OUTPUT"""
+    shape = PRESETS[preset or "small"].parameters()
+    shape.update({k: v for k, v in counts.items() if v is not None})
+    output.write_text(synthetic_svd(SyntheticDevice(**shape)), encoding="utf-8")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()  # pylint:disable=no-value-for-parameter
@@ -0,0 +1,264 @@
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+
+import click
+
+from register_code_gen.options import (
+    Options,
+    OutputOptions,
+    options_from_params,
+    output_options_from_params,
+)
+from register_code_gen.register_code_gen import (
+    model_options,
+    output_options,
+    rich_tracebacks_option,
+)
+from register_code_gen.sources import (
+    ARCHIVE_SEPARATOR,
+    COMPRESSED_OPENERS,
+    SvdSource,
+    archive_members,
+)
+
+
+@dataclass
+class BatchResult:
+    input_file: SvdSource
+    seconds: float
+    device_name: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def collect_inputs(
+    inputs: Iterable[str], manifest: Optional[Path] = None
+) -> List[SvdSource]:
+    """Expand directories, glob patterns and a manifest into SVD sources
+
+    `ARCHIVE!MEMBER` patterns select members of zip or pack archives.  A
+    manifest lists one path or pattern per line, relative to the manifest,
+    and may contain blank lines and `#` comments.
+    """
+    patterns = [(Path(), i) for i in inputs]
+    if manifest is not None:
+        for line in manifest.read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                patterns.append((manifest.parent, line))
+
+    found = {}
+    for base, pattern in patterns:
+        pattern, _, member = pattern.partition(ARCHIVE_SEPARATOR)
+        path = base / pattern
+        if path.is_dir():
+            paths = sorted(p for p in path.iterdir() if is_svd_file(p))
+        elif path.is_file():
+            paths = [path]
+        else:
+            paths = sorted(Path(p) for p in glob.glob(str(path)))
+
+        if member:
+            matches = [m for p in paths for m in archive_members(p, member)]
+        else:
+            matches = [SvdSource(p) for p in paths]
+        if not matches:
+            raise click.BadParameter(f"No SVD files match {base / pattern}")
+        for match in matches:
+            found.setdefault(match.resolve(), None)
+    return list(found)
+
+
+def is_svd_file(path: Path) -> bool:
+    suffixes = [s.lower() for s in path.suffixes[-2:]]
+    if suffixes and suffixes[-1] in COMPRESSED_OPENERS:
+        suffixes.pop()
+    return path.is_file() and suffixes[-1:] == [".svd"]
+
+
+def device_name(input_file: SvdSource) -> Optional[str]:
+    """Read the device name from the start of an SVD file
+
+    Stops parsing at the name, so it costs little even for large files.
+    Returns None when the file has no name or cannot be parsed, leaving the
+    error to be reported when it is generated.
+    """
+    depth = 0
+    try:
+        with input_file.open() as f:
+            for event, element in ElementTree.iterparse(f, ("start", "end")):
+                if event == "start":
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth == 1 and element.tag == "name" and element.text:
+                    return element.text.strip()
+    except (ElementTree.ParseError, OSError):
+        pass
+    return None
+
+
+def find_collisions(input_files: List[SvdSource]) -> Dict[SvdSource, SvdSource]:
+    """Map each input to the earlier input with the same device name
+
+    Devices are generated into directories named after them, so inputs that
+    share a device name would overwrite each other's output.
+    """
+    first_inputs: Dict[str, SvdSource] = {}
+    collisions = {}
+    for input_file in input_files:
+        name = device_name(input_file)
+        if name is None:
+            continue
+        first = first_inputs.setdefault(name.lower(), input_file)
+        if first != input_file:
+            collisions[input_file] = first
+    return collisions
+
+
+def generate_one(
+    input_file: SvdSource,
+    output_root: Path,
+    options: Options,
+    output_opts: OutputOptions = OutputOptions(),
+) -> BatchResult:
+    # pylint: disable-next=import-outside-toplevel
+    from register_code_gen.generator import run
+
+    start = time.perf_counter()
+    try:
+        device = run(
+            input_file,
+            options=options,
+            output_root=output_root,
+            output_options=output_opts,
+        )
+    except Exception:  # pylint: disable=broad-exception-caught
+        return BatchResult(
+            input_file,
+            time.perf_counter() - start,
+            error=traceback.format_exc(),
+        )
+    return BatchResult(input_file, time.perf_counter() - start, device.name)
+
+
+def generate_all(
+    input_files: List[SvdSource],
+    output_root: Path,
+    options: Options = Options(),
+    jobs: Optional[int] = None,
+    output_opts: OutputOptions = OutputOptions(),
+) -> List[BatchResult]:
+    """Generate every SVD file on a process pool, returning results in order
+
+    Only the first of several inputs with the same device name is generated,
+    the others fail without touching its output.
+    """
+    results = {
+        f: BatchResult(
+            f, 0.0, error=f"Same device name as {first}, not generated"
+        )
+        for f, first in find_collisions(input_files).items()
+    }
+    to_generate = [f for f in input_files if f not in results]
+    if jobs == 1:
+        for f in to_generate:
+            results[f] = generate_one(f, output_root, options, output_opts)
+        return [results[f] for f in input_files]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(generate_one, f, output_root, options, output_opts): f
+            for f in to_generate
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return [results[f] for f in input_files]
+
+
+def format_summary(results: List[BatchResult]) -> Tuple[str, int]:
+    width = max((len(r.input_file.name) for r in results), default=0)
+    lines = []
+    for r in results:
+        status = "ok" if r.ok else "FAILED"
+        name = r.device_name or ""
+        lines.append(
+            f"{r.input_file.name:<{width}}  {status:<6}  {r.seconds:8.3f}s  "
+            f"{name}"
+        )
+    failures = sum(not r.ok for r in results)
+    total = sum(r.seconds for r in results)
+    lines.append(
+        f"{len(results) - failures} succeeded, {failures} failed, "
+        f"{total:.3f}s of generation"
+    )
+    return "\n".join(lines), failures
+
+
+@click.command()
+@click.argument("inputs", nargs=-1)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="File listing SVD paths or glob patterns, one per line.",
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    default=Path(),
+    help="Each device is generated into a directory named after it here.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    "processes",
+    type=click.IntRange(min=1),
+    default=os.cpu_count(),
+    show_default="CPU count",
+    help="Number of worker processes.",
+)
+@output_options
+@model_options
+@rich_tracebacks_option
+def batch(
+    inputs: Tuple[str, ...],
+    manifest: Optional[Path],
+    output_dir: Path,
+    processes: int,
+    generation_params: Dict[str, Dict[str, Any]],
+):  # pragma: no cover
+    """Generate code for many SVD files, given as files, directories or glob patterns"""
+    input_files = collect_inputs(inputs, manifest)
+    options = options_from_params(**generation_params["model"])
+    output_opts = output_options_from_params(**generation_params["output"])
+
+    start = time.perf_counter()
+    results = generate_all(
+        input_files, output_dir, options, processes, output_opts
+    )
+    summary, failures = format_summary(results)
+
+    for r in results:
+        if not r.ok:
+            click.echo(f"{r.input_file}:\n{r.error}", err=True)
+    click.echo(summary)
+    click.echo(
+        f"Wall time {time.perf_counter() - start:.3f}s with {processes} jobs"
+    )
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    batch()  # pylint:disable=no-value-for-parameter
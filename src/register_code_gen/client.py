@@ -0,0 +1,129 @@
+import getpass
+import json
+import os
+import socket
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import click
+
+from register_code_gen.register_code_gen import model_options, output_options
+from register_code_gen.sources import SvdSource, SvdSourceParam
+
+DEFAULT_SOCKET = Path(tempfile.gettempdir()) / (
+    f"register-code-gen-{getpass.getuser()}.sock"
+)
+
+# Python on Windows has no Unix domain sockets
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+def require_unix_sockets():
+    """Stop a server or client command where there are no Unix sockets"""
+    if not UNIX_SOCKETS:
+        raise click.UsageError(
+            "The generation server and client talk over Unix domain sockets, "
+            "which this platform does not provide.  Run register-code-gen "
+            "instead."
+        )
+
+
+def socket_option(command):
+    return click.option(
+        "--socket",
+        "socket_path",
+        envvar="REGISTER_CODE_GEN_SOCKET",
+        type=click.Path(dir_okay=False, path_type=Path),
+        default=DEFAULT_SOCKET,
+        show_default=True,
+        help="Unix domain socket of the generation server.",
+    )(command)
+
+
+def send_request(socket_path: Path, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one request to the generation server and wait for its response
+
+    Requests and responses are single lines of JSON.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(str(socket_path))
+        s.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with s.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        err_msg = f"The server at {socket_path} closed the connection"
+        raise ConnectionError(err_msg)
+    return json.loads(line)
+
+
+def jsonable(value):
+    """Request parameters as JSON, with paths made absolute"""
+    if isinstance(value, dict):
+        return {k: jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, Path):
+        return str(value.resolve())
+    if isinstance(value, SvdSource):
+        return str(value.resolve())
+    return value
+
+
+@click.command()
+@socket_option
+@click.option(
+    "-i",
+    "--input-file",
+    required=True,
+    type=SvdSourceParam(),
+    help="SVD file, optionally compressed (.gz, .bz2, .xz), or a member of "
+    "a zip or pack archive given as ARCHIVE!MEMBER.",
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    type=click.Path(file_okay=True, dir_okay=True, path_type=Path),
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes rendering peripheral headers.",
+)
+@output_options
+@model_options
+def client(
+    socket_path: Path,
+    input_file: SvdSource,
+    output_dir: Optional[Path],
+    generation_params: Dict[str, Dict[str, Any]],
+):  # pragma: no cover
+    """Generate code on a running register-code-gen-server"""
+    require_unix_sockets()
+    request = jsonable(
+        {
+            "input_file": input_file,
+            "output_dir": output_dir,
+            "output_root": Path(os.getcwd()),
+            **generation_params,
+        }
+    )
+    try:
+        response = send_request(socket_path, request)
+    except (FileNotFoundError, ConnectionError) as e:
+        click.echo(
+            f"No generation server at {socket_path} ({e}), start one with "
+            "register-code-gen-server",
+            err=True,
+        )
+        raise SystemExit(2) from e
+    if not response["ok"]:
+        click.echo(response["error"], err=True)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    client()  # pylint:disable=no-value-for-parameter
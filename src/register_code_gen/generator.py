@@ -0,0 +1,587 @@
+import dataclasses
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import xmltodict
+
+from register_code_gen import profiling
+from register_code_gen.json_dump import LINES, model_document, write_json
+from register_code_gen.layout import (
+    derivation_root,
+    device_layout,
+    enum_field,
+    peripheral_layout,
+    peripheral_name,
+    shared_enums_layout,
+)
+from register_code_gen.manifest import OutputManifest, write_file
+from register_code_gen.options import (
+    MONOLITHIC,
+    Options,
+    OutputOptions,
+    options_from_params,
+    output_options_from_params,
+)
+from register_code_gen.profiling import SpanPath, metric, span
+from register_code_gen.rendering import Templates
+from register_code_gen.shared_enums import SharedEnums
+from register_code_gen.sources import SvdSource, as_source
+from svd import backend
+from svd.basic_elements import literal_cache_hit_rate, literal_cache_info
+from svd.device import Device
+from svd.field import Field
+from svd.peripheral import Peripheral
+from svd.stream import parse_device
+
+_logger = logging.getLogger(__name__)
+
+
+def run(
+    input_file: Union[SvdSource, Path],
+    output_dir: Optional[Path] = None,
+    options: Options = Options(),
+    output_root: Path = Path(),
+    output_options: OutputOptions = OutputOptions(),
+) -> Device:
+    """Generate code for one SVD file
+
+    Output goes to `output_dir`, or to a directory named after the device
+    under `output_root` when no directory is given.  Peripheral headers are
+    rendered on `jobs` worker processes.  An incremental run keeps a manifest
+    of content hashes in the output directory, leaves unchanged files alone
+    and deletes files the previous run generated that are no longer output.
+    """
+    return Generator(options, output_options).run(
+        input_file, output_dir, output_root
+    )
+
+
+def generate(
+    device: Device,
+    output_dir: Path,
+    output_options: OutputOptions = OutputOptions(),
+    options: Options = Options(),
+) -> Dict[str, str]:
+    """Generate code for an already loaded device model
+
+    Returns the content digest of each generated file, keyed by its path.
+    """
+    return Generator(options, output_options).generate(device, output_dir)
+
+
+@dataclass(frozen=True)
+class Generator:
+    """Generates code with a fixed set of options
+
+    A generator keeps no state between calls.  Everything a run accumulates
+    lives on the `OutputStructure` built for that run, so one generator can
+    be used for any number of devices, one after the other or from several
+    threads at once, as long as each run writes to its own output directory.
+    """
+
+    options: Options = Options()
+    output_options: OutputOptions = OutputOptions()
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Dict[str, Any]]) -> "Generator":
+        """A generator for the `model` and `output` options of a command"""
+        return cls(
+            options_from_params(**params.get("model", {})),
+            output_options_from_params(**params.get("output", {})),
+        )
+
+    def run(
+        self,
+        input_file: Union[SvdSource, Path],
+        output_dir: Optional[Path] = None,
+        output_root: Path = Path(),
+    ) -> Device:
+        """Load an SVD file and generate code for it, see `run`"""
+        with span("run", input_file=input_file):
+            device, svd_dict = load_device(input_file, self.options)
+            if output_dir is None:
+                # pylint: disable=no-member
+                output_dir = output_root / device.name.lower()
+            output = self.output_structure(device, output_dir)
+            self.dump_json(output, svd_dict)
+            # The raw document is not needed for generation, so free it early
+            del svd_dict
+            self.write(output)
+        return device
+
+    def generate(self, device: Device, output_dir: Path) -> Dict[str, str]:
+        output = self.output_structure(device, output_dir)
+        self.dump_json(output)
+        return self.write(output)
+
+    def output_structure(
+        self, device: Device, output_dir: Path
+    ) -> "OutputStructure":
+        """Create the output directory and the state of one run"""
+        output_options = self.output_options
+        output_dir.mkdir(parents=True, exist_ok=True)
+        manifest = None
+        if output_options.incremental:
+            manifest = OutputManifest.load(output_dir)
+        output = OutputStructure(output_dir, device, manifest)
+        output.templates = templates(self.options, output_options)
+        output.header_layout = output_options.header_layout
+        if output_options.shared_enums is not None:
+            with span("shared_enums"):
+                output.shared_enums = SharedEnums.from_device(
+                    device, output_options.shared_enums
+                )
+        return output
+
+    def dump_json(
+        self, output: "OutputStructure", svd_dict: Optional[dict] = None
+    ):
+        """Dump the raw SVD document, or the resolved model, as JSON"""
+        output_options = self.output_options
+        if output_options.json_format is None:
+            return
+        with span("json_dump", format=output_options.json_format):
+            self._dump_json(output, svd_dict)
+
+    def _dump_json(self, output: "OutputStructure", svd_dict: Optional[dict]):
+        output_options = self.output_options
+        if output_options.json_model:
+            document = model_document(output.device)
+        elif svd_dict is not None:
+            document = svd_dict
+        else:
+            _logger.warning(
+                "The raw SVD document is not available when streaming or "
+                "loading from the cache, use --json-model to dump the model "
+                "instead"
+            )
+            return
+        path = output.json_file
+        if output_options.json_format == LINES:
+            path = output.json_lines_file
+        write_json(path, document, output_options.json_format)
+
+    def write(self, output: "OutputStructure") -> Dict[str, str]:
+        """Render and write every generated file of a run"""
+        aliases, peripherals = self.header_peripherals(output.device)
+        jobs = self.output_options.jobs
+        with span("write_peripherals", jobs=jobs):
+            written = write_peripherals(output, peripherals, jobs)
+        written.update(self.write_device(output, peripherals, aliases))
+        if output.manifest is not None:
+            with span("manifest"):
+                output.manifest.save(written)
+        return written
+
+    def header_peripherals(
+        self, device: Device
+    ) -> Tuple[Dict[str, Peripheral], List[Peripheral]]:
+        """The peripherals that get a header of their own, sorted by name
+
+        Also returns the peripherals aliased to one of them when identical
+        layouts are deduplicated.
+        """
+        aliases = {}
+        if self.output_options.dedupe_layouts:
+            with span("dedupe_layouts"):
+                aliases = identical_layouts(device)
+        peripherals = [
+            p
+            for p in sorted(
+                device.peripherals, key=lambda peripheral: peripheral.name
+            )
+            if p.derived_from is None and p.name not in aliases
+        ]
+        return aliases, peripherals
+
+    def write_device(
+        self,
+        output: "OutputStructure",
+        peripherals: List[Peripheral],
+        aliases: Dict[str, Peripheral],
+    ) -> Dict[str, str]:
+        """Render and write the device header and source"""
+        with span("write_device"):
+            return self._write_device(output, peripherals, aliases)
+
+    def _write_device(
+        self,
+        output: "OutputStructure",
+        peripherals: List[Peripheral],
+        aliases: Dict[str, Peripheral],
+    ) -> Dict[str, str]:
+        if output.header_layout == MONOLITHIC:
+            includes = [
+                output.include_path(output.peripheral_header(p))
+                for p in peripherals
+            ]
+            declared = []
+        else:
+            # Drivers include the headers of the peripherals they use
+            includes = []
+            declared = peripherals
+        layout = device_layout(
+            output.device,
+            output.include_path(output.main_header),
+            includes,
+            aliases,
+            declared,
+        )
+        render = output.templates.render
+        with span("render"):
+            files = [
+                (output.main_header, render("device.h.j2", device=layout)),
+                (output.main_source, render("device.c.j2", device=layout)),
+            ]
+            if output.shared_enums is not None:
+                enums = shared_enums_layout(output.shared_enums)
+                files.append(
+                    (output.enums_header, render("enums.h.j2", enums=enums))
+                )
+        return write_files(output, files)
+
+
+def templates(options: Options, output_options: OutputOptions) -> Templates:
+    """The templates to render with, sharing the model cache directory"""
+    cache_dir = None
+    if options.cache is not None:
+        cache_dir = options.cache.cache_dir / "templates"
+    return Templates(output_options.template_dir, cache_dir)
+
+
+def load_device(
+    input_file: Union[SvdSource, Path], options: Options = Options()
+) -> Tuple[Device, Optional[dict]]:
+    """Load the device model, along with the raw SVD dict when it was built"""
+    with span("load"):
+        return _load_device(as_source(input_file), options)
+
+
+def _load_device(
+    source: SvdSource, options: Options
+) -> Tuple[Device, Optional[dict]]:
+    cache = options.cache
+    if cache is not None:
+        key = cache.key(
+            source, trusted=options.trusted, selection=options.selection
+        )
+        with span("cache_load"):
+            device = cache.load(key)
+        if device:
+            return device, None
+
+    cache_info = literal_cache_info()
+    with backend.trusted(options.trusted), source.open() as f:
+        if options.stream:
+            svd_dict = None
+            with span("parse_and_build"):
+                device = parse_device(f, options.selection)
+        else:
+            with span("parse"):
+                svd_dict = xmltodict.parse(f)
+            with span("build"):
+                device = Device.from_dict(
+                    svd_dict["device"], options.selection, resolve=False
+                )
+            with span("resolve"):
+                device.resolve_derived_from()
+    metric("literal_cache_hit_rate", literal_cache_hit_rate(cache_info))
+
+    if cache is not None:
+        with span("cache_store"):
+            cache.store(key, device)
+    return device, svd_dict
+
+
+@dataclass
+class OutputStructure:
+    output_root: Path
+    device: Device
+    manifest: Optional[OutputManifest] = None
+    shared_enums: Optional[SharedEnums] = None
+    templates: Templates = Templates()
+    header_layout: str = MONOLITHIC
+
+    @property
+    def json_file(self) -> Path:
+        # pylint: disable=no-member
+        return self.output_root / f"{self.device.name.lower()}.json"
+
+    @property
+    def json_lines_file(self) -> Path:
+        # pylint: disable=no-member
+        return self.output_root / f"{self.device.name.lower()}.jsonl"
+
+    @property
+    def src_dir(self) -> Path:
+        return self.output_root / "src"
+
+    @property
+    def include_root(self) -> Path:
+        return self.output_root / "include"
+
+    @property
+    def include_dir(self) -> Path:
+        # pylint: disable=no-member
+        return self.include_root / self.device.name.lower()
+
+    @property
+    def main_header(self) -> Path:
+        # pylint: disable=no-member
+        return self.include_dir / f"{self.device.name.lower()}.h"
+
+    @property
+    def enums_header(self) -> Path:
+        # pylint: disable=no-member
+        return self.include_dir / f"{self.device.name.lower()}_enums.h"
+
+    def peripheral_header(self, peripheral: Peripheral) -> Path:
+        return self.include_dir / f"{peripheral_name(peripheral).lower()}.h"
+
+    def peripheral_enums_header(self, peripheral: Peripheral) -> Path:
+        name = peripheral_name(peripheral).lower()
+        return self.include_dir / f"{name}_enums.h"
+
+    def peripheral_registers_header(self, peripheral: Peripheral) -> Path:
+        name = peripheral_name(peripheral).lower()
+        return self.include_dir / f"{name}_regs.h"
+
+    def include_path(self, header: Path) -> str:
+        return header.relative_to(self.include_root).as_posix()
+
+    @property
+    def main_source(self) -> Path:
+        # pylint: disable=no-member
+        return self.src_dir / f"{self.device.name.lower()}.c"
+
+
+def write_peripherals(
+    output: OutputStructure, peripherals: List[Peripheral], jobs: int = 1
+) -> Dict[str, str]:
+    """Render the header of each peripheral
+
+    Returns the content digest of each header, keyed by its path.
+    """
+    written = {}
+    if jobs == 1 or len(peripherals) < 2:
+        for p in peripherals:
+            written.update(write_peripheral(output, p))
+        return written
+
+    # Workers get the peripherals once, when they start, and are then only
+    # told which one to render.  Sending a peripheral per task would pickle
+    # the whole device along with it through its parent.
+    # Workers time their spans when the run is profiled, and send them back
+    # along with the headers, nested in the span the pool runs in.
+    span_path = profiling.current_path() if profiling.enabled() else None
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_start_peripheral_worker,
+        initargs=(output, peripherals, span_path),
+    ) as pool:
+        for headers, spans in pool.map(
+            _write_worker_peripheral, range(len(peripherals))
+        ):
+            written.update(headers)
+            for finished in spans:
+                profiling.emit(finished)
+    return written
+
+
+# Only ever set inside pool worker processes, each of which serves one run
+_worker_peripherals: Tuple[
+    Optional[OutputStructure], List[Peripheral], Optional[SpanPath]
+] = (None, [], None)
+
+
+def _start_peripheral_worker(
+    output: OutputStructure,
+    peripherals: List[Peripheral],
+    span_path: Optional[SpanPath],
+):
+    global _worker_peripherals  # pylint: disable=global-statement
+    _worker_peripherals = (output, peripherals, span_path)
+
+
+def _write_worker_peripheral(
+    index: int,
+) -> Tuple[Dict[str, str], List[profiling.Span]]:
+    output, peripherals, span_path = _worker_peripherals
+    if span_path is None:
+        return write_peripheral(output, peripherals[index]), []
+    with profiling.hook(profiling.Profile()) as recorder:
+        with profiling.within(span_path):
+            written = write_peripheral(output, peripherals[index])
+    return written, recorder.spans
+
+
+def write_peripheral(
+    output: OutputStructure, peripheral: Peripheral
+) -> Dict[str, str]:
+    with span("peripheral", peripheral=peripheral.name):
+        with span("render"):
+            headers = render_peripheral_headers(peripheral, output)
+        return write_files(output, headers)
+
+
+def write_files(
+    output: OutputStructure, files: List[Tuple[Path, str]]
+) -> Dict[str, str]:
+    with span("write_files"):
+        return dict(
+            write_file(path, text, output.manifest) for path, text in files
+        )
+
+
+def render_peripheral_headers(
+    peripheral: Peripheral, output: OutputStructure
+) -> List[Tuple[Path, str]]:
+    """Render the headers of a peripheral in the layout `output` asks for
+
+    A split peripheral gets a header with its enums, one with its register
+    and cluster types, which includes the enums, and one with its struct,
+    which includes the register types.
+    """
+    if output.header_layout == MONOLITHIC:
+        return [
+            (
+                output.peripheral_header(peripheral),
+                render_peripheral(peripheral, output),
+            )
+        ]
+
+    layout = peripheral_layout(peripheral, output.shared_enums)
+    headers = []
+    includes = []
+    if output.shared_enums is not None:
+        includes.append(output.include_path(output.enums_header))
+    elif any(t.kind == "register" and t.enums for t in layout.types):
+        enums = output.peripheral_enums_header(peripheral)
+        text = output.templates.render(
+            "peripheral_enums.h.j2", peripheral=layout
+        )
+        headers.append((enums, text))
+        includes.append(output.include_path(enums))
+
+    registers = output.peripheral_registers_header(peripheral)
+    text = output.templates.render(
+        "peripheral_registers.h.j2",
+        peripheral=dataclasses.replace(layout, includes=includes),
+    )
+    headers.append((registers, text))
+
+    text = output.templates.render(
+        "peripheral_struct.h.j2",
+        peripheral=dataclasses.replace(
+            layout, includes=[output.include_path(registers)]
+        ),
+    )
+    headers.append((output.peripheral_header(peripheral), text))
+    return headers
+
+
+def render_peripheral(
+    peripheral: Peripheral, output: Optional[OutputStructure] = None
+) -> str:
+    """Render the header of a peripheral, by default on its own"""
+    renderer = Templates()
+    shared = None
+    includes = []
+    if output is not None:
+        renderer = output.templates
+        shared = output.shared_enums
+    if shared is not None:
+        includes.append(output.include_path(output.enums_header))
+    layout = peripheral_layout(peripheral, shared, includes)
+    return renderer.render("peripheral.h.j2", peripheral=layout)
+
+
+def identical_layouts(device: Device) -> Dict[str, Peripheral]:
+    """Map peripherals to the first, by name, with an identical layout
+
+    Only peripherals that are not derived are compared.  The first of each
+    group is left out, so the result names the peripherals that need no
+    types of their own.
+    """
+    first_with_layout = {}
+    aliases = {}
+    for peripheral in sorted(device.peripherals, key=lambda p: p.name):
+        if peripheral.derived_from is not None:
+            continue
+        key = layout_key(peripheral)
+        first = first_with_layout.setdefault(key, peripheral)
+        if first is not peripheral:
+            aliases[peripheral.name] = first
+    return aliases
+
+
+def layout_key(peripheral: Peripheral) -> Tuple:
+    """Everything that shapes the generated types of a peripheral
+
+    Descriptions only end up in comments, and register names are compared
+    without the peripheral prefix they are generated without, so `USART1_CR1`
+    and `USART2_CR1` match.
+    """
+    return _container_layout_key(peripheral, peripheral)
+
+
+def _container_layout_key(parent, peripheral: Peripheral) -> Tuple:
+    registers = tuple(
+        sorted(
+            (
+                _member_template(r),
+                r.address_offset,
+                r.size,
+                r.access,
+                _dim_layout_key(r.dim),
+                tuple(
+                    sorted(
+                        _field_layout_key(f, peripheral) for f in r.fields or []
+                    )
+                ),
+            )
+            for r in parent.registers or []
+        )
+    )
+    clusters = tuple(
+        sorted(
+            (
+                _member_template(c),
+                c.header_struct_name,
+                c.address_offset,
+                _dim_layout_key(c.dim),
+                _container_layout_key(derivation_root(c), peripheral),
+            )
+            for c in parent.clusters or []
+        )
+    )
+    return registers, clusters
+
+
+def _member_template(element) -> str:
+    return element.name.replace(f"{element.parent.name}_", "", 1)
+
+
+def _dim_layout_key(dim) -> Optional[Tuple]:
+    if dim is None:
+        return None
+    return dim.dim, dim.dim_increment, tuple(dim.indices())
+
+
+def _field_layout_key(field: Field, peripheral: Peripheral) -> Tuple:
+    type_field = enum_field(field, peripheral)
+    enums = None
+    if type_field.enumerated_values:
+        enums = tuple((e.name, e.value) for e in type_field.enumerated_values)
+    return (
+        field.name,
+        field.bit_offset,
+        field.bit_width,
+        field.access,
+        type_field.name,
+        type_field.parent.size,
+        enums,
+    )
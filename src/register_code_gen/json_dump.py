@@ -0,0 +1,96 @@
+import dataclasses
+import enum
+import json
+from pathlib import Path
+from typing import Any, Iterator, TextIO
+
+PRETTY = "pretty"
+COMPACT = "compact"
+LINES = "lines"
+JSON_FORMATS = (PRETTY, COMPACT, LINES)
+
+# Containers this many levels deep are encoded whole, so the C encoder does
+# the work while only one peripheral's text is held in memory at a time.
+_STREAMED_DEPTH = 4
+
+
+def write_json(path: Path, document: dict, json_format: str):
+    """Write a device document, raw SVD or model, in `json_format`
+
+    `lines` writes JSON Lines: the device without its peripherals on the
+    first line, then one line per peripheral.
+    """
+    with path.open("w", encoding="utf-8") as f:
+        if json_format == PRETTY:
+            json.dump(document, f, indent=2)
+        elif json_format == COMPACT:
+            _write_compact(f, document, _STREAMED_DEPTH)
+        else:
+            for record in json_lines(document):
+                f.write(record)
+                f.write("\n")
+
+
+def json_lines(document: dict) -> Iterator[str]:
+    device = dict(document.get("device", document))
+    peripherals = device.pop("peripherals", None) or []
+    # Raw SVD wraps the list in <peripherals><peripheral>, models do not
+    if isinstance(peripherals, dict):
+        peripherals = peripherals.get("peripheral", [])
+    if isinstance(peripherals, dict):
+        peripherals = [peripherals]
+    yield _compact(device)
+    for peripheral in peripherals:
+        yield _compact(peripheral)
+
+
+def _write_compact(f: TextIO, value: Any, depth: int):
+    if depth == 0 or not isinstance(value, (dict, list)):
+        f.write(_compact(value))
+    elif isinstance(value, dict):
+        f.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                f.write(",")
+            f.write(_compact(str(key)))
+            f.write(":")
+            _write_compact(f, item, depth - 1)
+        f.write("}")
+    else:
+        f.write("[")
+        for i, item in enumerate(value):
+            if i:
+                f.write(",")
+            _write_compact(f, item, depth - 1)
+        f.write("]")
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def model_document(device) -> dict:
+    """The resolved device model as plain JSON data
+
+    Back references to parents are left out and derived elements name the
+    element they derive from, so the document has no cycles.
+    """
+    return {"device": _model_data(device)}
+
+
+def _model_data(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        data = {}
+        for field in dataclasses.fields(value):
+            if field.name == "parent":
+                continue
+            item = getattr(value, field.name)
+            if field.name == "derived_from" and item is not None:
+                item = item if isinstance(item, str) else item.name
+            data[field.name] = _model_data(item)
+        return data
+    if isinstance(value, (list, tuple)):
+        return [_model_data(item) for item in value]
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
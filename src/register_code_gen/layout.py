@@ -0,0 +1,595 @@
+import logging
+from dataclasses import dataclass, field
+from typing import (
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from register_code_gen.shared_enums import SharedEnum, SharedEnums
+from svd import backend
+from svd.basic_elements import Access
+from svd.cluster import Cluster
+from svd.device import Device
+from svd.dim import base_name
+from svd.enum_value import EnumeratedValues
+from svd.field import Field
+from svd.peripheral import Peripheral
+from svd.register import Register
+
+_logger = logging.getLogger(__name__)
+
+
+class EnumValueLayout(NamedTuple):
+    name: str
+    value: int
+    description: Optional[str] = None
+
+
+@dataclass
+class EnumLayout:
+    name: str
+    type_name: str
+    enum_name: str
+    description: Optional[str]
+    digits: int
+    values: List[EnumValueLayout]
+
+
+class BitFieldLayout(NamedTuple):
+    type_name: str
+    name: str
+    bit_width: int
+    description: Optional[str] = None
+    const: bool = False
+    reserved: bool = False
+
+
+@dataclass
+class RegisterLayout:
+    kind: ClassVar[str] = "register"
+
+    type_name: str
+    union_name: str
+    description: Optional[str]
+    size: int
+    enums: List[EnumLayout]
+    fields: List[BitFieldLayout]
+
+
+@dataclass
+class StructMember:
+    type_name: str
+    offset: int
+    name: str
+    count: Optional[int]
+    size: int
+    description: Optional[str] = None
+
+    @property
+    def end(self) -> int:
+        return self.offset + (self.count or 1) * self.size
+
+
+@dataclass
+class StructSlot:
+    """Members sharing one offset, after `reserved` bytes of padding"""
+
+    reserved_offset: int
+    reserved: int
+    members: List[StructMember]
+
+
+@dataclass
+class StructLayout:
+    kind: ClassVar[str] = "struct"
+
+    struct_name: str
+    type_name: str
+    description: Optional[str]
+    slots: List[StructSlot]
+    members: List[StructMember]
+    size: Optional[int] = None
+
+
+@dataclass
+class PeripheralLayout:
+    name: str
+    description: Optional[str]
+    device: Optional[Device]
+    derived_from: Optional[str]
+    includes: List[str]
+    types: List[Union[RegisterLayout, StructLayout]]
+    struct: StructLayout
+
+
+@dataclass
+class InstanceLayout:
+    type_name: str
+    name: str
+    addresses: List[int]
+    count: Optional[int] = None
+
+
+@dataclass
+class DeviceLayout:
+    device: Device
+    header: str
+    includes: List[str]
+    aliases: List[Tuple[str, str]]
+    instances: List[InstanceLayout]
+    declarations: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class SharedEnumsLayout:
+    prefix: str
+    enums: List[EnumLayout] = field(default_factory=list)
+
+
+def device_layout(
+    device: Device,
+    header: str,
+    includes: List[str],
+    aliases: Optional[Dict[str, Peripheral]] = None,
+    declared: Optional[List[Peripheral]] = None,
+) -> DeviceLayout:
+    """The main header and source of a device
+
+    `aliases` maps the peripherals that use the types of another peripheral
+    to that peripheral.  The struct types of the `declared` peripherals are
+    declared without including their headers.
+    """
+    instances = []
+    for peripheral in sorted(
+        device.peripherals,
+        key=lambda peripheral: peripheral.base_address,
+    ):
+        type_name = peripheral_type_name(derivation_root(peripheral))
+        if peripheral.is_array:
+            instances.append(
+                InstanceLayout(
+                    type_name,
+                    peripheral_name(peripheral).upper(),
+                    [p.base_address for p in peripheral.expand()],
+                    peripheral.dim.dim,
+                )
+            )
+            continue
+        for p in peripheral.expand():
+            instances.append(
+                InstanceLayout(type_name, p.name.upper(), [p.base_address])
+            )
+    return DeviceLayout(
+        device,
+        header,
+        includes,
+        [
+            (
+                peripheral_type_name(p),
+                f"{base_name(name).upper()}_peripheral_registers_t",
+            )
+            for name, p in sorted((aliases or {}).items())
+        ],
+        instances,
+        [
+            (peripheral_struct_name(p), peripheral_type_name(p))
+            for p in declared or []
+        ],
+    )
+
+
+def peripheral_layout(
+    peripheral: Peripheral,
+    shared: Optional[SharedEnums] = None,
+    includes: Optional[List[str]] = None,
+) -> PeripheralLayout:
+    derived_from = None
+    if peripheral.derived_from is not None:
+        derived_from = peripheral.derived_from.name
+    struct = struct_layout(
+        peripheral,
+        peripheral_struct_name(peripheral),
+        peripheral_type_name(peripheral),
+        peripheral.description,
+    )
+    return PeripheralLayout(
+        peripheral_name(peripheral),
+        peripheral.description,
+        peripheral.parent,
+        derived_from,
+        includes or [],
+        list(_type_layouts(peripheral, HeaderTypes(shared))),
+        struct,
+    )
+
+
+@dataclass
+class HeaderTypes:
+    """The types of the header being laid out
+
+    Each enum type is declared once per header, unless they all come from
+    the `shared` header.  The values of an enumeration that several fields
+    share are laid out once.
+    """
+
+    shared: Optional[SharedEnums] = None
+    written_enums: Set[str] = field(default_factory=set)
+    enum_values: Dict[int, List[EnumValueLayout]] = field(default_factory=dict)
+
+    def values_of(
+        self, enumerated_values: EnumeratedValues
+    ) -> List[EnumValueLayout]:
+        try:
+            return self.enum_values[id(enumerated_values)]
+        except KeyError:
+            values = enum_value_layouts(enumerated_values)
+            self.enum_values[id(enumerated_values)] = values
+            return values
+
+
+def _type_layouts(
+    parent, types: HeaderTypes
+) -> Iterator[Union[RegisterLayout, StructLayout]]:
+    """The types of the registers and clusters of a peripheral or cluster
+
+    Nested types come first, so every struct only refers to types declared
+    above it.  Derived clusters and every copy of a dim cluster use the type
+    of the cluster that describes them, so it is generated once.
+    """
+    for cluster in sorted(
+        parent.clusters or [], key=lambda cluster: cluster.address_offset
+    ):
+        if cluster.derived_from is None:
+            yield from _type_layouts(cluster, types)
+            yield cluster_layout(cluster)
+    for r in sorted(
+        parent.registers or [], key=lambda register: register.address_offset
+    ):
+        yield register_layout(r, types)
+
+
+def cluster_layout(cluster: Cluster) -> StructLayout:
+    return struct_layout(
+        cluster,
+        f"{cluster_type_name(cluster)}_s",
+        f"{cluster_type_name(cluster)}_t",
+        cluster.description,
+        cluster_size(cluster),
+    )
+
+
+def struct_layout(
+    parent,
+    struct_name: str,
+    type_name: str,
+    description: Optional[str],
+    size: Optional[int] = None,
+) -> StructLayout:
+    """Group the members of a struct by offset and pad the gaps between them
+
+    Members at the same offset share a slot and become a union.
+    """
+    members = list(struct_members(parent))
+    addressed_members = {}
+    for member in members:
+        addressed_members.setdefault(member.offset, []).append(member)
+
+    slots = []
+    current_offset = 0
+    for address in sorted(addressed_members.keys()):
+        reserved = max(address - current_offset, 0)
+        slot_members = sorted(
+            addressed_members[address], key=lambda member: member.name
+        )
+        slots.append(StructSlot(current_offset, reserved, slot_members))
+        current_offset += reserved
+        for member in slot_members:
+            current_offset = max(current_offset, member.end)
+    if current_offset < (size or 0):
+        slots.append(StructSlot(current_offset, size - current_offset, []))
+
+    return StructLayout(
+        struct_name,
+        type_name,
+        description,
+        slots,
+        sorted(members, key=lambda member: member.offset),
+        size,
+    )
+
+
+def register_layout(
+    register: Register, types: Optional[HeaderTypes] = None
+) -> RegisterLayout:
+    """The union type of a register, and the enums it declares first
+
+    Enum types the header already declares are left out.
+    """
+    if types is None:
+        types = HeaderTypes()
+    shared = types.shared
+    written_enums = types.written_enums
+    p_name = scope_name(register)
+    reg_name = register_name(register).lower()
+
+    peripheral = enclosing_peripheral(register)
+
+    enums = []
+    fields = []
+    current_offset = 0
+    for f in sorted(register.fields or [], key=lambda f: f.bit_offset):
+        if (
+            f.enumerated_values is not None
+            and shared is None
+            and enum_field(f, peripheral) is f
+        ):
+            field_name = f"{p_name}_{f.name.lower()}"
+            if field_name not in written_enums:
+                written_enums.add(field_name)
+                enums.append(
+                    enum_layout(
+                        field_name,
+                        f.description,
+                        f.bit_width,
+                        types.values_of(f.enumerated_values),
+                    )
+                )
+        if current_offset < f.bit_offset:
+            fields.append(
+                BitFieldLayout(
+                    f"uint{register.size}_t",
+                    f"reserved_{current_offset:02}",
+                    f.bit_offset - current_offset,
+                    None,
+                    True,
+                    True,
+                )
+            )
+        fields.append(field_layout(f, shared, register, p_name))
+        current_offset = f.bit_offset + f.bit_width
+
+    return RegisterLayout(
+        f"{p_name.upper()}_{reg_name}_t",
+        f"{p_name.upper()}_{reg_name}_u",
+        register.description,
+        register.size,
+        enums,
+        fields,
+    )
+
+
+def field_layout(
+    svd_field: Field,
+    shared: Optional[SharedEnums] = None,
+    register: Optional[Register] = None,
+    register_scope: Optional[str] = None,
+) -> BitFieldLayout:
+    """The declaration of a field, typed by its enum if it has one
+
+    `register_scope` is the scope name of `register`, the register being laid
+    out, which declares the enum types of the fields that have their own.
+    Fields it inherited from a register elsewhere are typed the same way.
+    """
+    peripheral = None
+    if register is not None:
+        peripheral = enclosing_peripheral(register)
+    type_field = enum_field(svd_field, peripheral)
+    if type_field.enumerated_values and shared is not None:
+        field_type = shared.type_name(type_field.enumerated_values)
+    elif type_field.enumerated_values:
+        if type_field is svd_field and register_scope is not None:
+            p_name = register_scope
+        else:
+            p_name = scope_name(type_field.parent)
+        field_type = f"{p_name}_{type_field.name.lower()}_t"
+    else:
+        field_type = f"uint{type_field.parent.size}_t"
+
+    return BitFieldLayout(
+        field_type,
+        svd_field.name.lower(),
+        svd_field.bit_width,
+        svd_field.description,
+        svd_field.access == Access.READ_ONLY,
+        False,
+    )
+
+
+def enum_layout(
+    name: str,
+    description: Optional[str],
+    bit_width: int,
+    values: List[EnumValueLayout],
+) -> EnumLayout:
+    return EnumLayout(
+        name,
+        f"{name}_t",
+        f"{name}_e",
+        description,
+        int(bit_width / 4) + 1,
+        values,
+    )
+
+
+def enum_value_layouts(
+    enumerated_values: EnumeratedValues,
+) -> List[EnumValueLayout]:
+    """The enumerators of an enum type, named without the type prefix"""
+    return [
+        EnumValueLayout(value.name.lower(), value.value, value.description)
+        for value in enumerated_values
+    ]
+
+
+def shared_enums_layout(shared: SharedEnums) -> SharedEnumsLayout:
+    return SharedEnumsLayout(
+        shared.prefix,
+        [_shared_enum_layout(enum) for enum in shared.enums.values()],
+    )
+
+
+def _shared_enum_layout(enum: SharedEnum) -> EnumLayout:
+    return enum_layout(
+        enum.name,
+        enum.description,
+        enum.bit_width,
+        enum_value_layouts(enum.values),
+    )
+
+
+def struct_members(parent) -> Iterator[StructMember]:
+    """Yield the members of the struct for a peripheral or cluster
+
+    A dim array whose elements are packed back to back becomes one C array.
+    Other dim elements are unrolled into a member per copy, all of the one
+    type written for the element that describes them.
+    """
+    for register in parent.registers or []:
+        type_name = f"{scope_name(register).upper()}_{register_name(register).lower()}_t"
+        size = int(register.size / 8)
+        yield from _dim_members(
+            register,
+            register_name(register),
+            type_name,
+            size,
+            register.is_array and register.dim.dim_increment == size,
+        )
+    for cluster in parent.clusters or []:
+        type_cluster = derivation_root(cluster)
+        size = cluster_size(type_cluster)
+        yield from _dim_members(
+            cluster,
+            cluster_name(cluster),
+            f"{cluster_type_name(type_cluster)}_t",
+            size,
+            cluster.is_array and cluster.dim.dim_increment == size,
+        )
+
+
+def _dim_members(
+    element, name: str, type_name: str, size: int, packed: bool
+) -> Iterator[StructMember]:
+    offset = element.address_offset
+    description = element.description
+    if element.dim is None:
+        yield StructMember(
+            type_name, offset, name.lower(), None, size, description
+        )
+    elif packed:
+        count = element.dim.dim
+        yield StructMember(
+            type_name, offset, name.lower(), count, size, description
+        )
+    else:
+        template = element.name.replace(f"{element.parent.name}_", "", 1)
+        for index, copy in zip(element.dim.indices(), element.expand()):
+            member = template.replace("[%s]", index).replace("%s", index)
+            yield StructMember(
+                type_name,
+                copy.address_offset,
+                member.lower(),
+                None,
+                size,
+                description,
+            )
+
+
+def cluster_size(cluster: Cluster) -> int:
+    """Size in bytes of a cluster struct, padded to the stride of its array"""
+    size = max((m.end for m in struct_members(cluster)), default=0)
+    if cluster.is_array:
+        if cluster.dim.dim_increment < size:
+            err_msg = (
+                f"{cluster.name} copies are {cluster.dim.dim_increment} bytes"
+                f" apart but its registers span {size} bytes"
+            )
+            _logger.error(err_msg)
+            raise ValueError(err_msg)
+        size = cluster.dim.dim_increment
+    return size
+
+
+def derivation_root(element):
+    """The element at the end of the derivedFrom chain of `element`
+
+    Only elements that are not derived get types of their own, so derived
+    elements use the types of the root of their chain.
+    """
+    while element.derived_from is not None:
+        element = element.derived_from
+    return element
+
+
+def enum_field(
+    svd_field: Field, peripheral: Optional[Peripheral] = None
+) -> Field:
+    """The field that declares the enum type of `svd_field`
+
+    A derived field that inherited its enumerated values uses the enum of the
+    field it inherited them from, as long as that field is in `peripheral`,
+    by default the peripheral of `svd_field`.  Each header only declares the
+    enums of its own peripheral, so a field derived from another peripheral
+    gets an enum of its own.
+    """
+    if peripheral is None:
+        peripheral = enclosing_peripheral(svd_field.parent)
+    while (
+        svd_field.derived_from is not None
+        and svd_field.enumerated_values
+        is svd_field.derived_from.enumerated_values
+        and enclosing_peripheral(svd_field.derived_from.parent) is peripheral
+    ):
+        svd_field = svd_field.derived_from
+    return svd_field
+
+
+def enclosing_peripheral(element) -> Peripheral:
+    """The peripheral a register or cluster is in"""
+    parent = element.parent
+    while backend.is_model(parent, Cluster):
+        parent = parent.parent
+    return parent
+
+
+def peripheral_struct_name(peripheral: Peripheral) -> str:
+    return f"{peripheral_name(peripheral).upper()}_peripheral_registers_s"
+
+
+def peripheral_type_name(peripheral: Peripheral) -> str:
+    return f"{peripheral_name(peripheral).upper()}_peripheral_registers_t"
+
+
+def scope_name(element) -> str:
+    """The peripheral and cluster names enclosing a register or cluster"""
+    names = []
+    parent = element.parent
+    while backend.is_model(parent, Cluster):
+        names.append(cluster_name(parent))
+        parent = parent.parent
+    names.append(peripheral_name(parent))
+    return "_".join(reversed(names))
+
+
+def cluster_name(cluster: Cluster) -> str:
+    return base_name(cluster.header_struct_name or cluster.name)
+
+
+def cluster_type_name(cluster: Cluster) -> str:
+    return f"{scope_name(cluster).upper()}_{cluster_name(cluster).upper()}"
+
+
+def peripheral_name(peripheral: Peripheral):
+    return base_name(peripheral.name)
+
+
+def register_name(register: Register):
+    name: str = register.name
+    name = name.replace(f"{register.parent.name}_", "", 1)
+    return base_name(name)
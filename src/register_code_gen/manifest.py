@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+_logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".register-code-gen.json"
+MANIFEST_FORMAT = 1
+
+
+@dataclass
+class OutputManifest:
+    """Content hashes of the files the previous run generated
+
+    A file whose rendered bytes hash the same as last time is left alone, so
+    its modification time only changes when its content does and build tools
+    only rebuild what includes it.
+    """
+
+    output_dir: Path
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def path(self) -> Path:
+        return self.output_dir / MANIFEST_NAME
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "OutputManifest":
+        manifest = cls(output_dir)
+        try:
+            data = json.loads(manifest.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return manifest
+        except (OSError, ValueError) as e:
+            _logger.warning(
+                "Ignoring unreadable manifest %s: %s", manifest.path, e
+            )
+            return manifest
+        if data.get("format") == MANIFEST_FORMAT:
+            manifest.hashes = dict(data.get("files", {}))
+        return manifest
+
+    def key(self, path: Path) -> str:
+        return path.relative_to(self.output_dir).as_posix()
+
+    def is_current(self, path: Path, digest: str) -> bool:
+        """Whether `path` already holds the content hashing to `digest`"""
+        if not path.is_file():
+            return False
+        previous = self.hashes.get(self.key(path))
+        if previous is None:
+            # Not generated by an incremental run yet, so compare the bytes
+            previous = hashlib.sha256(path.read_bytes()).hexdigest()
+        return previous == digest
+
+    def save(self, written: Dict[str, str]):
+        """Record `written` and delete files the previous run left behind"""
+        for key in sorted(self.hashes.keys() - written.keys()):
+            stale = self.output_dir / key
+            _logger.info("Removing stale output %s", stale)
+            stale.unlink(missing_ok=True)
+
+        self.hashes = dict(written)
+        data = {
+            "format": MANIFEST_FORMAT,
+            "files": dict(sorted(written.items())),
+        }
+        self.path.write_text(
+            json.dumps(data, indent=2) + "\n", encoding="utf-8"
+        )
+
+
+def write_file(
+    path: Path, text: str, manifest: Optional[OutputManifest] = None
+) -> Tuple[str, str]:
+    """Write a rendered file with a single call, returning its key and digest
+
+    With a manifest, the file is only written when its content changed.
+    """
+    data = text.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    if manifest is not None and manifest.is_current(path, digest):
+        return manifest.key(path), digest
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    key = manifest.key(path) if manifest is not None else path.as_posix()
+    return key, digest
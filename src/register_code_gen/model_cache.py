@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import zlib
+from dataclasses import dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+from register_code_gen.sources import SvdSource, as_source
+
+if TYPE_CHECKING:
+    from svd.device import Device
+
+_logger = logging.getLogger(__name__)
+
+# Bump when the pickled model layout changes in a way the package version
+# does not capture, e.g. during development between releases.
+CACHE_FORMAT = 3
+CACHE_SUFFIX = ".model"
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def generator_version() -> str:
+    try:
+        return metadata.version("register-code-gen")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+@dataclass
+class ModelCache:
+    """On-disk cache of resolved device models keyed by SVD content
+
+    Entries are zlib-compressed pickles.  Reading an entry refreshes its
+    modification time, and the oldest entries are evicted once the directory
+    grows beyond `max_bytes`.
+    """
+
+    cache_dir: Path
+    max_bytes: int = 512 * 1024 * 1024
+
+    def key(self, svd_file: Union[SvdSource, Path], **variant) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{generator_version()}:{CACHE_FORMAT}".encode())
+        for name, value in sorted(variant.items()):
+            digest.update(f":{name}={value!r}".encode())
+        digest.update(b"\0")
+        with as_source(svd_file).open() as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def load(self, key: str) -> Optional["Device"]:
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            device = pickle.loads(zlib.decompress(data))
+        except Exception:  # pylint: disable=broad-exception-caught
+            _logger.warning("Discarding unreadable cache entry %s", path)
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        _logger.debug("Loaded %s from %s", device.name, path)
+        return device
+
+    def store(self, key: str, device: "Device"):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(
+            pickle.dumps(device, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        # Write then rename so concurrent builds never read a partial entry
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".tmp", delete=False
+        ) as f:
+            f.write(data)
+        os.replace(f.name, self.path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _logger.debug("Evicting %s", path)
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from svd.selection import PeripheralSelection
+
+if TYPE_CHECKING:
+    from register_code_gen.model_cache import ModelCache
+
+
+@dataclass(frozen=True)
+class Options:
+    """How a device model is loaded for generation"""
+
+    stream: bool = False
+    trusted: bool = False
+    selection: Optional[PeripheralSelection] = None
+    cache: Optional["ModelCache"] = None
+
+
+def options_from_params(**params: Any) -> Options:
+    """Build `Options` from the model options of a command
+
+    Options that are left out keep their command line defaults.
+    """
+    cache = None
+    if params.get("cache_dir") is not None:
+        # pylint: disable-next=import-outside-toplevel
+        from register_code_gen.model_cache import ModelCache
+
+        cache_size = params.get("cache_size", 512)
+        cache = ModelCache(params["cache_dir"], cache_size * 1024 * 1024)
+    selection = None
+    include = tuple(params.get("include_peripherals", ()))
+    exclude = tuple(params.get("exclude_peripherals", ()))
+    if include or exclude:
+        selection = PeripheralSelection(include, exclude)
+    return Options(
+        params.get("stream", False),
+        params.get("trusted", False),
+        selection,
+        cache,
+    )
+
+
+MONOLITHIC = "monolithic"
+SPLIT = "split"
+HEADER_LAYOUTS = (MONOLITHIC, SPLIT)
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """How generated files are rendered and written"""
+
+    jobs: int = 1
+    incremental: bool = False
+    dedupe_layouts: bool = False
+    shared_enums: Optional[str] = None
+    template_dir: Optional[Path] = None
+    header_layout: str = MONOLITHIC
+    json_format: Optional[str] = None
+    json_model: bool = False
+
+
+def output_options_from_params(**params: Any) -> OutputOptions:
+    """Build `OutputOptions` from the output options of a command"""
+    return OutputOptions(**params)
@@ -0,0 +1,236 @@
+import contextlib
+import contextvars
+import cProfile
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SpanPath = Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class Span:
+    """A timed phase of a run
+
+    `path` holds the names of the spans it ran in, ending with its own, so
+    the per-peripheral spans of a run are `("run", "write_peripherals",
+    "peripheral")`.  `start` is a `time.perf_counter` reading.
+    """
+
+    path: SpanPath
+    start: float
+    seconds: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    process: int = 0
+    thread: int = 0
+
+    @property
+    def name(self) -> str:
+        return self.path[-1]
+
+
+class ProfileHook:
+    """Receives the spans and metrics of runs while it is installed
+
+    Build tools override the methods they need and install the hook with
+    `hook` around the runs they want to measure.  Spans are reported as they
+    end, so nested spans come before the span they ran in.
+    """
+
+    def on_span(self, finished: Span):
+        pass
+
+    def on_metric(self, name: str, value: float):
+        pass
+
+
+_hooks: contextvars.ContextVar[
+    Tuple[ProfileHook, ...]
+] = contextvars.ContextVar("hooks", default=())
+_path: contextvars.ContextVar[SpanPath] = contextvars.ContextVar(
+    "path", default=()
+)
+
+
+@contextlib.contextmanager
+def hook(profile_hook: ProfileHook) -> Iterator[ProfileHook]:
+    """Report the spans and metrics of runs in the context to `profile_hook`"""
+    token = _hooks.set(_hooks.get() + (profile_hook,))
+    try:
+        yield profile_hook
+    finally:
+        _hooks.reset(token)
+
+
+def enabled() -> bool:
+    return bool(_hooks.get())
+
+
+def current_path() -> SpanPath:
+    return _path.get()
+
+
+@contextlib.contextmanager
+def within(path: SpanPath):
+    """Nest spans in `path`, for work handed to another process"""
+    token = _path.set(path)
+    try:
+        yield
+    finally:
+        _path.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Time the code in the context as a span named `name`
+
+    Costs next to nothing while no hook is installed.
+    """
+    if not _hooks.get():
+        yield
+        return
+    path = _path.get() + (name,)
+    token = _path.set(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _path.reset(token)
+        emit(
+            Span(
+                path,
+                start,
+                seconds,
+                attributes,
+                os.getpid(),
+                threading.get_ident(),
+            )
+        )
+
+
+def emit(finished: Span):
+    """Report a span to the installed hooks"""
+    for profile_hook in _hooks.get():
+        profile_hook.on_span(finished)
+
+
+def metric(name: str, value: float):
+    """Report a measurement that is not a duration to the installed hooks"""
+    for profile_hook in _hooks.get():
+        profile_hook.on_metric(name, value)
+
+
+@dataclass
+class PhaseTotal:
+    path: SpanPath
+    count: int = 0
+    seconds: float = 0.0
+    longest: float = 0.0
+
+
+@dataclass
+class Profile(ProfileHook):
+    """Collects every span and metric of the runs it is installed for"""
+
+    spans: List[Span] = field(default_factory=list)
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    def on_span(self, finished: Span):
+        self.spans.append(finished)
+
+    def on_metric(self, name: str, value: float):
+        self.metrics[name] = value
+
+    def totals(self) -> List[PhaseTotal]:
+        """Time spent in each phase, in the order the phases first started"""
+        totals: Dict[SpanPath, PhaseTotal] = {}
+        for s in sorted(self.spans, key=lambda s: s.start):
+            total = totals.setdefault(s.path, PhaseTotal(s.path))
+            total.count += 1
+            total.seconds += s.seconds
+            total.longest = max(total.longest, s.seconds)
+        # Show each phase under the phase it ran in
+        order = {path: i for i, path in enumerate(totals)}
+        return sorted(
+            totals.values(),
+            key=lambda t: [
+                order.get(t.path[: i + 1], -1) for i in range(len(t.path))
+            ],
+        )
+
+    def table(self) -> str:
+        """The totals as a table, followed by the metrics"""
+        totals = self.totals()
+        overall = sum(t.seconds for t in totals if len(t.path) == 1)
+        lines = [
+            f"{'phase':<32} {'count':>7} {'total':>10} {'mean':>10}"
+            f" {'max':>10} {'share':>6}"
+        ]
+        for t in totals:
+            name = "  " * (len(t.path) - 1) + t.path[-1]
+            share = t.seconds / overall if overall else 0.0
+            lines.append(
+                f"{name:<32} {t.count:>7} {t.seconds:>9.3f}s"
+                f" {t.seconds / t.count:>9.3f}s {t.longest:>9.3f}s"
+                f" {share:>6.1%}"
+            )
+        for name, value in self.metrics.items():
+            lines.append(f"{name:<32} {value:>7.3f}")
+        return "\n".join(lines)
+
+    def trace(self) -> Dict[str, Any]:
+        """The spans in the Chrome trace event format
+
+        Traces open in Perfetto or chrome://tracing.  The metrics are kept
+        in `otherData`.
+        """
+        origin = min((s.start for s in self.spans), default=0.0)
+        events = [
+            {
+                "name": s.name,
+                "cat": "/".join(s.path[:-1]),
+                "ph": "X",
+                "ts": (s.start - origin) * 1e6,
+                "dur": s.seconds * 1e6,
+                "pid": s.process,
+                "tid": s.thread,
+                "args": {k: str(v) for k, v in s.attributes.items()},
+            }
+            for s in self.spans
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"metrics": self.metrics},
+        }
+
+    def write_trace(self, path: Path):
+        path.write_text(json.dumps(self.trace()), encoding="utf-8")
+
+
+@contextlib.contextmanager
+def profile_run(
+    trace_file: Path, stats_file: Optional[Path] = None
+) -> Iterator[Profile]:
+    """Profile the runs in the context
+
+    Writes the trace of their spans to `trace_file` when the context ends,
+    and cProfile statistics, which `pstats` reads, to `stats_file`.
+    """
+    recorder = Profile()
+    profiler = cProfile.Profile() if stats_file is not None else None
+    with hook(recorder):
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield recorder
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(stats_file)
+            recorder.write_trace(trace_file)
@@ -1,18 +1,260 @@
-import json
-from dataclasses import dataclass
+import functools
+import importlib
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
 import click
-import xmltodict
-from rich.traceback import install
 
-from svd.basic_elements import Access
-from svd.device import Device
-from svd.field import Field
-from svd.peripheral import Peripheral
-from svd.register import Register
+from register_code_gen.json_dump import JSON_FORMATS
+
+# Options are also imported from here, where they used to live
+from register_code_gen.options import (  # pylint: disable=unused-import
+    HEADER_LAYOUTS,
+    MONOLITHIC,
+    SPLIT,
+    Options,
+    OutputOptions,
+    options_from_params,
+    output_options_from_params,
+)
+from register_code_gen.shared_enums import MODES
+from register_code_gen.sources import SvdSource, SvdSourceParam
+
+if TYPE_CHECKING:
+    from register_code_gen.generator import Generator
+
+# The generator pulls in the models, pydantic, xmltodict and jinja2, so it is
+# only imported once a command actually generates code.  Its public names
+# are still available from this module, where they used to live.
+_GENERATOR_NAMES = (
+    "Generator",
+    "OutputStructure",
+    "generate",
+    "identical_layouts",
+    "load_device",
+    "render_peripheral",
+    "render_peripheral_headers",
+    "run",
+    "write_peripheral",
+    "write_peripherals",
+)
+
+
+def __getattr__(name: str):
+    if name in _GENERATOR_NAMES:
+        generator = importlib.import_module("register_code_gen.generator")
+        return getattr(generator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-install()
+
+# Options a command gets grouped into one argument, keyed by their group
+MODEL_PARAMS = (
+    "stream",
+    "include_peripherals",
+    "exclude_peripherals",
+    "trusted",
+    "cache_dir",
+    "cache_size",
+)
+# `jobs` is grouped when the command renders peripherals on worker processes
+OUTPUT_PARAMS = (
+    "jobs",
+    "incremental",
+    "dedupe_layouts",
+    "shared_enums",
+    "template_dir",
+    "header_layout",
+    "json_format",
+    "json_model",
+)
+PROFILE_PARAMS = ("profile", "profile_trace", "profile_stats")
+
+
+def _grouped(
+    command, names: Tuple[str, ...], argument: str, group: Optional[str] = None
+):
+    """Pass the options `names` to `command` as one dict, named `argument`
+
+    With a `group`, the dict is the `group` entry of `argument`, so several
+    option groups share one argument.
+    """
+
+    @functools.wraps(command)
+    def wrapper(*args, **kwargs):
+        values = {name: kwargs.pop(name) for name in names if name in kwargs}
+        if group is None:
+            kwargs[argument] = values
+        else:
+            kwargs.setdefault(argument, {})[group] = values
+        return command(*args, **kwargs)
+
+    return wrapper
+
+
+def _install_rich_tracebacks(ctx, _param, value):
+    if value and not ctx.resilient_parsing:
+        # pylint: disable-next=import-outside-toplevel
+        from rich.traceback import install
+
+        install()
+
+
+def rich_tracebacks_option(command):
+    """Add the option that shows errors with rich tracebacks to a command"""
+    return click.option(
+        "--rich-tracebacks",
+        is_flag=True,
+        envvar="REGISTER_CODE_GEN_RICH_TRACEBACKS",
+        expose_value=False,
+        is_eager=True,
+        callback=_install_rich_tracebacks,
+        help="Show errors with rich tracebacks, including local variables, "
+        "for debugging.",
+    )(command)
+
+
+def model_options(command):
+    """Add the click options that build an `Options` to a command"""
+    decorators = [
+        click.option(
+            "--stream",
+            is_flag=True,
+            help="Build the model one peripheral at a time to bound memory "
+            "use. A raw --json dump is skipped since no whole-document tree "
+            "exists.",
+        ),
+        click.option(
+            "--peripheral",
+            "include_peripherals",
+            multiple=True,
+            metavar="GLOB",
+            help="Only generate peripherals matching this pattern, along with "
+            "the peripherals they derive from.  May be repeated.",
+        ),
+        click.option(
+            "--exclude-peripheral",
+            "exclude_peripherals",
+            multiple=True,
+            metavar="GLOB",
+            help="Do not generate peripherals matching this pattern.  May be "
+            "repeated.",
+        ),
+        click.option(
+            "--trusted",
+            is_flag=True,
+            help="Skip pydantic validation of the model for SVD files that "
+            "are already known to be valid.",
+        ),
+        click.option(
+            "--cache-dir",
+            envvar="REGISTER_CODE_GEN_CACHE_DIR",
+            type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+            help="Reuse parsed device models stored in this directory. A raw "
+            "--json dump is skipped when the model is loaded from the cache.",
+        ),
+        click.option(
+            "--cache-size",
+            default=512,
+            show_default=True,
+            help="Maximum size of the model cache in MiB.",
+        ),
+    ]
+    command = _grouped(command, MODEL_PARAMS, "generation_params", "model")
+    for decorator in reversed(decorators):
+        command = decorator(command)
+    return command
+
+
+def output_options(command):
+    """Add the click options that build an `OutputOptions` to a command"""
+    decorators = [
+        click.option(
+            "--incremental",
+            is_flag=True,
+            help="Only rewrite output files whose content changed, and delete "
+            "headers of peripherals that no longer exist.",
+        ),
+        click.option(
+            "--dedupe-layouts",
+            is_flag=True,
+            help="Generate the types of peripherals with identical register "
+            "layouts once, and alias the other peripherals to them.",
+        ),
+        click.option(
+            "--shared-enums",
+            type=click.Choice(MODES),
+            default=None,
+            help="Write each distinct enum type once, to a header shared by "
+            "all peripherals, matching enumerations by their values or by "
+            "their name.",
+        ),
+        click.option(
+            "--templates",
+            "template_dir",
+            type=click.Path(
+                exists=True, file_okay=False, dir_okay=True, path_type=Path
+            ),
+            help="Render output with the templates in this directory, using "
+            "the default template for any it does not contain.",
+        ),
+        click.option(
+            "--header-layout",
+            type=click.Choice(HEADER_LAYOUTS),
+            default=MONOLITHIC,
+            show_default=True,
+            help="Generate one header per peripheral, or split each into "
+            "enum, register and struct headers and only declare the "
+            "peripheral structs in the device header.",
+        ),
+        click.option(
+            "--json",
+            "json_format",
+            type=click.Choice(JSON_FORMATS),
+            default=None,
+            help="Also dump the device as JSON: indented, compact, or as "
+            "JSON Lines with one peripheral per line.",
+        ),
+        click.option(
+            "--json-model",
+            is_flag=True,
+            help="Dump the resolved device model instead of the raw SVD "
+            "document.",
+        ),
+    ]
+    command = _grouped(command, OUTPUT_PARAMS, "generation_params", "output")
+    for decorator in reversed(decorators):
+        command = decorator(command)
+    return command
+
+
+def profile_options(command):
+    """Add the click options that profile a run, as `profile_params`"""
+    decorators = [
+        click.option(
+            "--profile",
+            is_flag=True,
+            help="Print how long each phase of the run took, and write a "
+            "trace of the phases to --profile-trace.",
+        ),
+        click.option(
+            "--profile-trace",
+            type=click.Path(dir_okay=False, path_type=Path),
+            default="register-code-gen-trace.json",
+            show_default=True,
+            help="File --profile writes its trace to, in the Chrome trace "
+            "event format.",
+        ),
+        click.option(
+            "--profile-stats",
+            type=click.Path(dir_okay=False, path_type=Path),
+            help="Profile the run with cProfile as well, and write the "
+            "statistics to this file for pstats.  Implies --profile.",
+        ),
+    ]
+    command = _grouped(command, PROFILE_PARAMS, "profile_params")
+    for decorator in reversed(decorators):
+        command = decorator(command)
+    return command
 
 
 @click.command()
@@ -20,14 +262,9 @@
     "-i",
     "--input-file",
     prompt=True,
-    type=click.Path(
-        exists=True,
-        file_okay=True,
-        dir_okay=False,
-        readable=True,
-        resolve_path=True,
-        path_type=Path,
-    ),
+    type=SvdSourceParam(),
+    help="SVD file, optionally compressed (.gz, .bz2, .xz), or a member of "
+    "a zip or pack archive given as ARCHIVE!MEMBER.",
 )
 @click.option(
     "-o",
@@ -40,378 +277,64 @@
         path_type=Path,
     ),
 )
-def main(input_file: Path, output_dir: Path):  # pragma: no cover
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes rendering peripheral headers.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running, and regenerate the peripherals that changed each "
+    "time the SVD file is saved.",
+)
+@profile_options
+@output_options
+@model_options
+@rich_tracebacks_option
+def main(
+    input_file: SvdSource,
+    output_dir: Path,
+    watch: bool,
+    profile_params: Dict[str, Any],
+    generation_params: Dict[str, Dict[str, Any]],
+):  # pragma: no cover
     """Generate C header and dir from CMSIS-SVD which is often used to provide register descriptions for microcontrollers"""
 
-    with input_file.open("r", encoding="utf-8") as f:
-        data = f.read()
-    svd_dict = xmltodict.parse(data)
-    device = Device.from_dict(svd_dict["device"])
-
-    if output_dir is None:
-        output_dir = Path(device.name.lower())  # pylint: disable=no-member
-    output = OutputStructure(output_dir, device)
-
-    with output.json_file.open("w", encoding="utf-8") as f:
-        json.dump(svd_dict, f, indent=2)
-    output.main_header.parent.mkdir(parents=True, exist_ok=True)
-    output.main_header.open("w", encoding="utf-8")
-    output.main_source.parent.mkdir(parents=True, exist_ok=True)
-    output.main_source.open("w", encoding="utf-8")
-    write_header(output, device)
-    write_peripherals(output, device)
-    write_main_source(output, device)
-    write_footer(output, device)
-
-
-@dataclass
-class OutputStructure:
-    output_root: Path
-    device: Device
-
-    @property
-    def json_file(self) -> Path:
-        # pylint: disable=no-member
-        return self.output_root / f"{self.device.name.lower()}.json"
-
-    @property
-    def src_dir(self) -> Path:
-        return self.output_root / "src"
-
-    @property
-    def include_root(self) -> Path:
-        return self.output_root / "include"
-
-    @property
-    def include_dir(self) -> Path:
-        # pylint: disable=no-member
-        return self.include_root / self.device.name.lower()
-
-    @property
-    def main_header(self) -> Path:
-        # pylint: disable=no-member
-        return self.include_dir / f"{self.device.name.lower()}.h"
-
-    @property
-    def main_source(self) -> Path:
-        # pylint: disable=no-member
-        return self.src_dir / f"{self.device.name.lower()}.c"
-
-
-def write_header(output: OutputStructure, device: Device):
-    with output.main_header.open("a", encoding="utf-8") as f:
-        f.write("/**\n")
-        f.write("* @file\n")
-        try:
-            f.write(f"* @version {device.version}\n")
-        except AttributeError:
-            pass
-        try:
-            f.write(
-                f"* @brief Register access structs for {device.vendor} {device.name}\n"
-            )
-        except AttributeError:
-            pass
-        f.write("*\n")
-        try:
-            f.write(f"* {device.description}\n*\n")
-        except AttributeError:
-            pass
-        f.write("* @note This file is autogenerated using register-code-gen\n")
-        f.write("*/\n")
-        f.write("\n")
-        f.write(f"#ifndef {device.name}_H_\n")
-        f.write(f"#define {device.name}_H_\n")
-        f.write("\n")
-        f.write("#ifdef __cplusplus\n")
-        f.write('extern "C" {\n')
-        f.write("#endif\n")
-        f.write("\n")
-
-
-def write_main_source(output: OutputStructure, device: Device):
-    include_path = output.main_header.relative_to(output.include_root)
-    with output.main_header.open("a", encoding="utf-8") as h:
-        with output.main_source.open("a", encoding="utf-8") as c:
-            c.write(f'#include "{include_path}"\n\n')
-            for peripheral in sorted(
-                device.peripherals,
-                key=lambda peripheral: peripheral.base_address,
-            ):
-                type_name = (
-                    f"{peripheral.name.upper()}_peripheral_registers_t"
-                    if peripheral.derived_from is None
-                    else f"{peripheral.derived_from.name.upper()}_peripheral_registers_t"
-                )
-                c.write(
-                    f"{type_name} volatile * {peripheral.name.upper()} = (void *) (0x{peripheral.base_address:08X}UL);\n"
-                )
-                h.write(
-                    f"extern {type_name} volatile * {peripheral.name.upper()};\n"
-                )
-            h.write("\n")
-
-
-def write_footer(output: OutputStructure, device: Device):
-    with output.main_header.open("a", encoding="utf-8") as f:
-        f.write("#ifdef __cplusplus\n")
-        f.write("}\n")
-        f.write("#endif\n")
-        f.write(f"#endif // {device.name}_H_\n")
-
-
-def write_peripherals(output: OutputStructure, device: Device):
-    with output.main_header.open("a", encoding="utf-8") as f:
-        for p in sorted(
-            device.peripherals, key=lambda peripheral: peripheral.name
-        ):
-            if p.derived_from is None:
-                include_path = output.include_dir / f"{p.name.lower()}.h"
-                include_path = include_path.relative_to(output.include_root)
-                f.write(f'#include "{include_path}"\n')
-                write_peripheral(output, p)
-        f.write("\n")
-
-
-@dataclass
-class PeripheralOutputStructure:
-    output_root: Path
-    peripheral: Peripheral
-
-    @property
-    def src_dir(self) -> Path:
-        return self.output_root / "src"
-
-    @property
-    def include_root(self) -> Path:
-        return self.output_root / "include"
-
-    @property
-    def include_dir(self) -> Path:
-        return self.include_root / self.peripheral.parent.name.lower()
-
-    @property
-    def header(self) -> Path:
-        return self.include_dir / f"{self.peripheral.name.lower()}.h"
-
-
-def write_peripheral(output: OutputStructure, peripheral: Peripheral):
-    p_out = PeripheralOutputStructure(output.output_root, peripheral)
-    p_out.header.parent.mkdir(parents=True, exist_ok=True)
-    p_out.header.open("w", encoding="utf-8")
-    write_peripheral_header(p_out, peripheral)
-    write_peripheral_registers(p_out, peripheral)
-    write_peripheral_struct(p_out, peripheral)
-    write_peripheral_footer(p_out, peripheral)
-
-
-def write_peripheral_header(
-    output: PeripheralOutputStructure, peripheral: Peripheral
-):
-    with output.header.open("w", encoding="utf-8") as f:
-        f.write("/**\n")
-        f.write("* @file\n")
-        try:
-            f.write(f"* @version {peripheral.parent.version}\n")
-        except AttributeError:
-            pass
-        try:
-            f.write(
-                f"* @brief Register access structs for {peripheral.parent.vendor} {peripheral.name}\n"
-            )
-        except AttributeError:
-            pass
-        f.write("*\n")
-        try:
-            f.write(f"* {peripheral.description}\n")
-        except AttributeError:
-            pass
-        try:
-            f.write(f"* Derived From: {peripheral.derived_from.name}\n")
-        except AttributeError:
-            pass
-        f.write("*\n")
-        f.write("* @note This file is autogenerated using register-code-gen\n")
-        f.write("*/\n")
-        f.write("\n")
-        f.write(f"#ifndef {peripheral.name}_H_\n")
-        f.write(f"#define {peripheral.name}_H_\n")
-        f.write("\n")
-        f.write("#ifdef __cplusplus\n")
-        f.write('extern "C" {\n')
-        f.write("#endif\n")
-        f.write("\n")
-        f.write('#include "static_assert.h"\n')
-        f.write("\n")
-        f.write("#include <stdint.h>\n")
-        f.write("\n")
-
-
-def write_peripheral_footer(output: OutputStructure, peripheral: Peripheral):
-    with output.header.open("a", encoding="utf-8") as f:
-        f.write("#ifdef __cplusplus\n")
-        f.write("}\n")
-        f.write("#endif\n")
-        f.write(f"#endif // {peripheral.name}_H_\n")
-
-
-def write_peripheral_registers(output: OutputStructure, peripheral: Peripheral):
-    for r in sorted(
-        peripheral.registers, key=lambda register: register.address_offset
-    ):
-        write_register(output, r)
-
-
-def write_peripheral_struct(output: OutputStructure, peripheral: Peripheral):
-    type_name = f"{peripheral.name.upper()}_peripheral_registers_t"
-    struct_name = f"{peripheral.name.upper()}_peripheral_registers_s"
-    with output.header.open("a", encoding="utf-8") as f:
-        f.write(f"/**\n* {peripheral.description}\n*/\n")
-        f.write(f"typedef struct {struct_name} {{\n")
-
-        addressed_registers = {}
-        for register in peripheral.registers:
-            try:
-                addressed_registers[register.address_offset].append(register)
-            except KeyError:
-                addressed_registers[register.address_offset] = list([register])
-
-        current_offset = 0
-        for address in sorted(list(addressed_registers.keys())):
-            if current_offset < address:
-                reserved_bytes = int(address - current_offset)
-                f.write(
-                    f"uint8_t const reserved_0x{current_offset:02X}[{reserved_bytes}];\n"
-                )
-                current_offset += reserved_bytes
-            registers = addressed_registers[address]
-            if 1 < len(registers):
-                f.write("union{\n")
-
-            for register in sorted(
-                registers, key=lambda register: register.name
-            ):
-                reg_name: str = register_name(register)
-                reg_type = (
-                    f"{register.parent.name.upper()}_{reg_name.lower()}_t"
-                )
-                if hasattr(register, "description"):
-                    f.write(f"///{register.description}\n")
-                f.write(f"{reg_type} {reg_name.lower()};\n")
-                current_offset = register.address_offset + int(
-                    register.size / 8
-                )
-
-            if 1 < len(registers):
-                f.write("};\n")
-        f.write(f"}} {type_name};\n")
-        for register in sorted(
-            peripheral.registers, key=lambda register: register.address_offset
-        ):
-            reg_name: str = register_name(register)
-            f.write(
-                f"STATIC_ASSERT_MEMBER_OFFSET({type_name}, {reg_name.lower()}, 0x{register.address_offset:02X});\n"
-            )
-
-        f.write("\n")
-
-
-def register_name(register: Register):
-    name: str = register.name
-    name = name.replace(f"{register.parent.name}_", "", 1)
-    return name
-
-
-def write_register(output: PeripheralOutputStructure, register: Register):
-    write_enums(output, register)
-    reg_name: str = register_name(register)
-    with output.header.open("a", encoding="utf-8") as f:
-        type_name = f"{register.parent.name.upper()}_{reg_name.lower()}_t"
-        union_name = f"{register.parent.name.upper()}_{reg_name.lower()}_u"
-        if hasattr(register, "description"):
-            f.write(f"/**\n * {register.description} \n*/\n")
-        f.write(f"typedef union {union_name} {{\n")
-        f.write("struct {\n")
-
-        current_offset = 0
-        for field in sorted(
-            register.fields, key=lambda register: register.bit_offset
-        ):
-            if current_offset < field.bit_offset:
-                reserved_offset = current_offset
-                reserved_width = field.bit_offset - reserved_offset
-                write_reserved(
-                    f, register.size, reserved_offset, reserved_width
-                )
-                current_offset = reserved_offset + reserved_width
-            write_field(f, field)
-            current_offset = field.bit_offset + field.bit_width
-
-        f.write("};\n")
-        f.write(f"uint{register.size}_t bits;\n")
-        f.write(f"}} {type_name};\n")
-        f.write(
-            f"STATIC_ASSERT_TYPE_SIZE({type_name}, sizeof(uint{register.size}_t));\n"
-        )
-        f.write("\n")
-
-
-written_enums = set()
-
-
-def write_enums(output: PeripheralOutputStructure, register: Register):
-    peripheral_name = register.parent.name
-
-    with output.header.open("a", encoding="utf-8") as f:
-        for field in sorted(
-            register.fields, key=lambda register: register.bit_offset
-        ):
-            if None is field.enumerated_values:
-                continue
-
-            field_name = f"{peripheral_name}_{field.name.lower()}"
-            type_name = f"{field_name}_t"
-            enum_name = f"{field_name}_e"
-
-            if type_name in written_enums:
-                continue
-            written_enums.add(type_name)
-
-            f.write(f"/**\n * {field.description}\n */\n")
-            f.write(f"typedef enum {enum_name} {{\n")
-            width = str(int(field.bit_width / 4) + 1)
-
-            for enum_value in field.enumerated_values:
-                value = f"0x{enum_value.value:0{width}X}"
-                desc = enum_value.description
-                name = enum_value.name.lower()
-                f.write(f"///{desc}\n")
-                f.write(f"{field_name}_{name} = {value},\n")
-            f.write(f"}}{type_name};\n")
-            f.write("\n")
-
-
-def write_field(f, field: Field):
-    if field.derived_from is not None:
-        type_field = field.derived_from
-    else:
-        type_field = field
+    # pylint: disable-next=import-outside-toplevel
+    from register_code_gen.generator import Generator
 
-    if type_field.enumerated_values:
-        peripheral_name = type_field.parent.parent.name
-        field_name = f"{peripheral_name}_{type_field.name.lower()}"
-        field_type = f"{field_name}_t"
-    else:
-        size = type_field.parent.size
-        field_type = f"uint{size}_t"
+    generator = Generator.from_params(generation_params)
+    stats_file = profile_params["profile_stats"]
+    if not (profile_params["profile"] or stats_file):
+        _generate(generator, input_file, output_dir, watch)
+        return
 
-    const = "const" if field.access == Access.READ_ONLY else ""
-    f.write(f"///{field.description}\n")
-    f.write(f"{field_type} {const} {field.name.lower()}:{field.bit_width};\n")
+    # pylint: disable-next=import-outside-toplevel
+    from register_code_gen.profiling import profile_run
 
+    trace_file = profile_params["profile_trace"]
+    with profile_run(trace_file, stats_file) as recorder:
+        _generate(generator, input_file, output_dir, watch)
+    click.echo(recorder.table(), err=True)
 
-def write_reserved(f, reg_size, offset, width):
-    f.write(f"uint{reg_size}_t const reserved_{offset:02}:{width};\n")
+
+def _generate(
+    generator: "Generator",
+    input_file: SvdSource,
+    output_dir: Optional[Path],
+    watch: bool,
+):  # pragma: no cover
+    if watch:
+        # pylint: disable-next=import-outside-toplevel
+        from register_code_gen.watch import watch_svd
+
+        watch_svd(generator, input_file, output_dir)
+    else:
+        generator.run(input_file, output_dir)
 
 
 if __name__ == "__main__":  # pragma: no cover
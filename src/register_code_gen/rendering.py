@@ -0,0 +1,48 @@
+import functools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import jinja2
+
+DEFAULT_TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+
+@dataclass(frozen=True)
+class Templates:
+    """The template set generated files are rendered with
+
+    A template in `template_dir` replaces the default template of the same
+    name, so a custom set only needs the templates it changes.  Compiled
+    templates are cached as bytecode in `cache_dir`, or in a per-user
+    temporary directory, so later runs and worker processes load them instead
+    of compiling them again.
+    """
+
+    template_dir: Optional[Path] = None
+    cache_dir: Optional[Path] = None
+
+    def render(self, name: str, **context) -> str:
+        environment = _environment(self.template_dir, self.cache_dir)
+        return environment.get_template(name).render(**context)
+
+
+@functools.lru_cache(maxsize=None)
+def _environment(
+    template_dir: Optional[Path], cache_dir: Optional[Path]
+) -> jinja2.Environment:
+    search_path = [DEFAULT_TEMPLATE_DIR]
+    if template_dir is not None:
+        search_path.insert(0, template_dir)
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_dir = str(cache_dir)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(search_path),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir),
+        undefined=jinja2.StrictUndefined,
+        autoescape=False,
+        keep_trailing_newline=True,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
@@ -0,0 +1,221 @@
+import gc
+import json
+import logging
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Hashable, Tuple
+
+import click
+
+from register_code_gen.client import require_unix_sockets, socket_option
+from register_code_gen.generator import Generator, load_device
+from register_code_gen.options import Options
+from register_code_gen.sources import SvdSource
+from svd.device import Device
+
+_logger = logging.getLogger(__name__)
+
+
+def model_size(device: Device) -> int:
+    """Approximate the memory a device model holds, in bytes
+
+    Follows every reference from the device once, so elements shared between
+    peripherals are counted once.  Classes and what they reference are left
+    out.
+    """
+    seen = set()
+    pending = [device]
+    total = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        pending.extend(gc.get_referents(item))
+    return total
+
+
+@dataclass
+class ResidentModels:
+    """Device models kept in memory, evicting the least recently used
+
+    Models are keyed by the SVD file, its modification time and size, and
+    the options that change the model, so an edited file is parsed again.
+    Concurrent requests for a model that is still loading wait for that load
+    instead of parsing the file again.
+    """
+
+    max_bytes: int
+    entries: "OrderedDict[Hashable, Tuple[Device, int]]" = field(
+        default_factory=OrderedDict
+    )
+    loading: Dict[Hashable, Future] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def size(self) -> int:
+        return sum(size for _, size in self.entries.values())
+
+    @staticmethod
+    def key(source: SvdSource, options: Options) -> Hashable:
+        stat = source.path.stat()
+        return (
+            str(source),
+            stat.st_mtime_ns,
+            stat.st_size,
+            options.trusted,
+            options.selection,
+        )
+
+    def get(self, source: SvdSource, options: Options) -> Tuple[Device, bool]:
+        """The model of `source`, and whether it was already loaded"""
+        key = self.key(source, options)
+        with self.lock:
+            if (entry := self.entries.get(key)) is not None:
+                self.entries.move_to_end(key)
+                return entry[0], True
+            future = self.loading.get(key)
+            loader = future is None
+            if loader:
+                future = self.loading[key] = Future()
+        if not loader:
+            return future.result(), True
+
+        try:
+            device, _ = load_device(source, options)
+            size = model_size(device)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.loading[key]
+        future.set_result(device)
+        with self.lock:
+            self.store(key, device, size)
+        return device, False
+
+    def store(self, key: Hashable, device: Device, size: int):
+        if size > self.max_bytes:
+            _logger.info(
+                "Not keeping %s, its model alone exceeds the memory limit",
+                device.name,
+            )
+            return
+        self.entries[key] = (device, size)
+        total = self.size
+        while total > self.max_bytes:
+            _, (evicted, evicted_size) = self.entries.popitem(last=False)
+            _logger.info("Evicting the model of %s", evicted.name)
+            total -= evicted_size
+
+
+# Windows lacks the Unix server, where `serve` refuses to start instead
+_StreamServer = getattr(
+    socketserver, "ThreadingUnixStreamServer", socketserver.BaseServer
+)
+
+
+class GenerationServer(_StreamServer):
+    """Generates code on request, one thread per connection"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, max_bytes: int):
+        self.models = ResidentModels(max_bytes)
+        super().__init__(str(socket_path), GenerationHandler)
+
+    def generate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        model = {
+            name: tuple(value) if isinstance(value, list) else value
+            for name, value in request["model"].items()
+        }
+        if model.get("cache_dir") is not None:
+            model["cache_dir"] = Path(model["cache_dir"])
+        output = dict(request["output"])
+        if output.get("template_dir") is not None:
+            output["template_dir"] = Path(output["template_dir"])
+        generator = Generator.from_params({"model": model, "output": output})
+        options = generator.options
+
+        source = SvdSource.parse(request["input_file"])
+        device, cached = self.models.get(source, options)
+        output_dir = request.get("output_dir")
+        if output_dir is None:
+            # pylint: disable=no-member
+            output_dir = Path(request["output_root"]) / device.name.lower()
+        written = generator.generate(device, Path(output_dir))
+        return {
+            "ok": True,
+            "device": device.name,
+            "cached": cached,
+            "files": len(written),
+            "seconds": time.perf_counter() - start,
+        }
+
+
+class GenerationHandler(socketserver.StreamRequestHandler):
+    server: GenerationServer
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            response = self.server.generate(json.loads(line))
+        except Exception:  # pylint: disable=broad-exception-caught
+            response = {"ok": False, "error": traceback.format_exc()}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def remove_stale_socket(socket_path: Path):
+    """Remove a socket file left behind by a server that is gone"""
+    if not socket_path.exists():
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.connect(str(socket_path))
+    except ConnectionRefusedError:
+        socket_path.unlink()
+        return
+    err_msg = f"A server is already listening on {socket_path}"
+    _logger.error(err_msg)
+    raise ValueError(err_msg)
+
+
+@click.command()
+@socket_option
+@click.option(
+    "--memory",
+    type=click.IntRange(min=1),
+    default=1024,
+    show_default=True,
+    help="Memory in MiB the resident device models may use before the least "
+    "recently used ones are evicted.",
+)
+def serve(socket_path: Path, memory: int):  # pragma: no cover
+    """Serve code generation requests from register-code-gen-client"""
+    require_unix_sockets()
+    remove_stale_socket(socket_path)
+    with GenerationServer(socket_path, memory * 1024 * 1024) as server:
+        click.echo(f"Listening on {socket_path}, press Ctrl+C to stop")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    serve()  # pylint:disable=no-value-for-parameter
@@ -0,0 +1,108 @@
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple
+
+if TYPE_CHECKING:
+    from svd.device import Device
+    from svd.enum_value import EnumeratedValues
+    from svd.field import Field
+
+_logger = logging.getLogger(__name__)
+
+CONTENT = "content"
+NAME = "name"
+MODES = (CONTENT, NAME)
+
+
+@dataclass
+class SharedEnum:
+    """One enum type of the shared header, and what it is rendered from"""
+
+    name: str
+    description: Optional[str]
+    bit_width: int
+    values: "EnumeratedValues"
+
+
+@dataclass
+class SharedEnums:
+    """The enum types of a device, each written once to a common header
+
+    In `content` mode enumerations with the same values are one type.  In
+    `name` mode enumerations with the same `headerEnumName`, or `name`, are
+    one type.  Unnamed enumerations, and those whose name is already taken
+    by different values, are matched on their values in both modes.
+    """
+
+    prefix: str
+    mode: str = CONTENT
+    enums: Dict[Tuple, SharedEnum] = field(default_factory=dict)
+
+    @classmethod
+    def from_device(
+        cls, device: "Device", mode: str = CONTENT
+    ) -> "SharedEnums":
+        shared = cls(device.name.upper(), mode)
+        taken = set()
+        for f in _enum_fields(device):
+            values = f.enumerated_values
+            key = shared.key(values)
+            if key in shared.enums:
+                continue
+            enum_name = values.header_enum_name or values.name
+            if mode == NAME and enum_name is not None and key[0] == CONTENT:
+                _logger.warning(
+                    "Enumerations named %r have different values, giving"
+                    " those of field %s a type of their own",
+                    enum_name,
+                    f.name,
+                )
+
+            base = (enum_name or f.name).lower()
+            name = base
+            suffix = 2
+            while name in taken:
+                name = f"{base}_{suffix}"
+                suffix += 1
+            taken.add(name)
+            shared.enums[key] = SharedEnum(
+                f"{shared.prefix}_{name}", f.description, f.bit_width, values
+            )
+        return shared
+
+    def key(self, values: "EnumeratedValues") -> Tuple:
+        name = values.header_enum_name or values.name
+        if self.mode == NAME and name is not None:
+            named = self.enums.get((NAME, name))
+            if named is None or _values_key(named.values) == _values_key(
+                values
+            ):
+                return (NAME, name)
+        return (CONTENT, _values_key(values))
+
+    def type_name(self, values: "EnumeratedValues") -> str:
+        return f"{self.enums[self.key(values)].name}_t"
+
+
+def _values_key(values: "EnumeratedValues") -> Tuple:
+    return tuple((v.name, v.value) for v in values)
+
+
+def _enum_fields(device: "Device") -> Iterator["Field"]:
+    """Fields with enumerated values, in the order their headers list them"""
+
+    def walk(parent):
+        for cluster in sorted(
+            parent.clusters or [], key=lambda cluster: cluster.address_offset
+        ):
+            yield from walk(cluster)
+        for register in sorted(
+            parent.registers or [],
+            key=lambda register: register.address_offset,
+        ):
+            for f in sorted(register.fields or [], key=lambda f: f.bit_offset):
+                if f.enumerated_values:
+                    yield f
+
+    for peripheral in sorted(device.peripherals, key=lambda p: p.name):
+        yield from walk(peripheral)
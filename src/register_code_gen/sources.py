@@ -0,0 +1,133 @@
+import bz2
+import contextlib
+import fnmatch
+import gzip
+import lzma
+import mmap
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator, List, Optional
+
+import click
+
+# Separates an archive from the path of a member inside it, as in
+# `Keil.STM32F4xx_DFP.pack!CMSIS/SVD/STM32F407.svd`
+ARCHIVE_SEPARATOR = "!"
+
+COMPRESSED_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".lzma": lzma.open,
+}
+
+
+@dataclass(frozen=True)
+class SvdSource:
+    """An SVD file on disk, compressed, or inside a zip based archive"""
+
+    path: Path
+    member: Optional[str] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "SvdSource":
+        if ARCHIVE_SEPARATOR in text:
+            archive, member = text.split(ARCHIVE_SEPARATOR, 1)
+            return cls(Path(archive), member.lstrip("/"))
+        return cls(Path(text))
+
+    def __str__(self) -> str:
+        if self.member is None:
+            return str(self.path)
+        return f"{self.path}{ARCHIVE_SEPARATOR}{self.member}"
+
+    @property
+    def name(self) -> str:
+        if self.member is None:
+            return self.path.name
+        return PurePosixPath(self.member).name
+
+    def resolve(self) -> "SvdSource":
+        return SvdSource(self.path.resolve(), self.member)
+
+    def exists(self) -> bool:
+        if self.member is None:
+            return self.path.is_file()
+        if not zipfile.is_zipfile(self.path):
+            return False
+        with zipfile.ZipFile(self.path) as archive:
+            return self.member in archive.namelist()
+
+    @contextlib.contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """Open the SVD for reading without extracting it to disk
+
+        Archive members and compressed files are decompressed as they are
+        read.  Plain files are memory mapped.
+        """
+        if self.member is not None:
+            with zipfile.ZipFile(self.path) as archive:
+                with archive.open(self.member) as f:
+                    yield _decompress(f, self.member)
+            return
+
+        if opener := COMPRESSED_OPENERS.get(self.path.suffix.lower()):
+            with opener(self.path, "rb") as f:
+                yield f
+            return
+
+        with self.path.open("rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # Empty files and some special files cannot be mapped
+                mapped = None
+            if mapped is None:
+                yield f
+                return
+            with mapped:
+                yield mapped
+
+
+def _decompress(f: BinaryIO, name: str) -> BinaryIO:
+    if opener := COMPRESSED_OPENERS.get(PurePosixPath(name).suffix.lower()):
+        return opener(f, "rb")
+    return f
+
+
+def as_source(source) -> SvdSource:
+    """An SvdSource from a source, a path or `ARCHIVE!MEMBER` text
+
+    Only text names archive members, so a `Path` with the separator in it is
+    a plain file.
+    """
+    if isinstance(source, SvdSource):
+        return source
+    if isinstance(source, str):
+        return SvdSource.parse(source)
+    return SvdSource(Path(source))
+
+
+def archive_members(archive: Path, pattern: str) -> List[SvdSource]:
+    with zipfile.ZipFile(archive) as archive_file:
+        names = archive_file.namelist()
+    return [
+        SvdSource(archive, name)
+        for name in sorted(names)
+        if fnmatch.fnmatch(name, pattern)
+    ]
+
+
+class SvdSourceParam(click.ParamType):
+    """Click parameter accepting a file, compressed file or archive member"""
+
+    name = "svd"
+
+    def convert(self, value, param, ctx) -> SvdSource:
+        if isinstance(value, SvdSource):
+            return value
+        source = SvdSource.parse(value).resolve()
+        if not source.exists():
+            self.fail(f"{source} does not exist", param, ctx)
+        return source
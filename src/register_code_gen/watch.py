@@ -0,0 +1,281 @@
+import dataclasses
+import functools
+import hashlib
+import logging
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import click
+
+from register_code_gen.generator import Generator, write_peripheral
+from register_code_gen.sources import SvdSource, as_source
+from svd import backend
+from svd.device import Device
+from svd.peripheral import Peripheral
+from svd.stream import element_to_dict, parse_device
+
+_logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.2
+
+_PERIPHERAL_START = b"<peripheral"
+_PERIPHERAL_END = b"</peripheral>"
+_DERIVED_FROM = re.compile(rb"""derivedFrom\s*=\s*["']\s*([^"'.\s]+)""")
+_ENUM_NAME_REFERENCE = re.compile(
+    rb"""<enumeratedValues\s[^>]*derivedFrom\s*=\s*["']\s*[^"'.\s]+\s*["']"""
+)
+
+
+def split_peripherals(data: bytes) -> Tuple[bytes, List[bytes]]:
+    """Cut the `<peripheral>` elements out of an SVD document
+
+    Returns a digest of everything else in the document, along with the text
+    of each peripheral.  Plain byte searches are used instead of a parser, so
+    this stays fast on large files.
+    """
+    outline = hashlib.sha256()
+    view = memoryview(data)
+    texts = []
+    end = 0
+    start = data.find(_PERIPHERAL_START)
+    while start != -1:
+        tag_end = start + len(_PERIPHERAL_START)
+        if data[tag_end : tag_end + 1] not in (b">", b" ", b"\t", b"\r", b"\n"):
+            # <peripherals>
+            start = data.find(_PERIPHERAL_START, tag_end)
+            continue
+        close = data.find(_PERIPHERAL_END, tag_end)
+        if close == -1:
+            break
+        close += len(_PERIPHERAL_END)
+        outline.update(view[end:start])
+        texts.append(data[start:close])
+        end = close
+        start = data.find(_PERIPHERAL_START, end)
+    outline.update(view[end:])
+    return outline.digest(), texts
+
+
+@dataclass
+class _Chunk:
+    """The XML of one peripheral and the model built from it"""
+
+    digest: bytes
+    text: bytes
+    peripheral: Optional[Peripheral] = None
+
+    @functools.cached_property
+    def bases(self) -> Set[str]:
+        """Peripherals the derivedFrom references in this one start with"""
+        return {m.decode() for m in _DERIVED_FROM.findall(self.text)}
+
+    @functools.cached_property
+    def any_base(self) -> bool:
+        """Whether this peripheral may derive from any other one
+
+        An enumeratedValues reference by bare name is looked up in every
+        peripheral when this one does not define it, so which peripheral it
+        ends up in cannot be told from the name.
+        """
+        return _ENUM_NAME_REFERENCE.search(self.text) is not None
+
+
+@dataclass
+class WatchSession:
+    """Keeps a device model resident and regenerates it as its SVD changes
+
+    Each `<peripheral>` of the SVD is hashed separately.  When only some of
+    them change, just those are parsed and built again, along with the
+    peripherals whose derivedFrom references name one of them or may resolve
+    to any of them, and only their headers are rendered.  Changes outside the
+    peripherals, and any input the fast path cannot make sense of, reload the
+    whole device.  Files are written incrementally, so untouched headers keep
+    their modification time.
+    """
+
+    generator: Generator
+    svd_file: Union[SvdSource, Path]
+    output_dir: Optional[Path] = None
+    output_root: Path = Path()
+    device: Optional[Device] = None
+    chunks: Dict[bytes, _Chunk] = field(default_factory=dict)
+    outline: Optional[bytes] = None
+    headers: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    stat: Optional[Tuple[int, int]] = None
+
+    def __post_init__(self):
+        self.svd_file = as_source(self.svd_file)
+        # Unchanged files must not be rewritten, or build tools would rebuild
+        # everything after each edit
+        self.generator = dataclasses.replace(
+            self.generator,
+            output_options=dataclasses.replace(
+                self.generator.output_options, incremental=True
+            ),
+        )
+
+    def poll(self) -> Optional[Set[str]]:
+        """Regenerate when the SVD file changed since the last poll
+
+        Returns the names of the peripherals that were built again, or None
+        when the file did not change.
+        """
+        try:
+            stat = self.svd_file.path.stat()
+        except FileNotFoundError:
+            # Editors may replace the file by deleting and renaming
+            return None
+        current = (stat.st_mtime_ns, stat.st_size)
+        if current == self.stat:
+            return None
+        self.stat = current
+        return self.regenerate()
+
+    def regenerate(self) -> Set[str]:
+        with self.svd_file.open() as f:
+            data = f.read()
+        changed = self.update(data)
+        self.write(changed)
+        return changed
+
+    def update(self, data: bytes) -> Set[str]:
+        """Bring the model up to date with `data`, returning what was rebuilt"""
+        outline, texts = split_peripherals(data)
+        chunks = []
+        for text in texts:
+            digest = hashlib.sha256(text).digest()
+            chunks.append(self.chunks.get(digest) or _Chunk(digest, text))
+        if (
+            self.device is None
+            or outline != self.outline
+            or self.generator.options.selection is not None
+        ):
+            return self.reload(data, outline, chunks)
+        try:
+            return self.rebuild(outline, chunks)
+        except (ET.ParseError, ValueError) as e:
+            _logger.info("Reloading the whole device: %s", e)
+            return self.reload(data, outline, chunks)
+
+    def reload(
+        self, data: bytes, outline: bytes, chunks: List[_Chunk]
+    ) -> Set[str]:
+        self.chunks = {}
+        self.outline = None
+        options = self.generator.options
+        with backend.trusted(options.trusted):
+            device = parse_device(BytesIO(data), options.selection)
+        self.device = device
+        if options.selection is None and len(chunks) == len(device.peripherals):
+            for chunk, peripheral in zip(chunks, device.peripherals):
+                chunk.peripheral = peripheral
+            self.chunks = {chunk.digest: chunk for chunk in chunks}
+            self.outline = outline
+        self.headers = {}
+        return {p.name for p in device.peripherals}
+
+    def rebuild(self, outline: bytes, chunks: List[_Chunk]) -> Set[str]:
+        previous = {c.peripheral.name for c in self.chunks.values()}
+        # Reload from scratch next time should this fail half way through
+        self.chunks = {}
+        self.outline = None
+        changed = set()
+        with backend.trusted(self.generator.options.trusted):
+            with backend.sharing():
+                for chunk in chunks:
+                    if chunk.peripheral is None:
+                        chunk.peripheral = self.build(chunk)
+                        changed.add(chunk.peripheral.name)
+                gone = previous - {c.peripheral.name for c in chunks}
+
+                # Derived peripherals copied what they inherit from their
+                # bases, so they are built again whenever a base changes
+                while dependents := [
+                    c
+                    for c in chunks
+                    if c.peripheral.name not in changed
+                    and (
+                        c.bases & (changed | gone)
+                        or (c.any_base and (changed or gone))
+                    )
+                ]:
+                    for chunk in dependents:
+                        chunk.peripheral = self.build(chunk)
+                        changed.add(chunk.peripheral.name)
+
+            self.device.peripherals = [c.peripheral for c in chunks]
+            self.device.resolve_derived_from(
+                [c.peripheral for c in chunks if c.peripheral.name in changed]
+            )
+        self.chunks = {chunk.digest: chunk for chunk in chunks}
+        self.outline = outline
+        return changed
+
+    def build(self, chunk: _Chunk) -> Peripheral:
+        element = ET.fromstring(chunk.text)
+        return Peripheral.from_dict(element_to_dict(element), self.device)
+
+    def write(self, changed: Set[str]):
+        generator = self.generator
+        output_dir = self.output_dir
+        if output_dir is None:
+            # pylint: disable=no-member
+            output_dir = self.output_root / self.device.name.lower()
+        output = generator.output_structure(self.device, output_dir)
+        generator.dump_json(output)
+
+        aliases, peripherals = generator.header_peripherals(self.device)
+        # Shared enum names and layout aliases depend on every peripheral
+        everything = (
+            generator.output_options.shared_enums is not None
+            or generator.output_options.dedupe_layouts
+        )
+        headers = {}
+        for p in peripherals:
+            if everything or p.name in changed or p.name not in self.headers:
+                headers[p.name] = write_peripheral(output, p)
+            else:
+                headers[p.name] = self.headers[p.name]
+        self.headers = headers
+
+        written = {}
+        for files in headers.values():
+            written.update(files)
+        written.update(generator.write_device(output, peripherals, aliases))
+        output.manifest.save(written)
+
+
+def watch_svd(
+    generator: Generator,
+    svd_file: Union[SvdSource, Path],
+    output_dir: Optional[Path] = None,
+    output_root: Path = Path(),
+    interval: float = POLL_INTERVAL,
+):  # pragma: no cover
+    """Regenerate code whenever the SVD file changes, until interrupted"""
+    session = WatchSession(generator, svd_file, output_dir, output_root)
+    click.echo(f"Watching {svd_file}, press Ctrl+C to stop")
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                changed = session.poll()
+            except (ET.ParseError, ValueError, OSError) as e:
+                # Keep watching, the next save usually fixes the file
+                click.echo(f"Cannot generate {svd_file}: {e}", err=True)
+                session.device = None
+                changed = None
+            if changed is not None:
+                elapsed = (time.perf_counter() - start) * 1000
+                click.echo(
+                    f"Regenerated {len(changed)} peripherals of "
+                    f"{session.device.name} in {elapsed:.0f} ms"
+                )
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
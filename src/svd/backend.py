@@ -0,0 +1,139 @@
+import contextlib
+import contextvars
+import dataclasses
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Type
+
+_trusted = contextvars.ContextVar("trusted", default=False)
+_shared: contextvars.ContextVar[
+    Optional[Dict[Hashable, Any]]
+] = contextvars.ContextVar("shared", default=None)
+
+# Twins are created once per model, even when threads first build models of
+# the same type at the same time, so `is_model` holds across threads.
+_fast_class_lock = threading.Lock()
+_fast_classes: Dict[Type, Type] = {}
+
+# Dunder methods a model defines itself, as opposed to the ones generated by
+# pydantic and dataclasses, which the fast classes get from dataclasses.
+_MODEL_DUNDERS = ("__iter__",)
+
+
+@contextlib.contextmanager
+def trusted(enabled: bool = True):
+    """Build models without pydantic validation while the context is active
+
+    The `from_dict` constructors already convert every attribute to its
+    declared type, so for input that is known to be valid the per-object
+    validation only costs time.  Models built in this mode are plain slotted
+    dataclasses with the same attributes and methods as the validated ones.
+    """
+    token = _trusted.set(enabled)
+    try:
+        yield
+    finally:
+        _trusted.reset(token)
+
+
+def is_trusted() -> bool:
+    return _trusted.get()
+
+
+@contextlib.contextmanager
+def sharing():
+    """Share structurally identical elements built while the context is active
+
+    Elements built through `shared` with equal keys are the same object, so a
+    device that repeats an enumeration on every instance of a peripheral holds
+    it once.  Shared elements must not be modified after construction.  Nested
+    contexts share with the outermost one.
+    """
+    if _shared.get() is not None:
+        yield
+        return
+    token = _shared.set({})
+    try:
+        yield
+    finally:
+        _shared.reset(token)
+
+
+def shared(key: Hashable, build: Callable[[], Any]):
+    pool = _shared.get()
+    if pool is None:
+        return build()
+    try:
+        return pool[key]
+    except KeyError:
+        element = pool[key] = build()
+        return element
+
+
+def construct(cls: Type, **kwargs):
+    if _trusted.get():
+        cls = fast_class(cls)
+    return cls(**kwargs)
+
+
+def is_model(element, model: Type) -> bool:
+    """isinstance for a model, which also matches its unvalidated twin"""
+    return isinstance(element, (model, fast_class(model)))
+
+
+def fast_class(model: Type) -> Type:
+    """Return the unvalidated, slotted twin of a pydantic dataclass model"""
+    try:
+        return _fast_classes[model]
+    except KeyError:
+        pass
+    with _fast_class_lock:
+        if model not in _fast_classes:
+            _fast_classes[model] = _make_fast_class(model)
+        return _fast_classes[model]
+
+
+def _make_fast_class(model: Type) -> Type:
+    if "__svd_model__" in vars(model):
+        return model
+
+    fields = []
+    for field in dataclasses.fields(model):
+        if field.default is not dataclasses.MISSING:
+            spec = dataclasses.field(default=field.default)
+        else:
+            spec = dataclasses.field()
+        fields.append((field.name, field.type, spec))
+    names = tuple(field[0] for field in fields)
+
+    namespace = {
+        name: value
+        for name, value in vars(model).items()
+        if name in _MODEL_DUNDERS
+        or (not name.startswith("__") and name not in names)
+    }
+    namespace["__module__"] = model.__module__
+    namespace["__svd_model__"] = model
+    namespace["__reduce__"] = _reduce
+    namespace["__setstate__"] = _setstate
+
+    return dataclasses.make_dataclass(
+        model.__name__,
+        fields,
+        namespace=namespace,
+        slots=True,
+    )
+
+
+def _reduce(self):
+    state = tuple(getattr(self, f.name) for f in dataclasses.fields(self))
+    return (_restore, (self.__svd_model__,), state)
+
+
+def _restore(model: Type):
+    cls = fast_class(model)
+    return cls.__new__(cls)
+
+
+def _setstate(self, state):
+    for field, value in zip(dataclasses.fields(self), state):
+        object.__setattr__(self, field.name, value)
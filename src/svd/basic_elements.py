@@ -1,7 +1,9 @@
+import functools
 import logging
 import re
+import sys
 from enum import Enum
-from typing import Optional, Union
+from typing import Dict, Optional, Type, Union
 
 _logger = logging.getLogger(__name__)
 
@@ -61,34 +63,127 @@ def c_modifier(self):
                 return ""
 
 
+# SVD files repeat the same handful of literals and boilerplate descriptions
+# thousands of times, so parsed results are memoized.
+LITERAL_CACHE_SIZE = 4096
+
+_HEX_PATTERN = re.compile(r"0[xX]([0-9a-fA-F]+)\b")
+_BINARY_PATTERN = re.compile(r"(?:0b|#)([0-1x]+)\b")
+_WHITESPACE_PATTERN = re.compile(r"[\s\n\r]+")
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
 def parse_int(value: Optional[Union[int, str]]):
     if value is None:
         return value
     if not isinstance(value, str):
         return value
-    value: str = value
+    return _parse_int_literal(value)
 
-    value = value.strip()
 
-    hex_str = re.match(r"0[xX]([0-9a-fA-F]+)\b", value)
-    if hex_str:
-        value = hex_str.groups()[0]
-        value = int(value, 16)
+def parse_enumerated_value(value: Optional[Union[int, str]]):
+    """Parse an enumeratedValue value, which must be hex or binary"""
+    if not isinstance(value, str):
         return value
+    return _parse_enumerated_value_literal(value)
+
+
+@functools.lru_cache(maxsize=LITERAL_CACHE_SIZE)
+def _parse_int_literal(value: str) -> int:
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    return _parse_prefixed_literal(value, allow_decimal=True)
+
+
+@functools.lru_cache(maxsize=LITERAL_CACHE_SIZE)
+def _parse_enumerated_value_literal(value: str) -> int:
+    return _parse_prefixed_literal(value.strip(), allow_decimal=False)
+
 
-    bin_str = re.match(r"0b([0-1x]+)\b", value) or re.match(
-        r"#([0-1x]+)\b", value
-    )
-    if bin_str:
-        value = bin_str.groups()[0]
-        value = value.replace("x", "0")
-        value = int(value, 2)
+def _parse_prefixed_literal(value: str, allow_decimal: bool) -> int:
+    digits = value[2:]
+    if value[:2] in ("0x", "0X") and digits and _HEX_DIGITS.issuperset(digits):
+        return int(digits, 16)
+
+    if hex_str := _HEX_PATTERN.match(value):
+        return int(hex_str.group(1), 16)
+
+    if bin_str := _BINARY_PATTERN.match(value):
+        return int(bin_str.group(1).replace("x", "0"), 2)
+
+    if allow_decimal:
+        return int(value)
+
+    err_msg = f"Failed to parse {value} as integer"
+    _logger.error(err_msg)
+    raise ValueError(err_msg)
+
+
+def parse_bool(value: Optional[Union[bool, str]]):
+    if not isinstance(value, str):
+        return value
+    normalized = value.strip().lower()
+    if normalized in ("true", "1"):
+        return True
+    if normalized in ("false", "0"):
+        return False
+    err_msg = f"Failed to parse {value} as boolean"
+    _logger.error(err_msg)
+    raise ValueError(err_msg)
+
+
+def parse_enum(enum_type: Type[Enum], value: Optional[Union[Enum, str]]):
+    if value is None or isinstance(value, enum_type):
         return value
+    return enum_type(value)
+
 
-    return int(value)
+def parse_name(value: Optional[str]):
+    """Intern a name, which repeats across every instance of its element"""
+    if value is None:
+        return value
+    return sys.intern(value)
 
 
 def parse_description(value: Optional[str]):
     if value is None:
         return value
-    return re.sub(r"[\s\n\r]+", " ", value)
+    # Only ASCII spaces are printable whitespace, so a printable description
+    # without double spaces is already normalized.
+    if value.isprintable() and "  " not in value:
+        return sys.intern(value)
+    return _normalize_whitespace(value)
+
+
+@functools.lru_cache(maxsize=LITERAL_CACHE_SIZE)
+def _normalize_whitespace(value: str) -> str:
+    return sys.intern(_WHITESPACE_PATTERN.sub(" ", value))
+
+
+def literal_cache_info() -> Dict[str, functools._CacheInfo]:
+    """Hit and miss counts of the memoized literal parsers"""
+    return {
+        "parse_int": _parse_int_literal.cache_info(),
+        "parse_enumerated_value": _parse_enumerated_value_literal.cache_info(),
+        "parse_description": _normalize_whitespace.cache_info(),
+    }
+
+
+def literal_cache_hit_rate(
+    since: Optional[Dict[str, functools._CacheInfo]] = None
+) -> float:
+    """Share of the memoized literal parser calls answered from the caches
+
+    The caches are shared by the whole process, so with `since`, counts taken
+    earlier by `literal_cache_info`, only the calls made after it count.
+    """
+    hits = misses = 0
+    for name, info in literal_cache_info().items():
+        hits += info.hits
+        misses += info.misses
+        if since is not None:
+            hits -= since[name].hits
+            misses -= since[name].misses
+    lookups = hits + misses
+    return hits / lookups if lookups > 0 else 0.0
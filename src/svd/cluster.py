@@ -0,0 +1,113 @@
+import dataclasses
+from typing import Any, Iterator, List, Optional, Union
+
+from pydantic.dataclasses import dataclass
+
+from svd import backend, basic_elements
+from svd.basic_elements import Access
+from svd.dim import DimElement, element_name, is_array
+from svd.register import Register
+
+
+@dataclass
+class Cluster:
+    """A group of registers, repeated as a unit when it has a `dim`"""
+
+    name: str
+    address_offset: int
+    description: Optional[str] = None
+    alternate_cluster: Optional[str] = None
+    header_struct_name: Optional[str] = None
+
+    size: Optional[int] = None
+    access: Optional[Access] = None
+    protection: Optional[str] = None
+    reset_value: Optional[int] = None
+    reset_mask: Optional[int] = None
+
+    registers: Optional[List[Register]] = None
+    clusters: Optional[List["Cluster"]] = None
+    dim: Optional[DimElement] = None
+
+    derived_from: Optional[Union[str, "Cluster"]] = None
+    parent: Optional[Any] = None
+
+    @classmethod
+    def from_dict(cls, cluster_dict, parent=None):
+        new_cls = backend.construct(
+            cls,
+            name=basic_elements.parse_name(cluster_dict.get("name")),
+            address_offset=basic_elements.parse_int(
+                cluster_dict.get("addressOffset")
+            ),
+            description=basic_elements.parse_description(
+                cluster_dict.get("description")
+            ),
+            alternate_cluster=cluster_dict.get("alternateCluster"),
+            header_struct_name=cluster_dict.get("headerStructName"),
+            size=basic_elements.parse_int(
+                cluster_dict.get("size", parent.size if parent else None)
+            ),
+            access=basic_elements.parse_enum(
+                Access,
+                cluster_dict.get("access", parent.access if parent else None),
+            ),
+            protection=cluster_dict.get(
+                "protection", parent.protection if parent else None
+            ),
+            reset_value=basic_elements.parse_int(
+                cluster_dict.get(
+                    "resetValue", parent.reset_value if parent else None
+                )
+            ),
+            reset_mask=basic_elements.parse_int(
+                cluster_dict.get(
+                    "resetMask", parent.reset_mask if parent else None
+                )
+            ),
+            dim=DimElement.from_dict(cluster_dict),
+            derived_from=cluster_dict.get("@derivedFrom"),
+            parent=parent,
+        )
+        # Unlike a peripheral, a cluster lists its registers and clusters
+        # directly rather than in a <registers> element.
+        new_cls.registers, new_cls.clusters = from_registers_dict(
+            cluster_dict, new_cls
+        )
+        return new_cls
+
+    @property
+    def is_array(self) -> bool:
+        return self.dim is not None and is_array(self.name)
+
+    def expand(self) -> Iterator["Cluster"]:
+        """Yield the clusters a dim element stands for, built on demand"""
+        if self.dim is None:
+            yield self
+            return
+        for i, index in enumerate(self.dim.indices()):
+            yield dataclasses.replace(
+                self,
+                name=element_name(self.name, index),
+                address_offset=self.address_offset + i * self.dim.dim_increment,
+                dim=None,
+            )
+
+
+def from_registers_dict(registers_dict, parent):
+    """Build the registers and clusters of a peripheral or cluster"""
+    if not registers_dict:
+        return None, None
+
+    registers = registers_dict.get("register")
+    if isinstance(registers, dict):
+        registers = [registers]
+    if registers is not None:
+        registers = [Register.from_dict(r, parent) for r in registers]
+
+    clusters = registers_dict.get("cluster")
+    if isinstance(clusters, dict):
+        clusters = [clusters]
+    if clusters is not None:
+        clusters = [Cluster.from_dict(c, parent) for c in clusters]
+    return registers, clusters
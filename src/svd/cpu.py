@@ -2,7 +2,7 @@
 
 from pydantic.dataclasses import dataclass
 
-from svd import basic_elements
+from svd import backend, basic_elements
 from svd.basic_elements import Endian
 
 
@@ -19,15 +19,21 @@ class Cpu:
 
     @classmethod
     def from_dict(cls, cpu_dict, parent=None):
-        return cls(
+        if None is cpu_dict:
+            return None
+
+        return backend.construct(
+            cls,
             name=cpu_dict.get("name"),
             revision=cpu_dict.get("revision"),
-            endian=cpu_dict.get("endian"),
-            mpu_present=cpu_dict.get("mpuPresent"),
-            fpu_present=cpu_dict.get("fpuPresent"),
+            endian=basic_elements.parse_enum(Endian, cpu_dict.get("endian")),
+            mpu_present=basic_elements.parse_bool(cpu_dict.get("mpuPresent")),
+            fpu_present=basic_elements.parse_bool(cpu_dict.get("fpuPresent")),
             nvic_prio_bits=basic_elements.parse_int(
                 cpu_dict.get("nvicPrioBits")
             ),
-            vendor_systick_config=cpu_dict.get("vendorSystickConfig"),
+            vendor_systick_config=basic_elements.parse_bool(
+                cpu_dict.get("vendorSystickConfig")
+            ),
             parent=parent,
         )
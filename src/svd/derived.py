@@ -0,0 +1,159 @@
+import logging
+from typing import Any, Dict, Iterator, List, Tuple
+
+_logger = logging.getLogger(__name__)
+
+Scope = Tuple[str, ...]
+
+
+class _Index:
+    """Element lookup by dotted `PERIPH.REG.FIELD` style paths
+
+    Lookups start in the scope of the referring element and widen one level at
+    a time, so `derivedFrom="CR"` finds a sibling while `derivedFrom="A.CR"`
+    finds the register in peripheral `A`.
+    """
+
+    def __init__(self):
+        self.paths: Dict[str, Any] = {}
+
+    def add(self, path: str, element):
+        self.paths.setdefault(path, element)
+
+    def find(self, scope: Scope, reference: str):
+        for depth in range(len(scope), -1, -1):
+            path = ".".join(scope[:depth] + (reference,))
+            if (element := self.paths.get(path)) is not None:
+                return element
+        return None
+
+
+def resolve(device, peripherals=None):
+    """Replace every derivedFrom name in the device with the element it names
+
+    Builds name indexes in a single walk of the model, then resolves each
+    reference with dictionary lookups, so the cost is linear in the size of
+    the device.  Derived clusters, registers, fields and enumerations also
+    pick up the contents their own definition leaves out.
+
+    With `peripherals`, only the references inside those peripherals are
+    resolved, for a device whose other peripherals are resolved already.  The
+    rest of the device is only indexed when a reference reaches outside them.
+    """
+    full = peripherals is None
+    indexes, pending = _index(device.peripherals if full else peripherals, full)
+    if not full:
+        indexes["peripheral"] = _Index()
+        for peripheral in device.peripherals:
+            indexes["peripheral"].add(peripheral.name, peripheral)
+
+    for element, scope, kind in pending:
+        if not isinstance(element.derived_from, str):
+            continue
+        base = indexes[kind].find(scope, element.derived_from)
+        if base is None and not full:
+            full = True
+            indexes, _ = _index(device.peripherals, full)
+            base = indexes[kind].find(scope, element.derived_from)
+        if base is None:
+            referrer = ".".join(scope + (_element_name(element),))
+            err_msg = (
+                f"{referrer} is derived from {element.derived_from!r},"
+                f" which does not match any {kind}"
+            )
+            _logger.error(err_msg)
+            raise ValueError(err_msg)
+        element.derived_from = base
+
+    inherited = set()
+    for element, _, _ in pending:
+        _inherit(element, inherited, [])
+
+
+def _index(
+    peripherals, root_enums: bool
+) -> Tuple[Dict[str, _Index], List[Tuple[Any, Scope, str]]]:
+    """Index the elements of `peripherals` by path
+
+    Enumerations are also indexed by their bare name, unless `root_enums` is
+    false, since the first of several with the same name wins and that
+    depends on the peripherals that come before.
+    """
+    indexes = {
+        kind: _Index()
+        for kind in (
+            "peripheral",
+            "cluster",
+            "register",
+            "field",
+            "enumeratedValues",
+        )
+    }
+    clusters = indexes["cluster"]
+    registers = indexes["register"]
+    fields = indexes["field"]
+    enums = indexes["enumeratedValues"]
+    pending: List[Tuple[Any, Scope, str]] = []
+
+    def add_registers(parent, p_scope: Scope):
+        for cluster in parent.clusters or []:
+            c_scope = p_scope + (cluster.name,)
+            clusters.add(".".join(c_scope), cluster)
+            pending.append((cluster, p_scope, "cluster"))
+            add_registers(cluster, c_scope)
+        for register in parent.registers or []:
+            r_scope = p_scope + (register.name,)
+            registers.add(".".join(r_scope), register)
+            pending.append((register, p_scope, "register"))
+            for field in register.fields or []:
+                f_scope = r_scope + (field.name,)
+                fields.add(".".join(f_scope), field)
+                pending.append((field, r_scope, "field"))
+                if field.enumerated_values is None:
+                    continue
+                enum = field.enumerated_values
+                if enum.name is not None:
+                    for scope in _enclosing_scopes(f_scope):
+                        if scope or root_enums:
+                            enums.add(".".join(scope + (enum.name,)), enum)
+                pending.append((enum, f_scope, "enumeratedValues"))
+
+    for peripheral in peripherals:
+        indexes["peripheral"].add(peripheral.name, peripheral)
+        pending.append((peripheral, (), "peripheral"))
+        add_registers(peripheral, (peripheral.name,))
+    return indexes, pending
+
+
+def _enclosing_scopes(scope: Scope) -> Iterator[Scope]:
+    for depth in range(len(scope), -1, -1):
+        yield scope[:depth]
+
+
+def _element_name(element) -> str:
+    return element.name if element.name is not None else "<unnamed>"
+
+
+def _inherit(element, inherited: set, chain: List[Any]):
+    base = element.derived_from
+    if base is None or id(element) in inherited:
+        return
+    if any(element is e for e in chain):
+        names = " -> ".join(_element_name(e) for e in chain + [element])
+        err_msg = f"Circular derivedFrom chain: {names}"
+        _logger.error(err_msg)
+        raise ValueError(err_msg)
+
+    _inherit(base, inherited, chain + [element])
+    for attribute in _INHERITED_ATTRIBUTES.get(type(element).__name__, ()):
+        if not getattr(element, attribute):
+            setattr(element, attribute, getattr(base, attribute))
+    inherited.add(id(element))
+
+
+_INHERITED_ATTRIBUTES = {
+    "Cluster": ("description", "registers", "clusters"),
+    "Register": ("description", "fields"),
+    "Field": ("description", "enumerated_values"),
+    "EnumeratedValues": ("enumerated_values",),
+}
@@ -1,9 +1,8 @@
-import functools
 from typing import List, Optional
 
 from pydantic.dataclasses import dataclass
 
-from svd import basic_elements
+from svd import backend, basic_elements, derived
 from svd.basic_elements import Access
 from svd.cpu import Cpu
 from svd.peripheral import Peripheral
@@ -34,11 +33,27 @@ class Device:
     peripherals: Optional[List[Peripheral]] = None
 
     @classmethod
-    def from_dict(cls, device_dict):
-        new_cls = cls(
+    def from_dict(cls, device_dict, selection=None, resolve=True):
+        new_cls = cls.from_properties_dict(device_dict)
+        peripherals = device_dict["peripherals"]["peripheral"]
+        if selection is not None:
+            peripherals = selection.filter_dicts(peripherals)
+        with backend.sharing():
+            peripherals = [
+                Peripheral.from_dict(p, new_cls) for p in peripherals
+            ]
+        new_cls.peripherals = peripherals
+        if resolve:
+            new_cls.resolve_derived_from()
+        return new_cls
+
+    @classmethod
+    def from_properties_dict(cls, device_dict):
+        return backend.construct(
+            cls,
             vendor=device_dict.get("vendor"),
             vendor_id=device_dict.get("vendorID"),
-            name=device_dict.get("name"),
+            name=basic_elements.parse_name(device_dict.get("name")),
             series=device_dict.get("series"),
             version=device_dict.get("version"),
             description=basic_elements.parse_description(
@@ -55,26 +70,11 @@ def from_dict(cls, device_dict):
             ),
             width=basic_elements.parse_int(device_dict.get("width")),
             size=basic_elements.parse_int(device_dict.get("size")),
-            access=device_dict.get("access"),
+            access=basic_elements.parse_enum(Access, device_dict.get("access")),
             protection=device_dict.get("protection"),
             reset_value=basic_elements.parse_int(device_dict.get("resetValue")),
             reset_mask=basic_elements.parse_int(device_dict.get("resetMask")),
         )
-        peripherals = device_dict["peripherals"]["peripheral"]
-        peripherals = [Peripheral.from_dict(p, new_cls) for p in peripherals]
-        new_cls.peripherals = peripherals
-
-        for peripheral in new_cls.peripherals:
-            if isinstance(peripheral.derived_from, str):
-
-                def is_match(p: Peripheral, derived_name: str):
-                    return p.name == derived_name
 
-                is_match = functools.partial(
-                    is_match, derived_name=peripheral.derived_from
-                )
-
-                peripheral.derived_from = list(
-                    filter(is_match, new_cls.peripherals)
-                )[0]
-        return new_cls
+    def resolve_derived_from(self, peripherals=None):
+        derived.resolve(self, peripherals)
@@ -0,0 +1,95 @@
+import logging
+import re
+from typing import List, Optional
+
+from pydantic.dataclasses import dataclass
+
+from svd import backend, basic_elements
+
+_logger = logging.getLogger(__name__)
+
+ARRAY_PLACEHOLDER = "[%s]"
+PLACEHOLDER = "%s"
+
+_RANGE_PATTERN = re.compile(r"^\s*([0-9]+|[A-Z])\s*-\s*([0-9]+|[A-Z])\s*$")
+
+
+@dataclass
+class DimElement:
+    """The dimElementGroup of a register, cluster or peripheral
+
+    An element with a `dim` stands for `dim` copies of itself, `dim_increment`
+    bytes apart.  A name ending in `[%s]` describes a C array; any other name
+    contains `%s`, which each copy replaces with its entry from `dim_index`.
+    """
+
+    dim: int
+    dim_increment: int
+    dim_index: Optional[List[str]] = None
+    dim_name: Optional[str] = None
+
+    def indices(self) -> List[str]:
+        if self.dim_index is not None:
+            return self.dim_index
+        return [str(i) for i in range(self.dim)]
+
+    @classmethod
+    def from_dict(cls, element_dict):
+        if element_dict.get("dim") is None:
+            return None
+
+        name = element_dict.get("name") or ""
+        if PLACEHOLDER not in name:
+            err_msg = f"{name} has a dim but no %s placeholder in its name"
+            _logger.error(err_msg)
+            raise ValueError(err_msg)
+
+        dim = basic_elements.parse_int(element_dict.get("dim"))
+        dim_index = parse_dim_index(element_dict.get("dimIndex"))
+        if dim_index is not None and len(dim_index) != dim:
+            err_msg = (
+                f"{name} has dim {dim} but dimIndex lists {len(dim_index)}"
+                " indices"
+            )
+            _logger.error(err_msg)
+            raise ValueError(err_msg)
+
+        return backend.construct(
+            cls,
+            dim=dim,
+            dim_increment=basic_elements.parse_int(
+                element_dict.get("dimIncrement")
+            ),
+            dim_index=dim_index,
+            dim_name=basic_elements.parse_name(element_dict.get("dimName")),
+        )
+
+
+def parse_dim_index(value: Optional[str]) -> Optional[List[str]]:
+    """Expand a dimIndex such as `0-3`, `A-D` or `RX,TX` into its indices"""
+    if value is None:
+        return None
+
+    if match := _RANGE_PATTERN.match(value):
+        first, last = match.groups()
+        if first.isdigit() and last.isdigit():
+            return [str(i) for i in range(int(first), int(last) + 1)]
+        if not first.isdigit() and not last.isdigit():
+            return [chr(i) for i in range(ord(first), ord(last) + 1)]
+        err_msg = f"Invalid dimIndex range {value!r}"
+        _logger.error(err_msg)
+        raise ValueError(err_msg)
+    return [basic_elements.parse_name(i.strip()) for i in value.split(",")]
+
+
+def is_array(name: str) -> bool:
+    return name.endswith(ARRAY_PLACEHOLDER)
+
+
+def base_name(name: str) -> str:
+    """The name with its dim placeholder removed, as used for its C type"""
+    return name.replace(ARRAY_PLACEHOLDER, "").replace(PLACEHOLDER, "")
+
+
+def element_name(name: str, index: str) -> str:
+    return name.replace(PLACEHOLDER, index)
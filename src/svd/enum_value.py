@@ -1,10 +1,9 @@
 import logging
-import re
-from typing import Any, List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from pydantic.dataclasses import dataclass
 
-from svd import basic_elements
+from svd import backend, basic_elements
 from svd.basic_elements import Usage
 
 _logger = logging.getLogger(__name__)
@@ -17,8 +16,13 @@ class Field:
 
 @dataclass
 class EnumeratedValues:
-    parent: Optional[Any]
-    derived_from: Optional["EnumeratedValues"]
+    """A set of enumerated values, shared by every field that repeats it
+
+    Identical blocks built in a `backend.sharing` context are one instance,
+    so enumerations hold no reference back to a field.
+    """
+
+    derived_from: Optional[Union[str, "EnumeratedValues"]]
     name: Optional[str]
     header_enum_name: Optional[str]
     usage: Optional[Usage]
@@ -28,69 +32,65 @@ def __iter__(self):
         yield from self.enumerated_values
 
     @classmethod
-    def from_dict(cls, enum_dict, parent=None):
+    def from_dict(cls, enum_dict):
         if isinstance(enum_dict.get("enumeratedValue"), dict):
             enum_dict["enumeratedValue"] = [enum_dict["enumeratedValue"]]
 
-        new_cls = cls(
-            parent=parent,
-            derived_from=enum_dict.get("derivedFrom"),
-            name=enum_dict.get("name"),
-            header_enum_name=enum_dict.get("headerEnumName"),
-            usage=enum_dict.get("usage", Usage.READ_WRITE),
-            enumerated_values=[
-                EnumeratedValue.from_dict(ev)
-                for ev in enum_dict.get("enumeratedValue")
-            ],
-        )
-        for ev in new_cls:
-            ev.parent = new_cls
-        return new_cls
+        def build():
+            return backend.construct(
+                cls,
+                derived_from=enum_dict.get("@derivedFrom"),
+                name=basic_elements.parse_name(enum_dict.get("name")),
+                header_enum_name=basic_elements.parse_name(
+                    enum_dict.get("headerEnumName")
+                ),
+                usage=basic_elements.parse_enum(
+                    Usage, enum_dict.get("usage", Usage.READ_WRITE)
+                ),
+                enumerated_values=[
+                    EnumeratedValue.from_dict(ev)
+                    for ev in enum_dict.get("enumeratedValue", [])
+                ],
+            )
+
+        # A derived block is completed from its base, which depends on where
+        # it appears, so only self-contained blocks are shared.
+        if enum_dict.get("@derivedFrom") is not None:
+            return build()
+        return backend.shared((cls, _content_key(enum_dict)), build)
+
+
+def _content_key(enum_dict) -> Tuple:
+    return (
+        enum_dict.get("name"),
+        enum_dict.get("headerEnumName"),
+        enum_dict.get("usage"),
+        tuple(
+            (ev.get("name"), ev.get("description"), ev.get("value"))
+            for ev in enum_dict.get("enumeratedValue", [])
+        ),
+    )
 
 
 @dataclass
 class EnumeratedValue:
-    parent: Optional[EnumeratedValues]
     name: Optional[str]
     description: Optional[str]
     value: Optional[Union[int, str]]
     is_default: Optional[bool]
 
     def __post_init__(self):
-        self._parse_value()
+        self.value = basic_elements.parse_enumerated_value(self.value)
         self.description = basic_elements.parse_description(self.description)
 
-    def _parse_value(self):
-        if not isinstance(self.value, str):
-            return
-
-        self.value = self.value.strip()
-
-        hex_str = re.match(r"0x([0-9a-fA-F]+)\b", self.value)
-        if hex_str:
-            value = hex_str.groups()[0]
-            self.value = int(value, 16)
-            return
-
-        bin_str = re.match(r"0b([0-1x]+)\b", self.value) or re.match(
-            r"#([0-1x]+)\b", self.value
-        )
-        if bin_str:
-            value = bin_str.groups()[0]
-            value = value.replace("x", "0")
-            self.value = int(value, 2)
-            return
-
-        err_msg = f"Failed to parse {self.value} as integer"
-        _logger.error(err_msg)
-        raise ValueError(err_msg)
-
     @classmethod
-    def from_dict(cls, enum_dict, parent=None):
-        return cls(
-            parent=parent,
-            name=enum_dict["name"],
-            description=enum_dict.get("description", ""),
-            value=enum_dict["value"],
+    def from_dict(cls, enum_dict):
+        return backend.construct(
+            cls,
+            name=basic_elements.parse_name(enum_dict["name"]),
+            description=basic_elements.parse_description(
+                enum_dict.get("description", "")
+            ),
+            value=basic_elements.parse_enumerated_value(enum_dict["value"]),
             is_default=None,
         )
@@ -1,8 +1,8 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from pydantic.dataclasses import dataclass
 
-from svd import basic_elements
+from svd import backend, basic_elements
 from svd.basic_elements import Access, ModifiedWriteValues, ReadAction
 from svd.enum_value import EnumeratedValues
 
@@ -18,26 +18,32 @@ class Field:
     write_constraint: Optional[Dict] = None
     read_action: Optional[ReadAction] = None
     enumerated_values: Optional[EnumeratedValues] = None
-    derived_from: Optional["Field"] = None
+    derived_from: Optional[Union[str, "Field"]] = None
     parent: Optional[Any] = None
 
     @classmethod
     def from_dict(cls, field_dict, parent=None):
-        new_cls = cls(
-            name=field_dict["name"],
-            bit_offset=field_dict.get("bitOffset"),
-            bit_width=field_dict.get("bitWidth"),
+        new_cls = backend.construct(
+            cls,
+            name=basic_elements.parse_name(field_dict["name"]),
+            bit_offset=basic_elements.parse_int(field_dict.get("bitOffset")),
+            bit_width=basic_elements.parse_int(field_dict.get("bitWidth")),
             description=basic_elements.parse_description(
                 field_dict.get("description")
             ),
-            access=field_dict.get("access"),
-            modified_write_values=field_dict.get("modified_write_values"),
+            access=basic_elements.parse_enum(Access, field_dict.get("access")),
+            modified_write_values=basic_elements.parse_enum(
+                ModifiedWriteValues, field_dict.get("modified_write_values")
+            ),
             write_constraint=field_dict.get("write_constraint"),
-            read_action=field_dict.get("readAction"),
+            read_action=basic_elements.parse_enum(
+                ReadAction, field_dict.get("readAction")
+            ),
+            derived_from=field_dict.get("@derivedFrom"),
             parent=parent,
         )
 
         if enum_values := field_dict.get("enumeratedValues"):
-            enum_values = EnumeratedValues.from_dict(enum_values, new_cls)
+            enum_values = EnumeratedValues.from_dict(enum_values)
         new_cls.enumerated_values = enum_values
         return new_cls
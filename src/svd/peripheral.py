@@ -1,10 +1,13 @@
+import dataclasses
 import logging
-from typing import Any, List, Optional, Union
+from typing import Any, Iterator, List, Optional, Union
 
 from pydantic.dataclasses import dataclass
 
-from svd import basic_elements
+from svd import backend, basic_elements
 from svd.basic_elements import Access, AddressBlockUsage
+from svd.cluster import Cluster, from_registers_dict
+from svd.dim import DimElement, element_name, is_array
 from svd.register import Register
 
 _logger = logging.getLogger(__name__)
@@ -33,14 +36,17 @@ class Peripheral:
 
     interrupt: Optional[List["Interrupt"]] = None
     registers: Optional[List[Register]] = None
+    clusters: Optional[List[Cluster]] = None
+    dim: Optional[DimElement] = None
 
     derived_from: Optional[Union[str, "Peripheral"]] = None
     parent: Optional[Any] = None
 
     @classmethod
     def from_dict(cls, peripheral_dict, parent=None):
-        new_cls = cls(
-            name=peripheral_dict.get("name"),
+        new_cls = backend.construct(
+            cls,
+            name=basic_elements.parse_name(peripheral_dict.get("name")),
             base_address=basic_elements.parse_int(
                 peripheral_dict.get("baseAddress")
             ),
@@ -60,8 +66,11 @@ def from_dict(cls, peripheral_dict, parent=None):
             size=basic_elements.parse_int(
                 peripheral_dict.get("size", parent.size if parent else None)
             ),
-            access=peripheral_dict.get(
-                "access", parent.access if parent else None
+            access=basic_elements.parse_enum(
+                Access,
+                peripheral_dict.get(
+                    "access", parent.access if parent else None
+                ),
             ),
             protection=peripheral_dict.get(
                 "protection", parent.protection if parent else None
@@ -76,6 +85,7 @@ def from_dict(cls, peripheral_dict, parent=None):
                     "reset_mask", parent.reset_mask if parent else None
                 )
             ),
+            dim=DimElement.from_dict(peripheral_dict),
             derived_from=peripheral_dict.get("@derivedFrom"),
             parent=parent,
         )
@@ -84,13 +94,29 @@ def from_dict(cls, peripheral_dict, parent=None):
             interrupt = Interrupt.from_dict(interrupt, new_cls)
         new_cls.interrupt = interrupt
 
-        if registers := peripheral_dict.get("registers"):
-            registers = registers["register"]
-            registers = [Register.from_dict(r, new_cls) for r in registers]
-        new_cls.registers = registers
+        new_cls.registers, new_cls.clusters = from_registers_dict(
+            peripheral_dict.get("registers"), new_cls
+        )
 
         return new_cls
 
+    @property
+    def is_array(self) -> bool:
+        return self.dim is not None and is_array(self.name)
+
+    def expand(self) -> Iterator["Peripheral"]:
+        """Yield the peripheral instances a dim element stands for"""
+        if self.dim is None:
+            yield self
+            return
+        for i, index in enumerate(self.dim.indices()):
+            yield dataclasses.replace(
+                self,
+                name=element_name(self.name, index),
+                base_address=self.base_address + i * self.dim.dim_increment,
+                dim=None,
+            )
+
 
 @dataclass
 class AddressBlock:
@@ -104,10 +130,13 @@ def from_dict(cls, address_block_dict):
         if None is address_block_dict:
             return None
 
-        return cls(
+        return backend.construct(
+            cls,
             offset=basic_elements.parse_int(address_block_dict.get("offset")),
             size=basic_elements.parse_int(address_block_dict.get("size")),
-            usage=address_block_dict.get("usage"),
+            usage=basic_elements.parse_enum(
+                AddressBlockUsage, address_block_dict.get("usage")
+            ),
             protection=address_block_dict.get("protection"),
         )
 
@@ -124,9 +153,10 @@ def from_dict(cls, interrupt_dict, parent=None):
         if isinstance(interrupt_dict, dict):
             interrupt_dict = [interrupt_dict]
         return [
-            cls(
+            backend.construct(
+                cls,
                 name=i.get("name"),
-                value=i.get("value"),
+                value=basic_elements.parse_int(i.get("value")),
                 description=i.get("description"),
                 parent=parent,
             )
@@ -1,9 +1,11 @@
-from typing import Any, Dict, List, Optional, Union
+import dataclasses
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from pydantic.dataclasses import dataclass
 
-from svd import basic_elements
+from svd import backend, basic_elements
 from svd.basic_elements import Access, ModifiedWriteValues, ReadAction
+from svd.dim import DimElement, element_name, is_array
 from svd.field import Field
 
 
@@ -27,14 +29,16 @@ class Register:
     write_constraint: Optional[Dict] = None
     read_action: Optional[ReadAction] = None
     fields: Optional[List[Field]] = None
+    dim: Optional[DimElement] = None
 
-    derived_from: Optional["Register"] = None
+    derived_from: Optional[Union[str, "Register"]] = None
     parent: Optional[Any] = None
 
     @classmethod
     def from_dict(cls, register_dict, parent=None):
-        new_cls = cls(
-            name=register_dict.get("name"),
+        new_cls = backend.construct(
+            cls,
+            name=basic_elements.parse_name(register_dict.get("name")),
             address_offset=basic_elements.parse_int(
                 register_dict.get("addressOffset")
             ),
@@ -47,8 +51,9 @@ def from_dict(cls, register_dict, parent=None):
             size=basic_elements.parse_int(
                 register_dict.get("size", parent.size if parent else None)
             ),
-            access=register_dict.get(
-                "access", parent.access if parent else None
+            access=basic_elements.parse_enum(
+                Access,
+                register_dict.get("access", parent.access if parent else None),
             ),
             protection=register_dict.get(
                 "protection", parent.protection if parent else None
@@ -64,10 +69,15 @@ def from_dict(cls, register_dict, parent=None):
                 )
             ),
             data_type=register_dict.get("data_type"),
-            modified_write_values=register_dict.get("modifiedWriteValues"),
+            modified_write_values=basic_elements.parse_enum(
+                ModifiedWriteValues, register_dict.get("modifiedWriteValues")
+            ),
             write_constraint=register_dict.get("writeConstraint"),
-            read_action=register_dict.get("readAction"),
-            derived_from=register_dict.get("derivedFrom"),
+            read_action=basic_elements.parse_enum(
+                ReadAction, register_dict.get("readAction")
+            ),
+            dim=DimElement.from_dict(register_dict),
+            derived_from=register_dict.get("@derivedFrom"),
             parent=parent,
         )
         if fields := register_dict.get("fields"):
@@ -78,3 +88,24 @@ def from_dict(cls, register_dict, parent=None):
                 fields = [Field.from_dict(fields, new_cls)]
         new_cls.fields = fields
         return new_cls
+
+    @property
+    def is_array(self) -> bool:
+        return self.dim is not None and is_array(self.name)
+
+    def expand(self) -> Iterator["Register"]:
+        """Yield the registers a dim element stands for
+
+        The copies are built on demand; the model itself only holds the one
+        register with its `dim`.
+        """
+        if self.dim is None:
+            yield self
+            return
+        for i, index in enumerate(self.dim.indices()):
+            yield dataclasses.replace(
+                self,
+                name=element_name(self.name, index),
+                address_offset=self.address_offset + i * self.dim.dim_increment,
+                dim=None,
+            )
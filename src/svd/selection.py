@@ -0,0 +1,111 @@
+import fnmatch
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class PeripheralSelection:
+    """Glob patterns choosing which peripherals to build
+
+    A peripheral is selected when it matches any `include` pattern, or when
+    there are none, and matches no `exclude` pattern.  Matching ignores case.
+    """
+
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+
+    def __call__(self, name: str) -> bool:
+        name = name.upper()
+        if self.include and not any(
+            fnmatch.fnmatchcase(name, p.upper()) for p in self.include
+        ):
+            return False
+        return not any(
+            fnmatch.fnmatchcase(name, p.upper()) for p in self.exclude
+        )
+
+    def tracker(self) -> "SelectionTracker":
+        return SelectionTracker(self)
+
+    def filter_dicts(self, peripheral_dicts: Iterable[Dict]) -> Iterator[Dict]:
+        """Selected peripheral dicts, followed by the bases they derive from"""
+        tracker = self.tracker()
+        for peripheral_dict in peripheral_dicts:
+            name = peripheral_dict.get("name")
+            bases = peripheral_bases(
+                peripheral_dict.get("@derivedFrom"),
+                _dict_references(peripheral_dict),
+            )
+            if tracker.wants(name):
+                yield peripheral_dict
+                yield from tracker.take(name, bases)
+            else:
+                tracker.defer(name, bases, peripheral_dict)
+
+
+def peripheral_bases(
+    base: Optional[str], references: Iterable[str]
+) -> Tuple[str, ...]:
+    """Names of the peripherals a peripheral may derive from
+
+    `base` is the derivedFrom of the peripheral itself and `references` those
+    of the elements inside it.  A dotted reference starts with the name of a
+    peripheral when it reaches outside its own, and otherwise names a cluster
+    or register, which no peripheral is expected to be named after.
+    """
+    names = [] if base is None else [base]
+    names += (r.split(".", 1)[0] for r in references if "." in r)
+    return tuple(dict.fromkeys(names))
+
+
+def _dict_references(element_dict: Dict) -> Iterator[str]:
+    """derivedFrom values of the elements nested in an element dict"""
+    for value in element_dict.values():
+        for child in value if isinstance(value, list) else [value]:
+            if isinstance(child, dict):
+                if isinstance(child.get("@derivedFrom"), str):
+                    yield child["@derivedFrom"]
+                yield from _dict_references(child)
+
+
+@dataclass
+class SelectionTracker:
+    """Follows derivedFrom links while peripherals are read in document order
+
+    Peripherals that are not selected are deferred rather than built.  When a
+    selected peripheral turns out to derive from one of them, or to contain
+    an element that does, the deferred base is handed back to be built; bases
+    that have not been read yet are built as soon as they arrive.
+    """
+
+    selection: PeripheralSelection
+    taken: Set[str] = field(default_factory=set)
+    needed: Set[str] = field(default_factory=set)
+    deferred: Dict[str, Tuple[Tuple[str, ...], Any]] = field(
+        default_factory=dict
+    )
+
+    def wants(self, name: str) -> bool:
+        return name in self.needed or self.selection(name)
+
+    def defer(self, name: str, bases: Tuple[str, ...], source: Any):
+        self.deferred[name] = (bases, source)
+
+    def take(self, name: str, bases: Tuple[str, ...]) -> List[Any]:
+        """Mark a peripheral as built and return deferred bases it needs"""
+        sources = []
+        pending = [(name, bases)]
+        while pending:
+            name, bases = pending.pop()
+            self.taken.add(name)
+            self.needed.discard(name)
+            for base in bases:
+                if base in self.taken:
+                    continue
+                if base not in self.deferred:
+                    self.needed.add(base)
+                    continue
+                base_bases, source = self.deferred.pop(base)
+                sources.append(source)
+                pending.append((base, base_bases))
+        return sources
@@ -0,0 +1,102 @@
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+from svd import backend
+from svd.device import Device
+from svd.peripheral import Peripheral
+from svd.selection import PeripheralSelection, peripheral_bases
+
+_logger = logging.getLogger(__name__)
+
+DEVICE_PATH = ["device"]
+PERIPHERALS_PATH = ["device", "peripherals"]
+
+
+def element_to_dict(element: ET.Element) -> Optional[Any]:
+    """Convert an element into the same shape `xmltodict.parse` produces"""
+    item: Dict[str, Any] = {
+        f"@{key}": value for key, value in element.attrib.items()
+    }
+    for child in element:
+        value = element_to_dict(child)
+        if child.tag not in item:
+            item[child.tag] = value
+        elif isinstance(item[child.tag], list):
+            item[child.tag].append(value)
+        else:
+            item[child.tag] = [item[child.tag], value]
+
+    text = (element.text or "").strip()
+    if not item:
+        return text or None
+    if text:
+        item["#text"] = text
+    return item
+
+
+def parse_device(
+    source, selection: Optional[PeripheralSelection] = None
+) -> Device:
+    """Build a device one peripheral at a time from an SVD file or stream
+
+    Each `<peripheral>` subtree is converted to a model and released before
+    the next one is read, so peak memory follows the largest peripheral rather
+    than the whole document.  Peripherals outside `selection` are kept only
+    as serialized XML until it is known whether a selected peripheral derives
+    from them.
+    """
+    tracker = selection.tracker() if selection is not None else None
+    device_dict: Dict[str, Any] = {}
+    device: Optional[Device] = None
+    peripherals: List[Peripheral] = []
+    path: List[str] = []
+    elements: List[ET.Element] = []
+
+    with backend.sharing():
+        for event, element in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                path.append(element.tag)
+                elements.append(element)
+                if path == PERIPHERALS_PATH:
+                    device = Device.from_properties_dict(device_dict)
+                continue
+
+            path.pop()
+            elements.pop()
+            if path == DEVICE_PATH and element.tag != "peripherals":
+                device_dict[element.tag] = element_to_dict(element)
+            elif path == PERIPHERALS_PATH and element.tag == "peripheral":
+                name = (element.findtext("name") or "").strip()
+                if tracker is None or tracker.wants(name):
+                    sources = [element]
+                    if tracker is not None:
+                        bases = _element_bases(element)
+                        sources += map(ET.fromstring, tracker.take(name, bases))
+                    peripherals.extend(
+                        Peripheral.from_dict(element_to_dict(s), device)
+                        for s in sources
+                    )
+                else:
+                    bases = _element_bases(element)
+                    tracker.defer(name, bases, ET.tostring(element))
+            else:
+                continue
+            element.clear()
+            elements[-1].remove(element)
+
+    if device is None:
+        err_msg = "SVD file does not contain a peripherals element"
+        _logger.error(err_msg)
+        raise ValueError(err_msg)
+
+    device.peripherals = peripherals
+    device.resolve_derived_from()
+    return device
+
+
+def _element_bases(element: ET.Element) -> Tuple[str, ...]:
+    return peripheral_bases(
+        element.get("derivedFrom"),
+        (e.get("derivedFrom") for e in element.iterfind(".//*[@derivedFrom]")),
+    )
@@ -0,0 +1,53 @@
+import xmltodict
+from bench import PHASES, RunConfig, benchmark
+from click.testing import CliRunner
+from startup import main, startup_times
+from synthetic_svd import SyntheticDevice, synthetic_svd
+
+from svd.device import Device
+
+
+def test_synthetic_svd_has_the_requested_shape():
+    shape = SyntheticDevice(3, 4, 5, 2, derived=2)
+
+    svd_dict = xmltodict.parse(synthetic_svd(shape))
+    device = Device.from_dict(svd_dict["device"])
+
+    assert shape.name == device.name
+    assert 5 == len(device.peripherals)
+    base, derived = device.peripherals[0], device.peripherals[3]
+    assert base is derived.derived_from
+    assert 4 == len(base.registers)
+    assert 5 == len(base.registers[0].fields)
+    field = base.registers[0].fields[4]
+    assert (24, 6) == (field.bit_offset, field.bit_width)
+    assert 2 == len(field.enumerated_values.enumerated_values)
+
+
+def test_benchmark_times_every_phase():
+    result = benchmark(
+        SyntheticDevice(2, 2, 2, 2), RunConfig(repeat=2, trusted=True)
+    )
+
+    assert set(PHASES) == set(result["phases"])
+    for timing in result["phases"].values():
+        assert 2 == len(timing["runs"])
+        assert timing["min"] <= timing["median"]
+
+
+def test_startup_times_each_run():
+    times = startup_times("register_code_gen.client:client", 2)
+
+    assert 2 == len(times)
+    assert all(t > 0 for t in times)
+
+
+def test_startup_fails_over_the_budget():
+    command = "register_code_gen.client:client"
+
+    result = CliRunner().invoke(
+        main, ["--command", command, "--repeat", "1", "--budget", "0.001"]
+    )
+
+    assert 1 == result.exit_code
+    assert f"Over the budget: {command}" in result.output
@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional, Tuple, Union
+
+import pytest
+
+Elements = Union[str, Iterable[str]]
+
+CPU = """  <cpu>
+    <name>CM4</name>
+    <revision>r0p1</revision>
+    <endian>little</endian>
+    <mpuPresent>true</mpuPresent>
+    <fpuPresent>false</fpuPresent>
+    <nvicPrioBits>4</nvicPrioBits>
+    <vendorSystickConfig>false</vendorSystickConfig>
+  </cpu>
+"""
+
+DEVICE = """<?xml version="1.0" encoding="utf-8"?>
+<device schemaVersion="1.1">
+  <vendor>Acme</vendor>
+  <name>{name}</name>
+  <version>1.0</version>
+  <description>{description}</description>
+{cpu}  <addressUnitBits>8</addressUnitBits>
+  <width>32</width>
+  <size>0x20</size>
+  <peripherals>
+{peripherals}
+  </peripherals>
+</device>
+"""
+
+
+def _join(elements: Elements) -> str:
+    if isinstance(elements, str):
+        return elements
+    return "\n".join(elements)
+
+
+def _optional(tag: str, value) -> str:
+    return "" if value is None else f"<{tag}>{value}</{tag}>"
+
+
+def _derived(derived_from: Optional[str]) -> str:
+    return "" if derived_from is None else f' derivedFrom="{derived_from}"'
+
+
+@dataclass(frozen=True)
+class SvdFactory:
+    """Builds small SVD files for tests
+
+    The element methods return XML text, which nests in the element above
+    it, down to `text` for a whole device.  Tests may pass XML of their own
+    wherever elements are expected.
+    """
+
+    directory: Path
+
+    @staticmethod
+    def enums(
+        values: Iterable[Tuple[str, int]], name: Optional[str] = None
+    ) -> str:
+        return (
+            f"<enumeratedValues>{_optional('name', name)}"
+            + "".join(
+                f"<enumeratedValue><name>{value_name}</name>"
+                f"<value>{value:#x}</value></enumeratedValue>"
+                for value_name, value in values
+            )
+            + "</enumeratedValues>"
+        )
+
+    @staticmethod
+    def field(
+        name: str,
+        bits: Tuple[int, int],
+        enums: str = "",
+        description: Optional[str] = None,
+        derived_from: Optional[str] = None,
+    ) -> str:
+        """A field at `bits`, its bit offset and width"""
+        bit_offset, bit_width = bits
+        return (
+            f"<field{_derived(derived_from)}><name>{name}</name>"
+            f"{_optional('description', description)}"
+            f"<bitOffset>{bit_offset}</bitOffset>"
+            f"<bitWidth>{bit_width}</bitWidth>{enums}</field>"
+        )
+
+    @staticmethod
+    def register(
+        name: str,
+        offset: int,
+        fields: Elements = (),
+        description: Optional[str] = None,
+        derived_from: Optional[str] = None,
+    ) -> str:
+        fields = _join(fields)
+        return (
+            f"        <register{_derived(derived_from)}><name>{name}</name>"
+            f"{_optional('description', description)}"
+            f"<addressOffset>{offset:#x}</addressOffset>"
+            f"{f'<fields>{fields}</fields>' if fields else ''}</register>"
+        )
+
+    @staticmethod
+    def peripheral(
+        name: str,
+        address: int,
+        registers: Elements = (),
+        description: Optional[str] = None,
+        derived_from: Optional[str] = None,
+    ) -> str:
+        lines = [
+            f"    <peripheral{_derived(derived_from)}>",
+            f"      <name>{name}</name>",
+        ]
+        if description is not None:
+            lines.append(f"      <description>{description}</description>")
+        lines.append(f"      <baseAddress>{address:#x}</baseAddress>")
+        if registers := _join(registers):
+            lines += ["      <registers>", registers, "      </registers>"]
+        lines.append("    </peripheral>")
+        return "\n".join(lines)
+
+    @staticmethod
+    def text(
+        peripherals: Elements,
+        name: str = "ACME1",
+        description: str = "Acme test device",
+        cpu: bool = False,
+    ) -> str:
+        return DEVICE.format(
+            name=name,
+            description=description,
+            cpu=CPU if cpu else "",
+            peripherals=_join(peripherals),
+        )
+
+    def write(
+        self,
+        peripherals: Elements,
+        name: str = "ACME1",
+        filename: Optional[str] = None,
+        **device,
+    ) -> Path:
+        """Write a device to `filename`, by default named after the device"""
+        svd_file = self.directory / (filename or f"{name.lower()}.svd")
+        svd_file.write_text(
+            self.text(peripherals, name, **device), encoding="utf-8"
+        )
+        return svd_file
+
+
+@pytest.fixture(name="svd_factory")
+def fixture_svd_factory(tmp_path) -> SvdFactory:
+    return SvdFactory(tmp_path)
@@ -0,0 +1,120 @@
+import zipfile
+
+import click
+import pytest
+
+from register_code_gen.batch import (
+    collect_inputs,
+    device_name,
+    format_summary,
+    generate_all,
+)
+from register_code_gen.sources import SvdSource
+
+
+def write_svd(svd_factory, name, filename):
+    gpioa = svd_factory.peripheral(
+        "GPIOA",
+        0x40000000,
+        [
+            svd_factory.register(
+                "MODER",
+                0x0,
+                svd_factory.field("MODE0", (0, 2), description="Mode 0"),
+                description="Mode register",
+            ),
+            svd_factory.register(
+                "IDR",
+                0x4,
+                svd_factory.field("IDR0", (0, 1), description="Input 0"),
+                description="Input data",
+            ),
+        ],
+        description="General purpose IO",
+    )
+    gpiob = svd_factory.peripheral("GPIOB", 0x40000400, derived_from="GPIOA")
+    svd_factory.write([gpioa, gpiob], name, filename)
+
+
+@pytest.fixture(name="svd_dir")
+def fixture_svd_dir(tmp_path, svd_factory):
+    svd_dir = tmp_path / "svd"
+    svd_dir.mkdir()
+    for name in ["ACME1", "ACME2"]:
+        write_svd(svd_factory, name, f"svd/{name.lower()}.svd")
+    (svd_dir / "broken.svd").write_text("<device>")
+    return svd_dir
+
+
+def test_collect_inputs(svd_dir):
+    manifest = svd_dir / "manifest.txt"
+    manifest.write_text("# devices\nacme1.svd\n\nacme*.svd  # again\n")
+
+    assert [
+        svd_dir / "acme1.svd",
+        svd_dir / "acme2.svd",
+        svd_dir / "broken.svd",
+    ] == [s.path for s in collect_inputs([str(svd_dir)])]
+    assert [svd_dir / "acme1.svd", svd_dir / "acme2.svd"] == [
+        s.path for s in collect_inputs([], manifest)
+    ]
+    assert [svd_dir / "acme2.svd"] == [
+        s.path for s in collect_inputs([str(svd_dir / "*2.svd")])
+    ]
+    with pytest.raises(click.BadParameter):
+        collect_inputs([str(svd_dir / "missing*.svd")])
+
+
+def test_collect_inputs_from_archive(svd_dir, tmp_path):
+    pack = tmp_path / "vendor.pack"
+    with zipfile.ZipFile(pack, "w") as archive:
+        archive.write(svd_dir / "acme1.svd", "SVD/acme1.svd")
+        archive.write(svd_dir / "acme2.svd", "SVD/acme2.svd")
+        archive.writestr("README.txt", "")
+
+    result = collect_inputs([f"{tmp_path}/*.pack!SVD/*.svd"])
+
+    assert [
+        SvdSource(pack, "SVD/acme1.svd"),
+        SvdSource(pack, "SVD/acme2.svd"),
+    ] == result
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_generate_all(svd_dir, tmp_path, jobs):
+    input_files = collect_inputs([str(svd_dir)])
+
+    results = generate_all(input_files, tmp_path / "out", jobs=jobs)
+
+    assert input_files == [r.input_file for r in results]
+    assert ["ACME1", "ACME2", None] == [r.device_name for r in results]
+    assert [True, True, False] == [r.ok for r in results]
+    assert (tmp_path / "out/acme1/include/acme1/gpioa.h").exists()
+    assert (tmp_path / "out/acme2/src/acme2.c").exists()
+
+    summary, failures = format_summary(results)
+    assert 1 == failures
+    assert "2 succeeded, 1 failed" in summary
+
+
+def test_device_name(svd_dir):
+    assert "ACME1" == device_name(SvdSource(svd_dir / "acme1.svd"))
+    assert device_name(SvdSource(svd_dir / "broken.svd")) is None
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_generate_all_skips_inputs_with_the_same_device(
+    svd_dir, tmp_path, svd_factory, jobs
+):
+    write_svd(svd_factory, "acme2", "svd/copy.svd")
+    input_files = collect_inputs([str(svd_dir)])
+
+    results = generate_all(input_files, tmp_path / "out", jobs=jobs)
+
+    assert ["acme1.svd", "acme2.svd", "broken.svd", "copy.svd"] == [
+        r.input_file.name for r in results
+    ]
+    assert [True, True, False, False] == [r.ok for r in results]
+    assert "Same device name as" in results[3].error
+    assert 0.0 == results[3].seconds
+    assert (tmp_path / "out/acme2/src/acme2.c").exists()
@@ -0,0 +1,538 @@
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from register_code_gen.generator import (
+    Generator,
+    generate,
+    identical_layouts,
+    load_device,
+    render_peripheral,
+    run,
+)
+from register_code_gen.layout import cluster_size, struct_members
+from register_code_gen.options import Options, OutputOptions
+from svd.peripheral import Peripheral
+
+
+def register_dict(name, offset, **dim):
+    return {
+        "name": name,
+        "addressOffset": hex(offset),
+        "size": "32",
+        **dim,
+    }
+
+
+def test_struct_members():
+    peripheral = Peripheral.from_dict(
+        {
+            "name": "TIM",
+            "baseAddress": "0x40000000",
+            "registers": {
+                "register": [
+                    register_dict("TIM_CR", 0x0),
+                    register_dict("CCR[%s]", 0x4, dim="4", dimIncrement="4"),
+                    register_dict("BUF[%s]", 0x20, dim="2", dimIncrement="8"),
+                    register_dict(
+                        "CH%s", 0x24, dim="2", dimIncrement="8", dimIndex="A,B"
+                    ),
+                ]
+            },
+        }
+    )
+
+    result = [(m.offset, m.name, m.count) for m in struct_members(peripheral)]
+
+    assert [
+        (0x0, "cr", None),
+        (0x4, "ccr", 4),
+        (0x20, "buf0", None),
+        (0x28, "buf1", None),
+        (0x24, "cha", None),
+        (0x2C, "chb", None),
+    ] == result
+
+
+def test_struct_members_of_clusters():
+    channel = {
+        "name": "CH[%s]",
+        "addressOffset": "0x8",
+        "dim": "3",
+        "dimIncrement": "0x10",
+        "register": [register_dict("CCR", 0x0), register_dict("CNDTR", 0x4)],
+    }
+    peripheral = Peripheral.from_dict(
+        {
+            "name": "DMA",
+            "baseAddress": "0x40020000",
+            "registers": {
+                "register": register_dict("ISR", 0x0),
+                "cluster": channel,
+            },
+        }
+    )
+    (cluster,) = peripheral.clusters
+
+    result = [
+        (m.type_name, m.offset, m.name, m.count)
+        for m in struct_members(peripheral)
+    ]
+
+    assert [
+        ("DMA_isr_t", 0x0, "isr", None),
+        ("DMA_CH_t", 0x8, "ch", 3),
+    ] == result
+    assert 0x10 == cluster_size(cluster)
+
+
+def test_cluster_size_rejects_overlapping_copies():
+    channel = {
+        "name": "CH[%s]",
+        "addressOffset": "0x0",
+        "dim": "2",
+        "dimIncrement": "0x4",
+        "register": [register_dict("CCR", 0x0), register_dict("CNDTR", 0x4)],
+    }
+    peripheral = Peripheral.from_dict(
+        {
+            "name": "DMA",
+            "baseAddress": "0x40020000",
+            "registers": {"cluster": channel},
+        }
+    )
+    (cluster,) = peripheral.clusters
+
+    with pytest.raises(ValueError):
+        cluster_size(cluster)
+
+
+def test_write_peripheral_renders_whole_header():
+    peripheral = Peripheral.from_dict(
+        {
+            "name": "TIM",
+            "baseAddress": "0x40000000",
+            "size": "32",
+            "registers": {
+                "register": [
+                    register_dict("CR", 0x0),
+                    register_dict("SR", 0x4),
+                ]
+            },
+        }
+    )
+    result = render_peripheral(peripheral)
+
+    assert result.startswith("/**\n")
+    assert "TIM_cr_t cr;\n" in result
+    assert result.endswith("#endif // TIM_H_\n")
+
+
+def mode_peripheral(svd_factory, name, address, mode_width=2):
+    return svd_factory.peripheral(
+        name,
+        address,
+        [
+            svd_factory.register(
+                "CR",
+                0x0,
+                [
+                    svd_factory.field(
+                        "EN",
+                        (0, 1),
+                        svd_factory.enums([("OFF", 0), ("ON", 1)]),
+                        description="Enable",
+                    ),
+                    svd_factory.field(
+                        "MODE", (1, mode_width), description="Mode"
+                    ),
+                ],
+                description="Control",
+            ),
+            svd_factory.register("CR2", 0x4, derived_from="CR"),
+        ],
+        description=f"{name} peripheral",
+    )
+
+
+def test_run_with_jobs_matches_serial(tmp_path, svd_factory):
+    svd_file = write_svd(svd_factory, [f"P{i}" for i in range(5)])
+
+    run(svd_file, tmp_path / "serial")
+    run(svd_file, tmp_path / "parallel", output_options=OutputOptions(jobs=3))
+
+    serial = sorted((tmp_path / "serial").rglob("*.[ch]"))
+    assert 7 == len(serial)
+    for path in serial:
+        parallel = tmp_path / "parallel" / path.relative_to(tmp_path / "serial")
+        assert path.read_text() == parallel.read_text()
+    header = (tmp_path / "serial/include/acme1/p0.h").read_text()
+    assert 1 == header.count("typedef enum P0_en_e")
+
+
+def write_svd(svd_factory, names, mode_width=2, filename=None):
+    """Write peripherals `names`, the first with a `mode_width` bit MODE"""
+    return svd_factory.write(
+        [
+            mode_peripheral(
+                svd_factory,
+                name,
+                0x40000000 + i * 0x400,
+                mode_width if i == 0 else 2,
+            )
+            for i, name in enumerate(names)
+        ],
+        filename=filename,
+    )
+
+
+def output_mtimes(output_dir):
+    """Map each output file to its mtime, then age them all to the epoch"""
+    mtimes = {}
+    for path in output_dir.rglob("*.[ch]"):
+        mtimes[path.relative_to(output_dir).as_posix()] = path.stat().st_mtime
+        os.utime(path, (0, 0))
+    return mtimes
+
+
+def test_incremental_run_rewrites_only_changed_files(tmp_path, svd_factory):
+    output_dir = tmp_path / "out"
+    incremental = OutputOptions(incremental=True)
+    svd_file = write_svd(svd_factory, ["P0", "P1", "P2"])
+    run(svd_file, output_dir, output_options=incremental)
+    first = output_mtimes(output_dir)
+
+    assert all(mtime != 0 for mtime in first.values())
+    assert {
+        "include/acme1/acme1.h",
+        "include/acme1/p0.h",
+        "include/acme1/p1.h",
+        "include/acme1/p2.h",
+        "src/acme1.c",
+    } == set(first)
+
+    write_svd(svd_factory, ["P0", "P1", "P2"], mode_width=3)
+    run(svd_file, output_dir, output_options=incremental)
+    second = output_mtimes(output_dir)
+
+    changed = {path for path, mtime in second.items() if mtime != 0}
+    assert {"include/acme1/p0.h"} == changed
+
+    write_svd(svd_factory, ["P0", "P1"], mode_width=3)
+    run(svd_file, output_dir, output_options=incremental)
+    third = output_mtimes(output_dir)
+
+    changed = {path for path, mtime in third.items() if mtime != 0}
+    assert "include/acme1/p2.h" not in third
+    assert {"include/acme1/acme1.h", "src/acme1.c"} == changed
+
+
+def test_identical_layouts(tmp_path, svd_factory):
+    svd_file = write_svd(svd_factory, ["P0", "P1", "P2"], mode_width=3)
+    device = run(svd_file, tmp_path / "out")
+
+    aliases = identical_layouts(device)
+    assert ["P2"] == list(aliases)
+    assert "P1" == aliases["P2"].name
+
+
+def test_run_dedupes_identical_layouts(tmp_path, svd_factory):
+    output_dir = tmp_path / "out"
+    svd_file = write_svd(svd_factory, ["P0", "P1", "P2"], mode_width=3)
+    run(svd_file, output_dir, output_options=OutputOptions(dedupe_layouts=True))
+
+    headers = sorted(p.name for p in (output_dir / "include/acme1").iterdir())
+    assert ["acme1.h", "p0.h", "p1.h"] == headers
+    main_header = (output_dir / "include/acme1/acme1.h").read_text()
+    assert '#include "acme1/p2.h"' not in main_header
+    assert (
+        "typedef P1_peripheral_registers_t P2_peripheral_registers_t;\n"
+        in main_header
+    )
+    assert "extern P2_peripheral_registers_t volatile * P2;" in main_header
+
+
+def test_run_with_split_headers(tmp_path, svd_factory):
+    output_dir = tmp_path / "out"
+    svd_file = write_svd(svd_factory, ["P0", "P1"])
+    run(
+        svd_file,
+        output_dir,
+        output_options=OutputOptions(header_layout="split"),
+    )
+
+    include_dir = output_dir / "include/acme1"
+    headers = sorted(p.name for p in include_dir.iterdir())
+    assert [
+        "acme1.h",
+        "p0.h",
+        "p0_enums.h",
+        "p0_regs.h",
+        "p1.h",
+        "p1_enums.h",
+        "p1_regs.h",
+    ] == headers
+    main_header = (include_dir / "acme1.h").read_text()
+    assert "#include" not in main_header
+    assert (
+        "typedef struct P0_peripheral_registers_s P0_peripheral_registers_t;\n"
+        in main_header
+    )
+    enums = (include_dir / "p0_enums.h").read_text()
+    assert 1 == enums.count("typedef enum P0_en_e")
+    registers = (include_dir / "p0_regs.h").read_text()
+    assert '#include "acme1/p0_enums.h"\n' in registers
+    assert "typedef enum" not in registers
+    assert "typedef union P0_cr_u" in registers
+    struct = (include_dir / "p0.h").read_text()
+    assert '#include "acme1/p0_regs.h"\n' in struct
+    assert "} P0_peripheral_registers_t;\n" in struct
+
+
+def test_run_dumps_json_only_when_asked(tmp_path, svd_factory):
+    output_dir = tmp_path / "out"
+    svd_file = write_svd(svd_factory, ["P0", "P1"])
+    run(svd_file, output_dir)
+    assert not list(output_dir.glob("*.json*"))
+
+    run(
+        svd_file,
+        output_dir,
+        output_options=OutputOptions(json_format="lines", json_model=True),
+    )
+    lines = (output_dir / "acme1.jsonl").read_text().splitlines()
+    device, *peripherals = [json.loads(line) for line in lines]
+    assert "ACME1" == device["name"]
+    assert ["P0", "P1"] == [p["name"] for p in peripherals]
+    assert "parent" not in peripherals[0]["registers"][0]
+
+
+def output_files(output_dir):
+    return {
+        path.relative_to(output_dir).as_posix(): path.read_text()
+        for path in sorted(output_dir.rglob("*.[ch]"))
+    }
+
+
+def test_generate_repeatedly_gives_identical_output(tmp_path, svd_factory):
+    svd_file = write_svd(svd_factory, ["P0", "P1"])
+    device, _ = load_device(svd_file)
+
+    first = generate(device, tmp_path / "first")
+    second = generate(device, tmp_path / "second")
+
+    assert first.values() and list(first.values()) == list(second.values())
+    files = output_files(tmp_path / "first")
+    assert files == output_files(tmp_path / "second")
+    assert 1 == files["include/acme1/p1.h"].count("typedef enum P1_en_e")
+
+
+def test_generator_runs_concurrently_from_threads(tmp_path, svd_factory):
+    svd_files = []
+    for i in range(4):
+        svd_file = write_svd(
+            svd_factory,
+            [f"P{j}" for j in range(i + 2)],
+            mode_width=i + 1,
+            filename=f"acme{i}.svd",
+        )
+        svd_files.append(svd_file)
+    generator = Generator(
+        Options(trusted=True), OutputOptions(shared_enums="content")
+    )
+    for svd_file in svd_files:
+        generator.run(svd_file, tmp_path / "serial" / svd_file.stem)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(
+            pool.map(
+                lambda f: generator.run(f, tmp_path / "threads" / f.stem),
+                svd_files * 2,
+            )
+        )
+
+    for svd_file in svd_files:
+        serial = output_files(tmp_path / "serial" / svd_file.stem)
+        assert serial
+        assert serial == output_files(tmp_path / "threads" / svd_file.stem)
+
+
+def timer(svd_factory, name, address, enums=""):
+    """A timer whose MODE2 field derives from MODE, overriding its `enums`"""
+    return svd_factory.peripheral(
+        name,
+        address,
+        svd_factory.register(
+            "CR",
+            0x0,
+            [
+                svd_factory.field(
+                    "MODE",
+                    (0, 2),
+                    svd_factory.enums([("SLOW", 0), ("FAST", 1)]),
+                    description="Mode",
+                ),
+                svd_factory.field("MODE2", (2, 2), enums, derived_from="MODE"),
+            ],
+            description="Control",
+        ),
+        description="Timer",
+    )
+
+
+STATIC_ASSERT_H = """#include <stddef.h>
+#define STATIC_ASSERT_TYPE_SIZE(type, size) \\
+    _Static_assert(sizeof(type) == (size), #type)
+#define STATIC_ASSERT_MEMBER_OFFSET(type, member, offset) \\
+    _Static_assert(offsetof(type, member) == (offset), #member)
+"""
+
+
+def compile_output(output_dir):
+    """Check that the generated sources and each header on its own compile,
+    when gcc is installed
+    """
+    gcc = shutil.which("gcc")
+    if gcc is None:
+        pytest.skip("gcc is not installed")
+    support_dir = output_dir / "support"
+    support_dir.mkdir()
+    (support_dir / "static_assert.h").write_text(STATIC_ASSERT_H)
+    sources = [*(output_dir / "src").glob("*.c")]
+    sources += (output_dir / "include").glob("**/*.h")
+    for source in sources:
+        subprocess.run(
+            [
+                gcc,
+                "-std=c11",
+                "-fsyntax-only",
+                "-Werror",
+                f"-I{output_dir / 'include'}",
+                f"-I{support_dir}",
+                "-x",
+                "c",
+                str(source),
+            ],
+            check=True,
+        )
+
+
+def test_run_types_chained_derivations_by_their_root(tmp_path, svd_factory):
+    svd_file = svd_factory.write(
+        [
+            timer(svd_factory, "TIM1", 0x40000000),
+            svd_factory.peripheral("TIM2", 0x40000400, derived_from="TIM1"),
+            svd_factory.peripheral("TIM3", 0x40000800, derived_from="TIM2"),
+        ]
+    )
+    output_dir = tmp_path / "out"
+    run(svd_file, output_dir)
+
+    header = (output_dir / "include/acme1/tim1.h").read_text()
+    assert "TIM1_mode_t  mode2:2;" in header
+    assert "TIM1_mode2_t" not in header
+    main_header = (output_dir / "include/acme1/acme1.h").read_text()
+    assert "TIM2_peripheral_registers_t" not in main_header
+    assert "extern TIM1_peripheral_registers_t volatile * TIM3;" in main_header
+    compile_output(output_dir)
+
+
+def test_run_types_fields_derived_from_another_peripheral_locally(
+    tmp_path, svd_factory
+):
+    svd_file = svd_factory.write(
+        [
+            svd_factory.peripheral(
+                "BTIM",
+                0x40000000,
+                [
+                    svd_factory.register("CR", 0x0, derived_from="ZTIM.CR"),
+                    svd_factory.register(
+                        "CR2",
+                        0x4,
+                        svd_factory.field(
+                            "MODE", (0, 2), derived_from="ZTIM.CR.MODE"
+                        ),
+                    ),
+                ],
+            ),
+            timer(svd_factory, "ZTIM", 0x40000400),
+        ]
+    )
+    output_dir = tmp_path / "out"
+    run(svd_file, output_dir)
+
+    header = (output_dir / "include/acme1/btim.h").read_text()
+    assert "ZTIM" not in header
+    assert "BTIM_mode_t  mode:2;" in header
+    assert "BTIM_mode2_t  mode2:2;" in header
+    compile_output(output_dir)
+
+
+CHANNELS = """        <cluster>
+          <name>CH</name>
+          <description>Channel</description>
+          <addressOffset>0x0</addressOffset>
+          <register>
+            <name>CCR</name>
+            <description>Channel control</description>
+            <addressOffset>0x0</addressOffset>
+          </register>
+          <register>
+            <name>CNDTR</name>
+            <description>Transfer count</description>
+            <addressOffset>0x4</addressOffset>
+          </register>
+        </cluster>
+        <cluster derivedFrom="CH">
+          <name>C2</name>
+          <addressOffset>0x8</addressOffset>
+        </cluster>
+        <cluster derivedFrom="C2">
+          <name>C3</name>
+          <addressOffset>0x10</addressOffset>
+        </cluster>"""
+
+
+def test_run_types_chained_derived_clusters_by_their_root(
+    tmp_path, svd_factory
+):
+    svd_file = svd_factory.write(
+        [
+            svd_factory.peripheral(
+                "DMA", 0x40020000, CHANNELS, description="DMA controller"
+            ),
+            svd_factory.peripheral("DMA2", 0x40020400, derived_from="DMA"),
+        ]
+    )
+    output_dir = tmp_path / "out"
+    run(svd_file, output_dir)
+
+    header = (output_dir / "include/acme1/dma.h").read_text()
+    assert 1 == header.count("} DMA_CH_t;")
+    assert "DMA_C2_t" not in header
+    assert "DMA_CH_t c3;" in header
+    compile_output(output_dir)
+
+
+def test_identical_layouts_compare_enums_of_derived_fields(
+    tmp_path, svd_factory
+):
+    svd_file = svd_factory.write(
+        [
+            timer(svd_factory, "TIM1", 0x40000000),
+            timer(
+                svd_factory, "TIM4", 0x40000400, svd_factory.enums([("OFF", 0)])
+            ),
+            timer(svd_factory, "TIM5", 0x40000800),
+        ]
+    )
+    device = run(svd_file, tmp_path / "out")
+
+    assert {"TIM5": "TIM1"} == {
+        name: first.name for name, first in identical_layouts(device).items()
+    }
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from register_code_gen.json_dump import COMPACT, LINES, PRETTY, write_json
+
+DOCUMENT = {
+    "device": {
+        "name": "ACME1",
+        "peripherals": {
+            "peripheral": [
+                {"name": "P0", "registers": {"register": [{"name": "CR"}]}},
+                {"name": "P1", "derivedFrom": "P0"},
+            ]
+        },
+    }
+}
+
+
+@pytest.mark.parametrize("json_format", [PRETTY, COMPACT])
+def test_write_json_round_trips(tmp_path, json_format):
+    path = tmp_path / "acme1.json"
+    write_json(path, DOCUMENT, json_format)
+
+    assert DOCUMENT == json.loads(path.read_text())
+
+
+def test_write_compact_json_has_no_whitespace(tmp_path):
+    path = tmp_path / "acme1.json"
+    write_json(path, DOCUMENT, COMPACT)
+
+    assert json.dumps(DOCUMENT, separators=(",", ":")) == path.read_text()
+
+
+def test_write_json_lines_puts_each_peripheral_on_a_line(tmp_path):
+    path = tmp_path / "acme1.jsonl"
+    write_json(path, DOCUMENT, LINES)
+
+    lines = path.read_text().splitlines()
+    assert [
+        {"name": "ACME1"},
+        {"name": "P0", "registers": {"register": [{"name": "CR"}]}},
+        {"name": "P1", "derivedFrom": "P0"},
+    ] == [json.loads(line) for line in lines]
+
+
+def test_write_json_lines_of_single_peripheral(tmp_path):
+    path = tmp_path / "acme1.jsonl"
+    document = {"device": {"name": "ACME1", "peripherals": {"peripheral": {}}}}
+    document["device"]["peripherals"]["peripheral"] = {"name": "P0"}
+    write_json(path, document, LINES)
+
+    assert '{"name":"ACME1"}\n{"name":"P0"}\n' == path.read_text()
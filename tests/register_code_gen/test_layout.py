@@ -0,0 +1,69 @@
+from register_code_gen.layout import register_layout, struct_layout
+from svd.peripheral import Peripheral
+
+
+def register_dict(name, offset, **extra):
+    return {
+        "name": name,
+        "addressOffset": hex(offset),
+        "size": "32",
+        **extra,
+    }
+
+
+def test_struct_layout_pads_gaps_and_groups_unions():
+    peripheral = Peripheral.from_dict(
+        {
+            "name": "GPIO",
+            "baseAddress": "0x40000000",
+            "registers": {
+                "register": [
+                    register_dict("MODER", 0x0),
+                    register_dict("IDR", 0x10),
+                    register_dict("ALT", 0x10),
+                ]
+            },
+        }
+    )
+
+    result = struct_layout(peripheral, "GPIO_s", "GPIO_t", None, 0x20)
+
+    assert [
+        (0x0, 0x0, ["moder"]),
+        (0x4, 0xC, ["alt", "idr"]),
+        (0x14, 0xC, []),
+    ] == [
+        (slot.reserved_offset, slot.reserved, [m.name for m in slot.members])
+        for slot in result.slots
+    ]
+    assert ["moder", "idr", "alt"] == [m.name for m in result.members]
+
+
+def test_register_layout_reserves_unused_bits():
+    fields = [
+        {"name": "EN", "bitOffset": "0", "bitWidth": "1"},
+        {
+            "name": "MODE",
+            "bitOffset": "4",
+            "bitWidth": "2",
+            "access": "read-only",
+        },
+    ]
+    peripheral = Peripheral.from_dict(
+        {
+            "name": "TIM",
+            "baseAddress": "0x40000000",
+            "registers": {
+                "register": register_dict("CR", 0x0, fields={"field": fields})
+            },
+        }
+    )
+
+    result = register_layout(peripheral.registers[0])
+
+    assert "TIM_cr_t" == result.type_name
+    assert [
+        ("en", 1, False, False),
+        ("reserved_01", 3, True, True),
+        ("mode", 2, True, False),
+    ] == [(f.name, f.bit_width, f.const, f.reserved) for f in result.fields]
@@ -0,0 +1,59 @@
+from register_code_gen.manifest import MANIFEST_NAME, OutputManifest, write_file
+
+
+def test_write_file_skips_identical_content(tmp_path):
+    path = tmp_path / "include/a.h"
+    manifest = OutputManifest.load(tmp_path)
+
+    key, digest = write_file(path, "int a;\n", manifest)
+    mtime = path.stat().st_mtime_ns
+    manifest.save({key: digest})
+    manifest = OutputManifest.load(tmp_path)
+    result = write_file(path, "int a;\n", manifest)
+
+    assert ("include/a.h", digest) == result
+    assert {"include/a.h": digest} == manifest.hashes
+    assert mtime == path.stat().st_mtime_ns
+
+
+def test_write_file_compares_files_missing_from_manifest(tmp_path):
+    path = tmp_path / "a.h"
+    path.write_text("int a;\n")
+    mtime = path.stat().st_mtime_ns
+    manifest = OutputManifest.load(tmp_path)
+
+    write_file(path, "int a;\n", manifest)
+    assert mtime == path.stat().st_mtime_ns
+    write_file(path, "int b;\n", manifest)
+    assert "int b;\n" == path.read_text()
+
+
+def test_write_file_restores_deleted_file(tmp_path):
+    path = tmp_path / "a.h"
+    manifest = OutputManifest(tmp_path)
+    manifest.hashes = dict([write_file(path, "int a;\n", manifest)])
+    path.unlink()
+
+    write_file(path, "int a;\n", manifest)
+
+    assert "int a;\n" == path.read_text()
+
+
+def test_save_removes_stale_files(tmp_path):
+    (tmp_path / "a.h").write_text("")
+    (tmp_path / "b.h").write_text("")
+    (tmp_path / "user.h").write_text("")
+    manifest = OutputManifest(tmp_path, {"a.h": "0", "b.h": "0"})
+
+    manifest.save({"a.h": "1"})
+
+    assert (tmp_path / "a.h").exists()
+    assert not (tmp_path / "b.h").exists()
+    assert (tmp_path / "user.h").exists()
+    assert {"a.h": "1"} == OutputManifest.load(tmp_path).hashes
+
+
+def test_load_ignores_corrupt_manifest(tmp_path):
+    (tmp_path / MANIFEST_NAME).write_text("{not json")
+
+    assert {} == OutputManifest.load(tmp_path).hashes
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+import xmltodict
+
+from register_code_gen.model_cache import ModelCache
+from svd.device import Device
+
+
+@pytest.fixture(name="svd_text")
+def fixture_svd_text(svd_factory):
+    return svd_factory.text(
+        [
+            svd_factory.peripheral("GPIOA", 0x40000000),
+            svd_factory.peripheral("GPIOB", 0x40000400, derived_from="GPIOA"),
+        ],
+        cpu=True,
+    )
+
+
+def test_model_cache_round_trip(tmp_path, svd_text):
+    svd_file = tmp_path / "acme1.svd"
+    svd_file.write_text(svd_text, encoding="utf-8")
+    device = Device.from_dict(xmltodict.parse(svd_text)["device"])
+    cache = ModelCache(tmp_path / "cache")
+    key = cache.key(svd_file)
+
+    assert None is cache.load(key)
+    cache.store(key, device)
+    result = cache.load(key)
+
+    assert device.name == result.name
+    assert device.cpu == result.cpu
+    gpioa, gpiob = result.peripherals
+    assert result is gpioa.parent
+    assert gpioa is gpiob.derived_from
+
+
+def test_model_cache_key_tracks_content_and_variant(tmp_path, svd_text):
+    svd_file = tmp_path / "acme1.svd"
+    svd_file.write_text(svd_text, encoding="utf-8")
+    cache = ModelCache(tmp_path / "cache")
+    key = cache.key(svd_file)
+
+    assert key == cache.key(svd_file)
+    assert key != cache.key(svd_file, trusted=True)
+    svd_file.write_text(svd_text.replace("ACME1", "ACME2"), encoding="utf-8")
+    assert key != cache.key(svd_file)
+
+
+def test_model_cache_evicts_least_recently_used(tmp_path):
+    cache = ModelCache(tmp_path, max_bytes=200)
+    for i, name in enumerate(["old", "used", "new"]):
+        path = cache.path(name)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (i, i))
+    os.utime(cache.path("used"), (10, 10))
+
+    cache.evict()
+
+    assert not cache.path("old").exists()
+    assert cache.path("used").exists()
+    assert cache.path("new").exists()
+
+
+def test_model_cache_discards_corrupt_entry(tmp_path):
+    cache = ModelCache(tmp_path)
+    cache.path("bad").write_bytes(b"not a model")
+
+    assert None is cache.load("bad")
+    assert not cache.path("bad").exists()
@@ -0,0 +1,93 @@
+import json
+import pstats
+
+import pytest
+
+from register_code_gen import profiling
+from register_code_gen.generator import Generator
+from register_code_gen.options import OutputOptions
+from register_code_gen.profiling import Profile, hook, profile_run, span
+
+
+@pytest.fixture(name="svd_file")
+def fixture_svd_file(svd_factory):
+    return svd_factory.write(
+        svd_factory.peripheral(
+            f"P{i}", 0x40000000 + i * 0x400, svd_factory.register("CR", 0x0)
+        )
+        for i in range(3)
+    )
+
+
+def test_spans_nest_and_only_time_while_hooked():
+    with span("ignored"):
+        pass
+
+    with hook(Profile()) as recorder:
+        with span("outer"):
+            with span("inner", item="A"):
+                profiling.metric("hits", 0.5)
+
+    assert [("outer", "inner"), ("outer",)] == [s.path for s in recorder.spans]
+    assert {"item": "A"} == recorder.spans[0].attributes
+    assert {"hits": 0.5} == recorder.metrics
+    assert not profiling.enabled()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_reports_each_phase(tmp_path, svd_file, jobs):
+    generator = Generator(output_options=OutputOptions(jobs=jobs))
+
+    with hook(Profile()) as recorder:
+        generator.run(svd_file, tmp_path / "out")
+
+    totals = {t.path: t for t in recorder.totals()}
+    assert {
+        ("run",),
+        ("run", "load"),
+        ("run", "load", "parse"),
+        ("run", "load", "build"),
+        ("run", "load", "resolve"),
+        ("run", "write_peripherals"),
+        ("run", "write_peripherals", "peripheral"),
+        ("run", "write_peripherals", "peripheral", "render"),
+        ("run", "write_peripherals", "peripheral", "write_files"),
+        ("run", "write_device"),
+        ("run", "write_device", "render"),
+        ("run", "write_device", "write_files"),
+    } == set(totals)
+    assert 3 == totals["run", "write_peripherals", "peripheral"].count
+    assert ("run",) == recorder.totals()[0].path
+    assert 0.0 < recorder.metrics["literal_cache_hit_rate"] <= 1.0
+    peripherals = {
+        s.attributes["peripheral"]
+        for s in recorder.spans
+        if s.name == "peripheral"
+    }
+    assert {"P0", "P1", "P2"} == peripherals
+
+
+def test_run_reports_the_cache_hit_rate_of_that_run(tmp_path, svd_file):
+    generator = Generator()
+    generator.run(svd_file, tmp_path / "first")
+
+    with hook(Profile()) as recorder:
+        generator.run(svd_file, tmp_path / "second")
+
+    # Every literal was parsed by the first run already
+    assert 1.0 == recorder.metrics["literal_cache_hit_rate"]
+
+
+def test_profile_run_writes_trace_and_stats(tmp_path, svd_file):
+    trace_file = tmp_path / "trace.json"
+    stats_file = tmp_path / "run.pstats"
+
+    with profile_run(trace_file, stats_file) as recorder:
+        Generator().run(svd_file, tmp_path / "out")
+
+    trace = json.loads(trace_file.read_text())
+    assert len(recorder.spans) == len(trace["traceEvents"])
+    assert {"X"} == {event["ph"] for event in trace["traceEvents"]}
+    assert "literal_cache_hit_rate" in trace["otherData"]["metrics"]
+    assert pstats.Stats(str(stats_file)).total_calls > 0
+    assert "write_peripherals" in recorder.table()
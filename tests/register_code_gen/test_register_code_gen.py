@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+from register_code_gen import register_code_gen
+
+HEAVY_MODULES = ("pydantic", "xmltodict", "rich", "jinja2", "svd.device")
+
+
+def modules_after_help(command: str):
+    """Run `command --help` and return the modules it imported"""
+    module, function = command.split(":")
+    code = (
+        "import sys\n"
+        f"from {module} import {function}\n"
+        "try:\n"
+        f"    {function}(['--help'])\n"
+        "except SystemExit:\n"
+        "    print(*sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "Usage:" in result.stdout
+    return set(result.stdout.splitlines()[-1].split())
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        "register_code_gen.register_code_gen:main",
+        "register_code_gen.batch:batch",
+        "register_code_gen.client:client",
+    ],
+)
+def test_help_imports_no_heavy_modules(command):
+    modules = modules_after_help(command)
+
+    assert command.split(":")[0] in modules
+    assert not modules.intersection(HEAVY_MODULES)
+
+
+def test_generator_names_load_on_first_use():
+    assert "register_code_gen.generator" == register_code_gen.run.__module__
+    with pytest.raises(AttributeError):
+        register_code_gen.no_such_name  # pylint: disable=pointless-statement
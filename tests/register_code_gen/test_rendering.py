@@ -0,0 +1,44 @@
+from register_code_gen.generator import run
+from register_code_gen.layout import SharedEnumsLayout
+from register_code_gen.options import OutputOptions
+from register_code_gen.rendering import Templates
+
+
+def test_templates_cache_compiled_templates(tmp_path):
+    templates = Templates(cache_dir=tmp_path / "cache")
+
+    result = templates.render("enums.h.j2", enums=SharedEnumsLayout("ACME1"))
+
+    assert "#ifndef ACME1_ENUMS_H_\n" in result
+    assert result.endswith("#endif // ACME1_ENUMS_H_\n")
+    assert list((tmp_path / "cache").iterdir())
+
+
+def test_run_with_custom_template(tmp_path, svd_factory):
+    svd_file = svd_factory.write(
+        [
+            svd_factory.peripheral(
+                "TIM", 0x40000000, svd_factory.register("CR", 0x0)
+            ),
+            svd_factory.peripheral("TIM2", 0x40000400, derived_from="TIM"),
+        ]
+    )
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    (template_dir / "device.c.j2").write_text(
+        "{% for instance in device.instances %}\n"
+        "{{ instance.name }} at {{ instance.addresses[0] }}\n"
+        "{% endfor %}\n"
+    )
+    output_dir = tmp_path / "out"
+
+    run(
+        svd_file,
+        output_dir,
+        output_options=OutputOptions(template_dir=template_dir),
+    )
+
+    source = (output_dir / "src/acme1.c").read_text()
+    assert "TIM at 1073741824\nTIM2 at 1073742848\n" == source
+    header = (output_dir / "include/acme1/tim.h").read_text()
+    assert "TIM_cr_t cr;\n" in header
@@ -0,0 +1,152 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+import pytest
+
+from register_code_gen import client
+from register_code_gen.client import (
+    UNIX_SOCKETS,
+    require_unix_sockets,
+    send_request,
+)
+from register_code_gen.options import Options
+from register_code_gen.server import (
+    GenerationServer,
+    ResidentModels,
+    model_size,
+    remove_stale_socket,
+)
+from register_code_gen.sources import SvdSource
+
+
+def write_svd(svd_factory, name):
+    svd_file = svd_factory.write(
+        [
+            svd_factory.peripheral(
+                "P0", 0x40000000, svd_factory.register("CR", 0x0)
+            ),
+            svd_factory.peripheral("P1", 0x40000400, derived_from="P0"),
+        ],
+        name,
+    )
+    return SvdSource(svd_file)
+
+
+def test_resident_models_reuse_and_reload(svd_factory):
+    source = write_svd(svd_factory, "ACME1")
+    models = ResidentModels(1 << 30)
+
+    device, cached = models.get(source, Options())
+    assert not cached
+    assert (device, True) == models.get(source, Options())
+    assert device is models.get(source, Options())[0]
+    assert device is not models.get(source, Options(trusted=True))[0]
+
+    stat = source.path.stat()
+    os.utime(source.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    reloaded, cached = models.get(source, Options())
+    assert not cached and reloaded is not device
+
+
+def test_resident_models_evict_least_recently_used(svd_factory):
+    sources = [write_svd(svd_factory, f"ACME{i}") for i in range(3)]
+    size = model_size(ResidentModels(1 << 30).get(sources[0], Options())[0])
+    models = ResidentModels(size * 2 + size // 2)
+
+    for source in sources[:2]:
+        models.get(source, Options())
+    models.get(sources[0], Options())
+    models.get(sources[2], Options())
+
+    names = [device.name for device, _ in models.entries.values()]
+    assert ["ACME0", "ACME2"] == names
+    assert models.size <= models.max_bytes
+
+
+def test_resident_models_load_once_when_requested_concurrently(
+    svd_factory,
+):
+    source = write_svd(svd_factory, "ACME1")
+    models = ResidentModels(1 << 30)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            pool.map(lambda _: models.get(source, Options()), range(8))
+        )
+
+    assert 1 == len({id(device) for device, _ in results})
+    assert 1 == sum(not cached for _, cached in results)
+
+
+needs_unix_sockets = pytest.mark.skipif(
+    not UNIX_SOCKETS, reason="no Unix domain sockets on this platform"
+)
+
+
+@pytest.fixture(name="server")
+def fixture_server(tmp_path):
+    socket_path = tmp_path / "server.sock"
+    with GenerationServer(socket_path, 1 << 30) as generation_server:
+        thread = threading.Thread(
+            target=generation_server.serve_forever, args=(0.05,)
+        )
+        thread.start()
+        yield socket_path
+        generation_server.shutdown()
+        thread.join()
+
+
+def generation_request(tmp_path, source, output_dir=None):
+    return {
+        "input_file": str(source),
+        "output_dir": output_dir,
+        "output_root": str(tmp_path / "out"),
+        "output": {"incremental": False, "dedupe_layouts": False},
+        "model": {
+            "stream": False,
+            "include_peripherals": [],
+            "exclude_peripherals": [],
+            "trusted": False,
+            "cache_dir": None,
+            "cache_size": 512,
+        },
+    }
+
+
+@needs_unix_sockets
+def test_server_generates_on_request(tmp_path, svd_factory, server):
+    source = write_svd(svd_factory, "ACME1")
+    request = generation_request(tmp_path, source)
+
+    first = send_request(server, request)
+    second = send_request(server, request)
+
+    assert first["ok"] and not first["cached"]
+    assert second["ok"] and second["cached"]
+    assert "ACME1" == first["device"]
+    assert (tmp_path / "out/acme1/include/acme1/p0.h").is_file()
+
+
+@needs_unix_sockets
+def test_server_reports_errors(tmp_path, server):
+    request = generation_request(tmp_path, SvdSource(tmp_path / "missing.svd"))
+
+    response = send_request(server, request)
+
+    assert not response["ok"]
+    assert "FileNotFoundError" in response["error"]
+
+
+@needs_unix_sockets
+def test_remove_stale_socket(server):
+    with pytest.raises(ValueError, match="already listening"):
+        remove_stale_socket(server)
+
+
+def test_commands_refuse_to_run_without_unix_sockets(monkeypatch):
+    monkeypatch.setattr(client, "UNIX_SOCKETS", False)
+
+    with pytest.raises(click.UsageError, match="Unix domain sockets"):
+        require_unix_sockets()
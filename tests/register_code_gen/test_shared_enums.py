@@ -0,0 +1,86 @@
+import pytest
+
+from register_code_gen.generator import load_device, run
+from register_code_gen.options import OutputOptions
+from register_code_gen.shared_enums import SharedEnums
+
+
+def peripheral(svd_factory, name, address, modes):
+    return svd_factory.peripheral(
+        name,
+        address,
+        svd_factory.register(
+            "CR",
+            0x0,
+            [
+                svd_factory.field(
+                    "EN",
+                    (0, 1),
+                    svd_factory.enums([("OFF", 0), ("ON", 1)]),
+                    description="Enable",
+                ),
+                svd_factory.field(
+                    "MODE",
+                    (1, 2),
+                    svd_factory.enums(modes, "MODE"),
+                    description="Mode",
+                ),
+            ],
+            description="Control",
+        ),
+        description=f"{name} peripheral",
+    )
+
+
+@pytest.fixture(name="svd_file")
+def fixture_svd_file(svd_factory):
+    modes = [("SLOW", 0), ("FAST", 1)]
+    return svd_factory.write(
+        [
+            peripheral(svd_factory, "P0", 0x40000000, modes),
+            peripheral(svd_factory, "P1", 0x40000400, modes + [("TURBO", 2)]),
+            peripheral(svd_factory, "P2", 0x40000800, modes),
+        ]
+    )
+
+
+def test_shared_enums_by_content(svd_file):
+    device, _ = load_device(svd_file)
+    shared = SharedEnums.from_device(device)
+
+    names = [enum.name for enum in shared.enums.values()]
+    assert ["ACME1_en", "ACME1_mode", "ACME1_mode_2"] == names
+    p1_mode = device.peripherals[1].registers[0].fields[1]
+    assert "ACME1_mode_2_t" == shared.type_name(p1_mode.enumerated_values)
+
+
+def test_shared_enums_by_name_separates_different_values(svd_file, caplog):
+    device, _ = load_device(svd_file)
+    shared = SharedEnums.from_device(device, "name")
+
+    names = [enum.name for enum in shared.enums.values()]
+    assert ["ACME1_en", "ACME1_mode", "ACME1_mode_2"] == names
+    p1_mode, p2_mode = (
+        p.registers[0].fields[1].enumerated_values
+        for p in device.peripherals[1:]
+    )
+    assert "ACME1_mode_2_t" == shared.type_name(p1_mode)
+    assert "ACME1_mode_t" == shared.type_name(p2_mode)
+    assert "'MODE' have different values" in caplog.text
+
+
+def test_run_with_shared_enums(svd_file, tmp_path):
+    output_dir = tmp_path / "out"
+    run(
+        svd_file,
+        output_dir,
+        output_options=OutputOptions(shared_enums="content"),
+    )
+
+    enums = (output_dir / "include/acme1/acme1_enums.h").read_text()
+    assert 3 == enums.count("typedef enum")
+    assert "ACME1_mode_2_turbo = 0x2,\n" in enums
+    header = (output_dir / "include/acme1/p2.h").read_text()
+    assert '#include "acme1/acme1_enums.h"\n' in header
+    assert "typedef enum" not in header
+    assert "ACME1_mode_t  mode:2;\n" in header
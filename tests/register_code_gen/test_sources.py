@@ -0,0 +1,133 @@
+import gzip
+import lzma
+import mmap
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from register_code_gen.generator import load_device
+from register_code_gen.options import Options
+from register_code_gen.sources import SvdSource, as_source
+
+SVD = b"""<device>
+  <name>ACME1</name>
+  <version>1.0</version>
+  <description>Acme test device</description>
+  <addressUnitBits>8</addressUnitBits>
+  <width>32</width>
+  <peripherals>
+    <peripheral>
+      <name>GPIOA</name>
+      <baseAddress>0x40000000</baseAddress>
+    </peripheral>
+    <peripheral>
+      <name>UART0</name>
+      <baseAddress>0x40010000</baseAddress>
+    </peripheral>
+  </peripherals>
+</device>
+"""
+
+
+def write_plain(path: Path) -> SvdSource:
+    path.write_bytes(SVD)
+    return SvdSource(path)
+
+
+def write_gzip(path: Path) -> SvdSource:
+    path = path.with_suffix(".svd.gz")
+    path.write_bytes(gzip.compress(SVD))
+    return SvdSource(path)
+
+
+def write_xz(path: Path) -> SvdSource:
+    path = path.with_suffix(".svd.xz")
+    path.write_bytes(lzma.compress(SVD))
+    return SvdSource(path)
+
+
+def write_zip_member(path: Path) -> SvdSource:
+    path = path.with_suffix(".pack")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("CMSIS/SVD/acme1.svd", SVD)
+    return SvdSource(path, "CMSIS/SVD/acme1.svd")
+
+
+def write_compressed_zip_member(path: Path) -> SvdSource:
+    path = path.with_suffix(".zip")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("acme1.svd.gz", gzip.compress(SVD))
+    return SvdSource(path, "acme1.svd.gz")
+
+
+writers = [
+    write_plain,
+    write_gzip,
+    write_xz,
+    write_zip_member,
+    write_compressed_zip_member,
+]
+
+
+@pytest.mark.parametrize("writer", writers)
+def test_open_reads_content(tmp_path, writer):
+    source = writer(tmp_path / "acme1.svd")
+
+    with source.open() as f:
+        result = f.read()
+
+    assert source.exists()
+    assert SVD == result
+
+
+def test_open_maps_plain_files(tmp_path):
+    source = write_plain(tmp_path / "acme1.svd")
+
+    with source.open() as f:
+        assert isinstance(f, mmap.mmap)
+
+
+def test_open_empty_file(tmp_path):
+    (tmp_path / "empty.svd").write_bytes(b"")
+
+    with SvdSource(tmp_path / "empty.svd").open() as f:
+        assert b"" == f.read()
+
+
+def test_parse_round_trips():
+    source = as_source("vendor.pack!/CMSIS/SVD/acme1.svd")
+
+    assert SvdSource(Path("vendor.pack"), "CMSIS/SVD/acme1.svd") == source
+    assert "acme1.svd" == source.name
+    assert "vendor.pack!CMSIS/SVD/acme1.svd" == str(source)
+    assert SvdSource(Path("acme1.svd")) == as_source(Path("acme1.svd"))
+
+
+def test_path_with_separator_is_a_plain_file(tmp_path):
+    svd_file = tmp_path / "new!acme1.svd"
+    svd_file.write_bytes(b"<device/>")
+
+    source = as_source(svd_file)
+
+    assert SvdSource(svd_file) == source
+    with source.open() as f:
+        assert b"<device/>" == f.read()
+
+
+def test_missing_member_does_not_exist(tmp_path):
+    source = write_zip_member(tmp_path / "acme1.svd")
+
+    assert not SvdSource(source.path, "missing.svd").exists()
+    assert not SvdSource(tmp_path / "missing.svd").exists()
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("writer", writers)
+def test_load_device(tmp_path, writer, stream):
+    source = writer(tmp_path / "acme1.svd")
+
+    device, _ = load_device(source, Options(stream=stream))
+
+    assert "ACME1" == device.name
+    assert ["GPIOA", "UART0"] == [p.name for p in device.peripherals]
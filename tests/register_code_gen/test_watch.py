@@ -0,0 +1,137 @@
+import os
+
+from register_code_gen.generator import Generator, run
+from register_code_gen.watch import WatchSession, split_peripherals
+
+
+def write_svd(svd_factory, widths, description="Acme test device"):
+    peripherals = [
+        svd_factory.peripheral(
+            name,
+            0x40000000 + i * 0x400,
+            svd_factory.register(
+                "CR",
+                0x0,
+                svd_factory.field("MODE", (0, width), description="Mode"),
+                description="Control",
+            ),
+            description=f"{name} peripheral",
+        )
+        for i, (name, width) in enumerate(widths.items())
+    ]
+    peripherals.append(
+        svd_factory.peripheral("Q1", 0x50000000, derived_from="P1")
+    )
+    svd_file = svd_factory.write(peripherals, description=description)
+    # Make sure every write is seen as a change, however fast the test runs
+    os.utime(svd_file, ns=(0, svd_file.stat().st_mtime_ns + 1_000_000))
+    return svd_file
+
+
+def output_files(output_dir):
+    return {
+        path.relative_to(output_dir).as_posix(): path.read_text()
+        for path in sorted(output_dir.rglob("*.[ch]"))
+    }
+
+
+def age_outputs(output_dir):
+    for path in output_dir.rglob("*.[ch]"):
+        os.utime(path, (0, 0))
+
+
+def touched(output_dir):
+    return {
+        path.relative_to(output_dir).as_posix()
+        for path in output_dir.rglob("*.[ch]")
+        if path.stat().st_mtime != 0
+    }
+
+
+def test_split_peripherals(svd_factory):
+    svd_file = write_svd(svd_factory, {"P0": 1, "P1": 2})
+    outline, texts = split_peripherals(svd_file.read_bytes())
+
+    assert 3 == len(texts)
+    assert texts[0].startswith(b"<peripheral>")
+    assert texts[2].startswith(b'<peripheral derivedFrom="P1">')
+    assert all(t.endswith(b"</peripheral>") for t in texts)
+
+    write_svd(svd_factory, {"P0": 1, "P1": 3})
+    edited_outline, edited = split_peripherals(svd_file.read_bytes())
+    assert outline == edited_outline
+    assert texts[0] == edited[0] and texts[1] != edited[1]
+
+
+def test_watch_regenerates_changed_peripherals(tmp_path, svd_factory):
+    svd_file = write_svd(svd_factory, {"P0": 1, "P1": 2, "P2": 2})
+    output_dir = tmp_path / "out"
+    session = WatchSession(Generator(), svd_file, output_dir)
+
+    assert {"P0", "P1", "P2", "Q1"} == session.poll()
+    assert session.poll() is None
+    age_outputs(output_dir)
+
+    write_svd(svd_factory, {"P0": 3, "P1": 2, "P2": 2})
+    assert {"P0"} == session.poll()
+    assert {"include/acme1/p0.h"} == touched(output_dir)
+    age_outputs(output_dir)
+
+    write_svd(svd_factory, {"P0": 3, "P1": 4, "P2": 2})
+    assert {"P1", "Q1"} == session.poll()
+
+    run(svd_file, tmp_path / "full")
+    assert output_files(tmp_path / "full") == output_files(output_dir)
+
+
+def test_watch_reloads_when_device_changes(tmp_path, svd_factory):
+    svd_file = write_svd(svd_factory, {"P0": 1, "P1": 2, "P2": 2})
+    output_dir = tmp_path / "out"
+    session = WatchSession(Generator(), svd_file, output_dir)
+    session.poll()
+
+    write_svd(svd_factory, {"P0": 1, "P1": 2, "P2": 2}, description="Edited")
+    assert {"P0", "P1", "P2", "Q1"} == session.poll()
+    assert "Edited" == session.device.description
+
+    write_svd(svd_factory, {"P0": 1, "P1": 2})
+    session.poll()
+    assert not (output_dir / "include/acme1/p2.h").exists()
+    assert output_files(output_dir)["include/acme1/p1.h"]
+
+
+def test_watch_rebuilds_peripherals_deriving_enums_by_name(
+    tmp_path, svd_factory
+):
+    def write_svd_with_enum(values):
+        peripherals = [
+            svd_factory.peripheral(
+                name,
+                address,
+                svd_factory.register(
+                    "CR",
+                    0x0,
+                    svd_factory.field("M", (0, 2), enums),
+                    description="Control",
+                ),
+            )
+            for name, address, enums in [
+                ("A", 0x40000000, svd_factory.enums(values, name="ENV")),
+                ("B", 0x40000400, '<enumeratedValues derivedFrom="ENV"/>'),
+            ]
+        ]
+        svd_file = svd_factory.write(peripherals)
+        os.utime(svd_file, ns=(0, svd_file.stat().st_mtime_ns + 1_000_000))
+        return svd_file
+
+    svd_file = write_svd_with_enum([("SLOW", 0)])
+    output_dir = tmp_path / "out"
+    session = WatchSession(Generator(), svd_file, output_dir)
+    session.poll()
+
+    write_svd_with_enum([("SLOW", 0), ("FAST", 1)])
+    assert {"A", "B"} == session.poll()
+    assert "B_m_fast" in (output_dir / "include/acme1/b.h").read_text()
+
+    run(svd_file, tmp_path / "full")
+    assert output_files(tmp_path / "full") == output_files(output_dir)
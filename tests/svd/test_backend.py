@@ -0,0 +1,152 @@
+import dataclasses
+import pickle
+
+import pytest
+
+from svd import backend
+from svd.basic_elements import Access, Endian, Usage
+from svd.device import Device
+from svd.enum_value import EnumeratedValue
+from svd.field import Field
+from svd.register import Register
+
+DEVICE_DICT = {
+    "name": "ACME1",
+    "version": "1.0",
+    "description": "Acme test device",
+    "addressUnitBits": "8",
+    "width": "32",
+    "size": "0x20",
+    "access": "read-write",
+    "cpu": {
+        "name": "CM4",
+        "revision": "r0p1",
+        "endian": "little",
+        "mpuPresent": "true",
+        "fpuPresent": "0",
+        "nvicPrioBits": "4",
+        "vendorSystickConfig": "false",
+    },
+    "peripherals": {
+        "peripheral": [
+            {
+                "name": "GPIOA",
+                "baseAddress": "0x40000000",
+                "addressBlock": {
+                    "offset": "0x0",
+                    "size": "0x400",
+                    "usage": "registers",
+                },
+                "interrupt": {"name": "GPIOA_IRQ", "value": "3"},
+                "registers": {
+                    "register": [
+                        {
+                            "name": "MODER",
+                            "addressOffset": "0x0",
+                            "readAction": "clear",
+                            "fields": {
+                                "field": {
+                                    "name": "MODE0",
+                                    "bitOffset": "0",
+                                    "bitWidth": "2",
+                                    "access": "read-only",
+                                    "enumeratedValues": {
+                                        "usage": "read",
+                                        "enumeratedValue": [
+                                            {"name": "IN", "value": "0x0"},
+                                            {"name": "OUT", "value": "#1"},
+                                        ],
+                                    },
+                                }
+                            },
+                        },
+                    ]
+                },
+            },
+            {
+                "@derivedFrom": "GPIOA",
+                "name": "GPIOB",
+                "baseAddress": "0x40000400",
+            },
+        ]
+    },
+}
+
+
+def model_values(model, seen=None):
+    """Attribute values of a model tree, without the back references"""
+    if not dataclasses.is_dataclass(model):
+        if isinstance(model, list):
+            return [model_values(m, seen) for m in model]
+        return model
+    seen = seen if seen is not None else set()
+    if id(model) in seen:
+        return model.name
+    seen.add(id(model))
+    return {
+        f.name: model_values(getattr(model, f.name), seen)
+        for f in dataclasses.fields(model)
+        if f.name != "parent"
+    }
+
+
+def test_trusted_models_match_validated_models():
+    expected = Device.from_dict(DEVICE_DICT)
+
+    with backend.trusted():
+        result = Device.from_dict(DEVICE_DICT)
+
+    assert not isinstance(result, Device)
+    assert isinstance(result, backend.fast_class(Device))
+    assert type(result).__name__ == "Device"
+    assert model_values(expected) == model_values(result)
+    assert Endian.LITTLE == result.cpu.endian
+    assert result.cpu.mpu_present is True
+    field = result.peripherals[0].registers[0].fields[0]
+    assert Access.READ_ONLY == field.access
+    assert Usage.READ == field.enumerated_values.usage
+    assert [0, 1] == [ev.value for ev in field.enumerated_values]
+    assert result.peripherals[0] is result.peripherals[1].derived_from
+
+
+def test_trusted_models_are_slotted():
+    with backend.trusted():
+        result = Field.from_dict({"name": "EN", "bitOffset": 0, "bitWidth": 1})
+
+    assert not hasattr(result, "__dict__")
+    assert "from_dict" in vars(type(result))
+    assert result == backend.fast_class(Field)("EN", 0, 1)
+
+
+def test_trusted_models_skip_validation():
+    with backend.trusted():
+        result = Register.from_dict({"name": None, "addressOffset": "0x4"})
+    assert None is result.name
+    with pytest.raises(ValueError):
+        Register.from_dict({"name": None, "addressOffset": "0x4"})
+
+
+def test_trusted_models_pickle():
+    with backend.trusted():
+        device = Device.from_dict(DEVICE_DICT)
+
+    result = pickle.loads(pickle.dumps(device))
+
+    assert type(device) is type(result)
+    assert model_values(device) == model_values(result)
+    gpioa, gpiob = result.peripherals
+    assert result is gpioa.parent
+    assert gpioa is gpiob.derived_from
+
+
+def test_trusted_context_restores_mode():
+    with backend.trusted():
+        assert backend.is_trusted()
+        with backend.trusted(False):
+            assert not backend.is_trusted()
+        assert backend.is_trusted()
+    assert not backend.is_trusted()
+    assert isinstance(
+        EnumeratedValue.from_dict({"name": "A", "value": "0x1"}),
+        EnumeratedValue,
+    )
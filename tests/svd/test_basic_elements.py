@@ -0,0 +1,94 @@
+import pytest
+
+from svd import basic_elements
+from svd.basic_elements import Access
+
+parse_int_params = [
+    (None, None),
+    (7, 7),
+    ("42", 42),
+    (" 42\n", 42),
+    ("0x20", 0x20),
+    ("0XfF", 0xFF),
+    ("0x10 bytes", 0x10),
+    ("0b101", 0b101),
+    ("#1x1", 0b101),
+]
+
+
+@pytest.mark.parametrize("value, expected", parse_int_params)
+def test_parse_int(value, expected):
+    assert expected == basic_elements.parse_int(value)
+
+
+@pytest.mark.parametrize("value", ["", "0x", "foo", "0xZZ"])
+def test_parse_int_is_invalid(value):
+    with pytest.raises(ValueError):
+        basic_elements.parse_int(value)
+
+
+parse_enumerated_value_params = [
+    (3, 3),
+    ("0x3", 3),
+    ("0b11", 3),
+    ("#1x", 2),
+]
+
+
+@pytest.mark.parametrize("value, expected", parse_enumerated_value_params)
+def test_parse_enumerated_value(value, expected):
+    assert expected == basic_elements.parse_enumerated_value(value)
+
+
+def test_parse_enumerated_value_rejects_decimal():
+    with pytest.raises(ValueError):
+        basic_elements.parse_enumerated_value("3")
+
+
+parse_description_params = [
+    (None, None),
+    ("Mode register", "Mode register"),
+    ("Mode  register", "Mode register"),
+    ("Mode\n    register\r\n", "Mode register "),
+    ("\tMode register", " Mode register"),
+]
+
+
+@pytest.mark.parametrize("value, expected", parse_description_params)
+def test_parse_description(value, expected):
+    assert expected == basic_elements.parse_description(value)
+
+
+@pytest.mark.parametrize(
+    "value, expected", [("true", True), (" 0 ", False), (None, None)]
+)
+def test_parse_bool(value, expected):
+    assert expected is basic_elements.parse_bool(value)
+
+
+def test_parse_enum():
+    assert Access.READ_ONLY == basic_elements.parse_enum(Access, "read-only")
+    assert Access.READ_ONLY == basic_elements.parse_enum(
+        Access, Access.READ_ONLY
+    )
+    assert None is basic_elements.parse_enum(Access, None)
+
+
+def test_literal_cache_hit_rate():
+    before = basic_elements.literal_cache_info()["parse_int"]
+
+    basic_elements.parse_int("0x1234abcd")
+    basic_elements.parse_int("0x1234abcd")
+
+    after = basic_elements.literal_cache_info()["parse_int"]
+    assert before.hits + 1 <= after.hits
+    assert 0.0 < basic_elements.literal_cache_hit_rate() <= 1.0
+
+
+def test_literal_cache_hit_rate_since():
+    cache_info = basic_elements.literal_cache_info()
+
+    basic_elements.parse_int("0x5eed1e55")
+    basic_elements.parse_int("0x5eed1e55")
+
+    assert 0.5 == basic_elements.literal_cache_hit_rate(cache_info)
@@ -0,0 +1,64 @@
+import pytest
+
+from svd import backend
+from svd.cluster import Cluster
+from svd.peripheral import Peripheral
+
+
+def register_dict(name, address_offset):
+    return {"name": name, "addressOffset": address_offset}
+
+
+CLUSTER_DICT = {
+    "name": "CH[%s]",
+    "description": "DMA channel",
+    "addressOffset": "0x8",
+    "dim": "4",
+    "dimIncrement": "0x20",
+    "register": [register_dict("CCR", "0x0"), register_dict("CNDTR", "0x4")],
+    "cluster": {
+        "name": "ADDR",
+        "addressOffset": "0x8",
+        "register": register_dict("CPAR", "0x0"),
+    },
+}
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_cluster_from_dict(trusted):
+    peripheral_dict = {
+        "name": "DMA",
+        "baseAddress": "0x40020000",
+        "size": "32",
+        "registers": {
+            "register": register_dict("ISR", "0x0"),
+            "cluster": CLUSTER_DICT,
+        },
+    }
+    with backend.trusted(trusted):
+        peripheral = Peripheral.from_dict(peripheral_dict)
+
+    (isr,) = peripheral.registers
+    (channel,) = peripheral.clusters
+    ccr, cndtr = channel.registers
+    (addr,) = channel.clusters
+    (cpar,) = addr.registers
+    assert "ISR" == isr.name
+    assert peripheral is channel.parent
+    assert channel.is_array
+    assert 8 == channel.address_offset
+    assert ["CCR", "CNDTR"] == [ccr.name, cndtr.name]
+    assert channel is ccr.parent
+    assert 32 == ccr.size
+    assert addr is cpar.parent
+    assert not addr.is_array
+
+
+def test_cluster_expand():
+    cluster = Cluster.from_dict(CLUSTER_DICT)
+
+    result = list(cluster.expand())
+
+    assert ["CH[0]", "CH[1]", "CH[2]", "CH[3]"] == [c.name for c in result]
+    assert [0x8, 0x28, 0x48, 0x68] == [c.address_offset for c in result]
+    assert all(c.registers == cluster.registers for c in result)
@@ -0,0 +1,221 @@
+import copy
+
+import pytest
+
+from svd.device import Device
+from svd.peripheral import Peripheral
+
+
+def field_dict(name, bit_offset, **extra):
+    return {"name": name, "bitOffset": str(bit_offset), "bitWidth": "1"} | extra
+
+
+def register_dict(name, address_offset, fields=None, **extra):
+    register = {"name": name, "addressOffset": address_offset} | extra
+    if fields is not None:
+        register["fields"] = {"field": fields}
+    return register
+
+
+DEVICE_DICT = {
+    "name": "ACME1",
+    "version": "1.0",
+    "description": "Acme test device",
+    "addressUnitBits": "8",
+    "width": "32",
+    "size": "0x20",
+    "cpu": {
+        "name": "CM4",
+        "revision": "r0p1",
+        "endian": "little",
+        "mpuPresent": "true",
+        "fpuPresent": "false",
+        "nvicPrioBits": "4",
+        "vendorSystickConfig": "false",
+    },
+    "peripherals": {
+        "peripheral": [
+            {
+                "name": "TIM1",
+                "baseAddress": "0x40000000",
+                "registers": {
+                    "register": [
+                        register_dict(
+                            "CR1",
+                            "0x0",
+                            [
+                                field_dict(
+                                    "CEN",
+                                    0,
+                                    description="Counter enable",
+                                    enumeratedValues={
+                                        "name": "ENABLE",
+                                        "enumeratedValue": [
+                                            {"name": "OFF", "value": "0x0"},
+                                            {"name": "ON", "value": "0x1"},
+                                        ],
+                                    },
+                                ),
+                                field_dict(
+                                    "UDIS",
+                                    1,
+                                    enumeratedValues={"@derivedFrom": "ENABLE"},
+                                ),
+                            ],
+                        ),
+                        register_dict("CR2", "0x4", **{"@derivedFrom": "CR1"}),
+                    ]
+                },
+            },
+            {
+                "name": "TIM2",
+                "baseAddress": "0x40000400",
+                "registers": {
+                    "register": [
+                        register_dict(
+                            "CR1",
+                            "0x0",
+                            [
+                                field_dict(
+                                    "CEN", 0, **{"@derivedFrom": "TIM1.CR1.CEN"}
+                                ),
+                                field_dict(
+                                    "OPM",
+                                    3,
+                                    enumeratedValues={
+                                        "@derivedFrom": "TIM1.CR1.CEN.ENABLE"
+                                    },
+                                ),
+                            ],
+                        ),
+                        register_dict("CR2", "0x4", **{"@derivedFrom": "CR1"}),
+                    ]
+                },
+            },
+            {
+                "@derivedFrom": "TIM2",
+                "name": "TIM3",
+                "baseAddress": "0x40000800",
+            },
+        ]
+    },
+}
+
+
+def device_dict_with(path, value):
+    device_dict = copy.deepcopy(DEVICE_DICT)
+    element = device_dict
+    for key in path[:-1]:
+        element = element[key]
+    element[path[-1]] = value
+    return device_dict
+
+
+def test_resolve_derived_from():
+    device = Device.from_dict(copy.deepcopy(DEVICE_DICT))
+    tim1, tim2, tim3 = device.peripherals
+    tim1_cr1, tim1_cr2 = tim1.registers
+    tim2_cr1, tim2_cr2 = tim2.registers
+    cen, udis = tim1_cr1.fields
+
+    assert tim2 is tim3.derived_from
+    assert tim1_cr1 is tim1_cr2.derived_from
+    assert tim1_cr1.fields is tim1_cr2.fields
+    assert tim2_cr1 is tim2_cr2.derived_from
+    assert cen is tim2_cr1.fields[0].derived_from
+    assert "Counter enable" == tim2_cr1.fields[0].description
+    assert cen.enumerated_values is udis.enumerated_values.derived_from
+    assert ["OFF", "ON"] == [e.name for e in udis.enumerated_values]
+    opm_enums = tim2_cr1.fields[1].enumerated_values
+    assert cen.enumerated_values is opm_enums.derived_from
+
+
+dangling_params = [
+    (["peripherals", "peripheral", 2, "@derivedFrom"], "TIM9", "TIM3"),
+    (
+        ["peripherals", "peripheral", 0, "registers", "register", 1],
+        register_dict("CR2", "0x4", **{"@derivedFrom": "CR9"}),
+        "TIM1.CR2",
+    ),
+    (
+        ["peripherals", "peripheral", 1, "registers", "register", 0],
+        register_dict(
+            "CR1", "0x0", [field_dict("CEN", 0, **{"@derivedFrom": "X.Y"})]
+        ),
+        "TIM2.CR1.CEN",
+    ),
+]
+
+
+@pytest.mark.parametrize("path, value, referrer", dangling_params)
+def test_resolve_dangling_derived_from(path, value, referrer):
+    device_dict = device_dict_with(path, value)
+    with pytest.raises(ValueError, match=referrer):
+        Device.from_dict(device_dict)
+
+
+def test_resolve_derived_cluster():
+    registers = {
+        "register": [register_dict("SR", "0x0"), register_dict("DR", "0x4")],
+        "cluster": [
+            {
+                "name": "CH0",
+                "addressOffset": "0x10",
+                "description": "Channel",
+                "register": [
+                    register_dict("CR", "0x0"),
+                    register_dict("AR", "0x4", **{"@derivedFrom": "CR"}),
+                ],
+            },
+            {"@derivedFrom": "CH0", "name": "CH1", "addressOffset": "0x20"},
+        ],
+    }
+    device_dict = device_dict_with(
+        ["peripherals", "peripheral", 1, "registers"], registers
+    )
+
+    device = Device.from_dict(device_dict)
+
+    ch0, ch1 = device.peripherals[1].clusters
+    cr, ar = ch0.registers
+    assert cr is ar.derived_from
+    assert ch0 is ch1.derived_from
+    assert ch0.registers is ch1.registers
+    assert "Channel" == ch1.description
+
+
+def test_resolve_circular_derived_from():
+    device_dict = device_dict_with(
+        ["peripherals", "peripheral", 1, "registers", "register", 0],
+        register_dict("CR1", "0x0", **{"@derivedFrom": "CR2"}),
+    )
+    with pytest.raises(ValueError, match="Circular"):
+        Device.from_dict(device_dict)
+
+
+def test_resolve_derived_from_of_some_peripherals():
+    device_dict = device_dict_with(
+        ["peripherals", "peripheral", 1, "registers", "register", 1],
+        register_dict(
+            "CR2",
+            "0x4",
+            [
+                field_dict(
+                    "ARPE", 7, enumeratedValues={"@derivedFrom": "ENABLE"}
+                )
+            ],
+        ),
+    )
+    device = Device.from_dict(device_dict)
+    tim1, tim2, tim3 = device.peripherals
+    peripheral_dicts = device_dict["peripherals"]["peripheral"]
+
+    rebuilt = Peripheral.from_dict(copy.deepcopy(peripheral_dicts[1]), device)
+    device.peripherals = [tim1, rebuilt, tim3]
+    device.resolve_derived_from([rebuilt])
+
+    cr1, cr2 = rebuilt.registers
+    assert tim1.registers[0].fields[0] is cr1.fields[0].derived_from
+    enable = tim1.registers[0].fields[0].enumerated_values
+    assert enable is cr2.fields[0].enumerated_values.derived_from
+    assert tim2 is tim3.derived_from
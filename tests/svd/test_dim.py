@@ -0,0 +1,58 @@
+import pytest
+
+from svd.dim import DimElement, base_name, parse_dim_index
+
+dim_index_params = [
+    (None, None),
+    ("0-3", ["0", "1", "2", "3"]),
+    ("3-5", ["3", "4", "5"]),
+    ("A-C", ["A", "B", "C"]),
+    ("RX, TX", ["RX", "TX"]),
+    ("1,2,4", ["1", "2", "4"]),
+]
+
+
+@pytest.mark.parametrize("value, expected", dim_index_params)
+def test_parse_dim_index(value, expected):
+    assert expected == parse_dim_index(value)
+
+
+def test_parse_dim_index_rejects_mixed_range():
+    with pytest.raises(ValueError):
+        parse_dim_index("0-C")
+
+
+def test_dim_element_from_dict():
+    result = DimElement.from_dict(
+        {
+            "name": "CH%s_CR",
+            "dim": "2",
+            "dimIncrement": "0x8",
+            "dimIndex": "A-B",
+        }
+    )
+
+    assert 2 == result.dim
+    assert 8 == result.dim_increment
+    assert ["A", "B"] == result.indices()
+    assert None is DimElement.from_dict({"name": "CR"})
+
+
+dim_element_error_params = [
+    {"name": "CR", "dim": "2", "dimIncrement": "4"},
+    {"name": "CR[%s]", "dim": "2", "dimIncrement": "4", "dimIndex": "0-2"},
+]
+
+
+@pytest.mark.parametrize("element_dict", dim_element_error_params)
+def test_dim_element_from_dict_errors(element_dict):
+    with pytest.raises(ValueError):
+        DimElement.from_dict(element_dict)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [("CCR[%s]", "CCR"), ("CH%s_CR", "CH_CR"), ("CR", "CR")],
+)
+def test_base_name(name, expected):
+    assert expected == base_name(name)
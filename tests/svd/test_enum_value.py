@@ -1,5 +1,6 @@
 import pytest
 
+from svd import backend
 from svd.basic_elements import Usage
 from svd.enum_value import EnumeratedValue, EnumeratedValues
 
@@ -23,14 +24,10 @@ def test_enumerated_values_from_dict():
 
     result = EnumeratedValues.from_dict(enums_dict)
 
-    assert None is result.parent
     assert None is result.derived_from
     assert "DMAEN1" == result.name
     assert None is result.header_enum_name
     assert Usage.READ_WRITE == result.usage
-    for enum_value in result.enumerated_values:
-        assert enum_value.parent is result
-        assert "DMAEN1" == enum_value.parent.name
     assert "B_0x0" == result.enumerated_values[0].name
     assert 0 == result.enumerated_values[0].value
     assert "disabled" in result.enumerated_values[0].description
@@ -55,8 +52,7 @@ def test_enumerated_values_from_dict():
     "name, description, value, expected_value", enum_value_init_params
 )
 def test_enum_value_init(name, description, value, expected_value):
-    result = EnumeratedValue(None, name, description, value, None)
-    assert result.parent is None
+    result = EnumeratedValue(name, description, value, None)
     assert result.name == name
     assert result.description == description
     assert result.value == expected_value
@@ -66,7 +62,7 @@ def test_enum_value_init(name, description, value, expected_value):
 enum_value_from_dict_params = [
     (
         {"name": "B_0x1", "description": "dac_ch1_trg1", "value": "0x1"},
-        EnumeratedValue(None, "B_0x1", "dac_ch1_trg1", "0x1", None),
+        EnumeratedValue("B_0x1", "dac_ch1_trg1", "0x1", None),
     ),
 ]
 
@@ -79,7 +75,29 @@ def test_enum_value_from_dict(enum_dict, expected):
 
 def test_enum_value_is_invalid():
     # This call works
-    _ = (EnumeratedValue(None, "B_0x1", "dac_ch1_trg1", "0x1", None),)
+    _ = (EnumeratedValue("B_0x1", "dac_ch1_trg1", "0x1", None),)
     with pytest.raises(ValueError):
         # This one fails to parse
-        _ = (EnumeratedValue(None, "B_0x1", "dac_ch1_trg1", "01", None),)
+        _ = (EnumeratedValue("B_0x1", "dac_ch1_trg1", "01", None),)
+
+
+def test_identical_enumerated_values_are_shared():
+    enums_dict = {
+        "name": "MODE",
+        "enumeratedValue": [
+            {"name": "OFF", "description": "Disabled", "value": "0x0"},
+            {"name": "ON", "description": "Enabled", "value": "0x1"},
+        ],
+    }
+    derived_dict = {"@derivedFrom": "MODE"}
+
+    with backend.sharing():
+        first = EnumeratedValues.from_dict(enums_dict)
+        second = EnumeratedValues.from_dict(dict(enums_dict))
+        derived = EnumeratedValues.from_dict(derived_dict)
+        assert derived is not EnumeratedValues.from_dict(derived_dict)
+    unshared = EnumeratedValues.from_dict(enums_dict)
+
+    assert first is second
+    assert first is not unshared
+    assert first == unshared
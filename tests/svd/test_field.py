@@ -129,7 +129,6 @@ def test_field_from_dict(field_dict, expected):
     assert expected.get("modified_write_values") == result.modified_write_values
     assert expected.get("read_action") == result.read_action
     if expected_enums := expected.get("enumerated_values"):
-        assert result.enumerated_values.parent is result
         for i, result_enum in enumerate(result.enumerated_values):
             assert expected_enums[i].get("name") == result_enum.name
             assert (
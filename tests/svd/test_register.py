@@ -1,5 +1,6 @@
 import pytest
 
+from svd import backend
 from svd.basic_elements import Access
 from svd.register import Register
 
@@ -167,3 +168,25 @@ def test_register_from_dict(register_dict, expected):
             )
             assert expected_fields[i].get("bit_width") == result_field.bit_width
             assert expected_fields[i].get("access") == result_field.access
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_register_expand(trusted):
+    register_dict = {
+        "name": "CH%s_CR",
+        "addressOffset": "0x10",
+        "size": "32",
+        "dim": "3",
+        "dimIncrement": "0x8",
+        "dimIndex": "A-C",
+    }
+    with backend.trusted(trusted):
+        result = Register.from_dict(register_dict)
+
+    elements = list(result.expand())
+
+    assert not result.is_array
+    assert ["CHA_CR", "CHB_CR", "CHC_CR"] == [r.name for r in elements]
+    assert [0x10, 0x18, 0x20] == [r.address_offset for r in elements]
+    assert all(r.dim is None for r in elements)
+    assert [elements[0]] == list(elements[0].expand())
@@ -0,0 +1,136 @@
+import io
+
+import pytest
+import xmltodict
+
+from svd.device import Device
+from svd.selection import PeripheralSelection
+from svd.stream import parse_device
+
+selection_params = [
+    ((), (), "GPIOA", True),
+    (("gpio*",), (), "GPIOA", True),
+    (("gpio*",), (), "UART0", False),
+    (("GPIO?", "UART*"), ("UART1",), "UART0", True),
+    (("GPIO?", "UART*"), ("UART1",), "UART1", False),
+    ((), ("*",), "GPIOA", False),
+]
+
+
+@pytest.mark.parametrize("include, exclude, name, expected", selection_params)
+def test_peripheral_selection(include, exclude, name, expected):
+    assert expected == PeripheralSelection(include, exclude)(name)
+
+
+def peripheral_dict(name, base=None):
+    peripheral = {"name": name}
+    if base is not None:
+        peripheral["@derivedFrom"] = base
+    return peripheral
+
+
+filter_params = [
+    (("UART0",), ["UART0"]),
+    (("GPIOC",), ["GPIOC", "GPIOB", "GPIOA"]),
+    (("TIM2",), ["TIM2", "TIM1"]),
+    (("GPIOB", "TIM*"), ["GPIOB", "GPIOA", "TIM2", "TIM1"]),
+]
+
+
+@pytest.mark.parametrize("include, expected", filter_params)
+def test_filter_dicts_pulls_in_bases(include, expected):
+    peripheral_dicts = [
+        peripheral_dict("GPIOA"),
+        peripheral_dict("GPIOB", "GPIOA"),
+        peripheral_dict("GPIOC", "GPIOB"),
+        peripheral_dict("TIM2", "TIM1"),
+        peripheral_dict("TIM1"),
+        peripheral_dict("UART0"),
+    ]
+    selection = PeripheralSelection(include)
+
+    result = selection.filter_dicts(peripheral_dicts)
+
+    assert expected == [p["name"] for p in result]
+
+
+def test_parse_device_with_selection(svd_factory):
+    svd_text = svd_factory.text(
+        [
+            svd_factory.peripheral("TIM2", 0x40000400, derived_from="TIM1"),
+            svd_factory.peripheral("UART0", 0x40010000),
+            svd_factory.peripheral("TIM1", 0x40000000),
+        ]
+    )
+    selection = PeripheralSelection(("TIM2",))
+
+    result = parse_device(io.BytesIO(svd_text.encode("utf-8")), selection)
+
+    tim2, tim1 = result.peripherals
+    assert "TIM2" == tim2.name
+    assert tim1 is tim2.derived_from
+
+
+def test_filter_dicts_pulls_in_bases_of_nested_elements():
+    uart = peripheral_dict("UART0")
+    uart["registers"] = {
+        "register": [
+            {"name": "CR", "@derivedFrom": "TIM1.CR"},
+            {"name": "SR", "fields": {"field": {"@derivedFrom": "TIM2.CR.EN"}}},
+            {"name": "DR", "@derivedFrom": "CR"},
+        ]
+    }
+    peripheral_dicts = [
+        peripheral_dict("TIM1"),
+        peripheral_dict("TIM2"),
+        peripheral_dict("TIM3"),
+        uart,
+    ]
+    selection = PeripheralSelection(("UART0",))
+
+    result = selection.filter_dicts(peripheral_dicts)
+
+    assert ["UART0", "TIM1", "TIM2"] == [p["name"] for p in result]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_select_peripheral_with_register_derived_from_another(
+    svd_factory, stream
+):
+    svd_text = svd_factory.text(
+        [
+            svd_factory.peripheral(
+                "B",
+                0x40000400,
+                [
+                    svd_factory.register("CR2", 0x0, derived_from="A.CR"),
+                    svd_factory.register(
+                        "CR3",
+                        0x4,
+                        svd_factory.field("EN", (0, 1), derived_from="A.CR.EN"),
+                    ),
+                ],
+            ),
+            svd_factory.peripheral(
+                "A",
+                0x40000000,
+                svd_factory.register(
+                    "CR", 0x0, svd_factory.field("EN", (0, 1))
+                ),
+            ),
+            svd_factory.peripheral("C", 0x40000800),
+        ]
+    )
+    selection = PeripheralSelection(("B",))
+
+    if stream:
+        device = parse_device(io.BytesIO(svd_text.encode("utf-8")), selection)
+    else:
+        device = Device.from_dict(
+            xmltodict.parse(svd_text)["device"], selection
+        )
+
+    b, a = device.peripherals
+    assert "A" == a.name
+    assert a.registers[0] is b.registers[0].derived_from
+    assert a.registers[0].fields[0] is b.registers[1].fields[0].derived_from
@@ -0,0 +1,66 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+import xmltodict
+
+from svd.device import Device
+from svd.stream import element_to_dict, parse_device
+
+
+@pytest.fixture(name="svd_text")
+def fixture_svd_text(svd_factory):
+    gpioa = svd_factory.peripheral(
+        "GPIOA",
+        0x40000000,
+        [
+            svd_factory.register(
+                "MODER",
+                0x0,
+                svd_factory.field("MODE0", (0, 2)),
+                description="Mode register",
+            ),
+            svd_factory.register("IDR", 0x10, description="Input data"),
+        ],
+        description="General purpose IO",
+    )
+    gpiob = svd_factory.peripheral("GPIOB", 0x40000400, derived_from="GPIOA")
+    return svd_factory.text([gpioa, gpiob], cpu=True)
+
+
+element_to_dict_params = [
+    "<name>GPIOA</name>",
+    "<empty/>",
+    '<peripheral derivedFrom="GPIOA"><name>GPIOB</name></peripheral>',
+    "<fields><field><name>A</name></field><field><name>B</name></field></fields>",
+    "<description>\n  Multi\n  line\n</description>",
+]
+
+
+@pytest.mark.parametrize("xml", element_to_dict_params)
+def test_element_to_dict_matches_xmltodict(xml):
+    element = ET.fromstring(xml)
+    expected = xmltodict.parse(xml)[element.tag]
+    assert expected == element_to_dict(element)
+
+
+def test_parse_device_matches_from_dict(svd_text):
+    expected = Device.from_dict(xmltodict.parse(svd_text)["device"])
+
+    result = parse_device(io.BytesIO(svd_text.encode("utf-8")))
+
+    assert expected.name == result.name
+    assert expected.cpu == result.cpu
+    assert [p.name for p in expected.peripherals] == [
+        p.name for p in result.peripherals
+    ]
+    gpioa, gpiob = result.peripherals
+    assert result is gpioa.parent
+    assert gpioa is gpiob.derived_from
+    assert ["MODER", "IDR"] == [r.name for r in gpioa.registers]
+    assert 0x20 == gpioa.registers[0].size
+
+
+def test_parse_device_without_peripherals():
+    with pytest.raises(ValueError):
+        parse_device(io.BytesIO(b"<device><name>ACME1</name></device>"))